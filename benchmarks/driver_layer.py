@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Driver Layer Benchmark.
+
+Runs a scripted page-object flow (read the main page, search and select a
+city, toggle settings) through AppDriver against the in-process mock
+Appium server (utils/mock_appium_server.py), and reports wall time and
+the number of WebDriver commands per iteration. With a fixed per-command
+latency the results are deterministic, so driver-layer changes (waits,
+caching, batching) can be compared on any machine.
+
+Usage:
+    python benchmarks/driver_layer.py --platform ios --iterations 5 --latency 0.01
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from utils.mock_appium_server import MockAppiumServer  # noqa: E402
+
+
+def run_flow(driver) -> None:
+    """The scripted page-object flow measured by the benchmark."""
+    from utils.page_objects import MainPage, MenuPage, SearchPage, SettingsPage
+
+    main_page = MainPage(driver)
+    assert main_page.get_current_temperature() is not None
+    assert main_page.get_humidity() is not None
+    assert main_page.get_wind_speed() is not None
+    assert main_page.get_weather_description()
+
+    main_page.click_search()
+    search_page = SearchPage(driver)
+    search_page.search_city("Kowloon")
+    search_page.select_city("Kowloon")
+
+    main_page.click_menu()
+    MenuPage(driver).click_settings()
+    settings_page = SettingsPage(driver)
+    settings_page.toggle_temperature_unit()
+    settings_page.toggle_notification()
+    settings_page.select_language("English")
+
+
+def measure_driver_layer(platform: str = "android", iterations: int = 5,
+                         latency: float = 0.0) -> Dict:
+    """
+    Measures the page-object flow against the mock server.
+
+    Each iteration starts a fresh session, runs the flow and quits.
+
+    Args:
+        platform (str): "android" or "ios".
+        iterations (int): Number of sessions to run.
+        latency (float): Simulated latency in seconds per WebDriver command.
+
+    Returns:
+        dict: Median/min/max wall time in milliseconds and WebDriver commands per iteration.
+    """
+    from utils.app_driver import AppDriver
+
+    os.chdir(PROJECT_ROOT)
+    timings: List[float] = []
+    with MockAppiumServer(port=0, latency={"default": latency}) as server:
+        previous = {key: os.environ.get(key) for key in ("APPIUM_HOST", "APPIUM_PORT")}
+        os.environ["APPIUM_HOST"], os.environ["APPIUM_PORT"] = server.host, str(server.port)
+        try:
+            for _ in range(iterations):
+                driver = AppDriver(platform=platform)
+                driver.start_driver()
+                started = time.perf_counter()
+                try:
+                    run_flow(driver)
+                finally:
+                    timings.append((time.perf_counter() - started) * 1000)
+                    driver.quit_driver()
+        finally:
+            for key, value in previous.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+        commands = {name: count // iterations for name, count in server.stats.items()
+                    if name not in ("status", "new_session", "set_timeouts", "delete_session")}
+
+    return {
+        "platform": platform,
+        "latency_ms": latency * 1000,
+        "iterations": iterations,
+        "median_ms": round(statistics.median(timings), 1),
+        "min_ms": round(min(timings), 1),
+        "max_ms": round(max(timings), 1),
+        "commands_per_iteration": sum(commands.values()),
+        "commands": dict(sorted(commands.items())),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the driver layer against the mock Appium server")
+    parser.add_argument("--platform", choices=["android", "ios"], default="android")
+    parser.add_argument("--iterations", type=int, default=5, help="Sessions to run (default: 5)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Simulated seconds per WebDriver command (default: 0)")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args(argv)
+
+    if args.json:
+        # Keep stdout clean for the JSON document; driver progress goes to stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            result = measure_driver_layer(args.platform, args.iterations, args.latency)
+        print(json.dumps(result, indent=2))
+        return 0
+
+    result = measure_driver_layer(args.platform, args.iterations, args.latency)
+    print(f"[{result['platform']}] median {result['median_ms']:.1f} ms "
+          f"(min {result['min_ms']:.1f}, max {result['max_ms']:.1f}) over {result['iterations']} iterations, "
+          f"{result['commands_per_iteration']} commands per iteration at {result['latency_ms']:.0f} ms latency")
+    for name, count in result["commands"].items():
+        print(f"    {count:4d}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite Runner.
+
+Times the driver, page-object, test-data, API-step and runner layers
+against local stand-ins (the in-process mock Appium server, generated
+HKO forecasts, a stand-in behave process), so it runs anywhere without a
+device or network:
+
+    driver.find_element        AppDriver.find_element against the mock server
+    page.main_reads            MainPage temperature/humidity/wind/description reads
+    page.flow                  The driver_layer.py page-object flow
+    data.load                  TestDataManager() (YAML load and spatial index)
+    api.extract_humidity       step_extract_humidity on a 9-day forecast payload
+    api.save_result            save_result_to_file
+    runner.orchestration       run_tests.run_behave_tests around a stand-in behave
+    startup.api                behave startup imports (startup_imports.py)
+
+Each run is stored as reports/benchmarks/<commit>.json and can be compared
+with the results of another commit (or a JSON file); --check exits with 1
+when a benchmark's median is slower than the baseline by more than
+--threshold.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --filter api. --rounds 50
+    python benchmarks/run_benchmarks.py --baseline main --check
+"""
+import argparse
+import contextlib
+import fnmatch
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "reports", "benchmarks")
+
+# A slowdown smaller than this is treated as noise however large the ratio
+MIN_DELTA_MS = 0.05
+
+
+class Benchmark(NamedTuple):
+    """A registered benchmark: func(env) yields the operation to time, then cleans up."""
+    name: str
+    func: Callable[["BenchEnvironment"], Iterator[Callable[[], object]]]
+    rounds: int
+    warmup: int
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, rounds: int = 30, warmup: int = 3):
+    """Registers a benchmark generator under name."""
+    def decorator(func):
+        BENCHMARKS[name] = Benchmark(name, func, rounds, warmup)
+        return func
+    return decorator
+
+
+class BenchEnvironment:
+    """Stand-ins shared by the benchmarks, created on first use."""
+
+    def __init__(self, platform_name: str = "android"):
+        self.platform = platform_name
+        self._server = None
+        self._driver = None
+        self._steps = None
+        self._tmpdir = None
+        self._environ: Dict[str, Optional[str]] = {}
+
+    @property
+    def tmpdir(self) -> str:
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.mkdtemp(prefix="benchmarks-")
+        return self._tmpdir
+
+    def driver(self):
+        """An AppDriver with a live session on the in-process mock Appium server."""
+        if self._driver is None:
+            from utils.app_driver import AppDriver
+            from utils.mock_appium_server import MockAppiumServer
+
+            self._server = MockAppiumServer(port=0).start()
+            for key, value in (("APPIUM_HOST", self._server.host), ("APPIUM_PORT", str(self._server.port))):
+                self._environ[key] = os.environ.get(key)
+                os.environ[key] = value
+            self._driver = AppDriver(platform=self.platform)
+            self._driver.start_driver()
+        return self._driver
+
+    def steps(self):
+        """features/steps/weather_api_steps.py, loaded the way behave loads it."""
+        if self._steps is None:
+            import importlib.util
+
+            path = os.path.join(PROJECT_ROOT, "features", "steps", "weather_api_steps.py")
+            spec = importlib.util.spec_from_file_location("weather_api_steps", path)
+            self._steps = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(self._steps)
+        return self._steps
+
+    def close(self):
+        if self._driver is not None:
+            self._driver.quit_driver()
+        if self._server is not None:
+            self._server.stop()
+        for key, value in self._environ.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def _working_directory(path: str):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+# -- Benchmarks ---------------------------------------------------------------
+
+@benchmark("driver.find_element", rounds=200, warmup=10)
+def bench_find_element(env):
+    from utils.page_objects import MainPage
+
+    driver = env.driver()
+    locator = MainPage(driver).CURRENT_TEMPERATURE
+    yield lambda: driver.find_element(locator)
+
+
+@benchmark("page.main_reads", rounds=50, warmup=5)
+def bench_main_reads(env):
+    from utils.page_objects import MainPage
+
+    main_page = MainPage(env.driver())
+
+    def read():
+        main_page.get_current_temperature()
+        main_page.get_humidity()
+        main_page.get_wind_speed()
+        main_page.get_weather_description()
+    yield read
+
+
+@benchmark("page.flow", rounds=10, warmup=1)
+def bench_page_flow(env):
+    from benchmarks.driver_layer import run_flow
+    from utils.mock_appium_server import load_ui
+
+    driver = env.driver()
+    app_id = load_ui()["app_package"]
+
+    def flow():
+        # The flow ends on the settings screen; relaunch to start each round on the main screen
+        driver.driver.execute_script("mobile: activateApp", {"appId": app_id})
+        run_flow(driver)
+    yield flow
+
+
+@benchmark("data.load", rounds=30)
+def bench_data_load(env):
+    from utils.test_data_manager import TestDataManager
+
+    yield TestDataManager
+
+
+@benchmark("api.extract_humidity", rounds=200, warmup=10)
+def bench_extract_humidity(env):
+    from utils.mock_hko_api import generate_forecast
+
+    steps = env.steps()
+    steps.api_context.response_data = generate_forecast(date.today())
+    context = SimpleNamespace()
+    # Time the parsing only; writing the result file is api.save_result
+    save_result_to_file = steps.save_result_to_file
+    steps.save_result_to_file = lambda context: None
+    try:
+        yield lambda: steps.step_extract_humidity(context)
+    finally:
+        steps.save_result_to_file = save_result_to_file
+        steps.reset_api_context()
+
+
+@benchmark("api.save_result", rounds=100, warmup=5)
+def bench_save_result(env):
+    from utils.mock_hko_api import generate_forecast
+
+    steps = env.steps()
+    forecast = generate_forecast(date.today())["weatherForecast"][1]
+    context = SimpleNamespace(api_url="http://localhost:3000/weatherAPI/opendata/weather.php?dataType=fnd",
+                              response_time=0.05, api_response=SimpleNamespace(status_code=200),
+                              relative_humidity="60% - 85%", target_date=forecast["forecastDate"],
+                              forecast_data=forecast)
+    with _working_directory(env.tmpdir):
+        yield lambda: steps.save_result_to_file(context)
+
+
+# Stand-in for behave: prints a pretty-formatter-like log and writes the
+# matching events, so the runner's streaming and event following are exercised
+_STAND_IN_BEHAVE = """
+import json, os, sys
+with open(os.environ["BEHAVE_EVENTS_FILE"], "w", encoding="utf-8") as events:
+    for index in range(20):
+        name = f"Stand-in scenario {index}"
+        print(f"  Scenario: {name}")
+        events.write(json.dumps({"event": "scenario_start", "name": name}) + "\\n")
+        for step in range(5):
+            print(f"    Given stand-in step {step} ... passed in 0.001s")
+            events.write(json.dumps({"event": "step_end", "name": f"step {step}", "status": "passed"}) + "\\n")
+        events.write(json.dumps({"event": "scenario_end", "name": name, "status": "passed"}) + "\\n")
+print("1 feature passed, 0 failed, 0 skipped")
+print("20 scenarios passed, 0 failed, 0 skipped")
+"""
+
+
+@benchmark("runner.orchestration", rounds=10, warmup=1)
+def bench_orchestration(env):
+    import run_tests
+
+    build_behave_command = run_tests.build_behave_command
+    run_tests.build_behave_command = lambda *args, **kwargs: [sys.executable, "-c", _STAND_IN_BEHAVE]
+    try:
+        with _working_directory(env.tmpdir):
+            yield lambda: run_tests.run_behave_tests(output_file=os.path.join(env.tmpdir, "report.txt"))
+    finally:
+        run_tests.build_behave_command = build_behave_command
+
+
+@benchmark("startup.api", rounds=5, warmup=1)
+def bench_startup(env):
+    from benchmarks.startup_imports import measure_startup
+
+    yield lambda: measure_startup("api", repeat=1)
+
+
+# -- Runner -------------------------------------------------------------------
+
+def run_benchmark(bench: Benchmark, env: BenchEnvironment, rounds: Optional[int] = None) -> Dict:
+    """
+    Runs one benchmark: warm-up rounds, then timed rounds.
+
+    Returns:
+        dict: Median, mean, min, max and standard deviation in milliseconds.
+    """
+    rounds = rounds or bench.rounds
+    timings: List[float] = []
+    operations = bench.func(env)
+    try:
+        # The code under test prints progress; keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            operation = next(operations)
+            for _ in range(bench.warmup):
+                operation()
+            for _ in range(rounds):
+                started = time.perf_counter()
+                operation()
+                timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        operations.close()
+    return {
+        "rounds": rounds,
+        "median_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.mean(timings), 4),
+        "min_ms": round(min(timings), 4),
+        "max_ms": round(max(timings), 4),
+        "stdev_ms": round(statistics.stdev(timings), 4) if len(timings) > 1 else 0.0,
+    }
+
+
+def run_suite(patterns: Optional[List[str]] = None, rounds: Optional[int] = None,
+              platform_name: str = "android") -> Dict[str, Dict]:
+    """
+    Runs the benchmarks whose name matches one of patterns (substring or glob).
+
+    Returns:
+        dict: Results by benchmark name.
+    """
+    selected = [bench for name, bench in BENCHMARKS.items()
+                if not patterns or any(pattern in name or fnmatch.fnmatch(name, pattern) for pattern in patterns)]
+    env = BenchEnvironment(platform_name)
+    results = {}
+    try:
+        # Some code under test resolves paths against the working directory
+        with _working_directory(PROJECT_ROOT):
+            for bench in selected:
+                print(f"  {bench.name} ...", flush=True)
+                results[bench.name] = run_benchmark(bench, env, rounds)
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            env.close()
+    return results
+
+
+def current_commit() -> Dict:
+    """The checked-out commit and whether the tree has uncommitted changes."""
+    def git(*args):
+        return subprocess.run(["git", *args], capture_output=True, text=True, cwd=PROJECT_ROOT).stdout.strip()
+
+    return {"commit": git("rev-parse", "HEAD") or "unknown", "dirty": bool(git("status", "--porcelain", "-uno"))}
+
+
+def save_results(results: Dict[str, Dict], results_dir: str = RESULTS_DIR) -> str:
+    """Stores a run as <results_dir>/<commit>.json and returns the path."""
+    record = dict(current_commit(), created=datetime.now().isoformat(timespec="seconds"),
+                  python=platform.python_version(), machine=platform.platform(), results=results)
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{record['commit']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+    return path
+
+
+def load_baseline(baseline: str, results_dir: str = RESULTS_DIR) -> Optional[Dict]:
+    """
+    Loads stored results by file path or git ref (branch, tag, commit).
+
+    Returns:
+        dict: The stored run, or None if the commit has no stored results.
+    """
+    if os.path.isfile(baseline):
+        path = baseline
+    else:
+        resolved = subprocess.run(["git", "rev-parse", "--verify", "--quiet", f"{baseline}^{{commit}}"],
+                                  capture_output=True, text=True, cwd=PROJECT_ROOT).stdout.strip()
+        path = os.path.join(results_dir, f"{resolved or baseline}.json")
+        if not os.path.isfile(path):
+            return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float = 0.2,
+            min_delta_ms: float = MIN_DELTA_MS) -> List[Dict]:
+    """
+    Compares medians with a baseline run.
+
+    A benchmark regresses when its median is more than threshold (a fraction)
+    slower than the baseline and the difference exceeds min_delta_ms.
+
+    Returns:
+        list: One dict per benchmark in both runs, with the ratio and a regressed flag.
+    """
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median_ms"], result["median_ms"]
+        ratio = after / before if before else float("inf")
+        rows.append({"name": name, "baseline_ms": before, "median_ms": after, "ratio": round(ratio, 3),
+                     "regressed": ratio > 1 + threshold and after - before > min_delta_ms})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare it with a baseline")
+    parser.add_argument("--filter", action="append", metavar="PATTERN",
+                        help="Run benchmarks whose name contains PATTERN or matches it as a glob (repeatable)")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    parser.add_argument("--rounds", type=int, help="Timed rounds per benchmark (default: per benchmark)")
+    parser.add_argument("--platform", choices=["android", "ios"], default="android")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="Where per-commit results are stored")
+    parser.add_argument("--no-save", action="store_true", help="Do not store the results")
+    parser.add_argument("--baseline", metavar="REF|PATH", help="Commit, branch or results file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown of the median as a fraction (default: 0.2)")
+    parser.add_argument("--check", action="store_true", help="Exit with 1 if a benchmark regressed")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, bench in BENCHMARKS.items():
+            print(f"{name:24s} {bench.rounds} rounds")
+        return 0
+
+    with contextlib.redirect_stdout(sys.stderr if args.json else sys.stdout):
+        print("Running benchmarks:")
+        results = run_suite(args.filter, args.rounds, args.platform)
+    if not results:
+        print(f"No benchmark matches {args.filter}", file=sys.stderr)
+        return 2
+    if not args.no_save:
+        path = save_results(results, args.results_dir)
+        print(f"Results saved to: {path}", file=sys.stderr if args.json else sys.stdout)
+
+    rows = []
+    if args.baseline:
+        stored = load_baseline(args.baseline, args.results_dir)
+        if stored is None:
+            print(f"No stored results for baseline '{args.baseline}', skipping the comparison", file=sys.stderr)
+        else:
+            rows = compare(results, stored["results"], args.threshold)
+
+    if args.json:
+        print(json.dumps({"results": results, "comparison": rows}, indent=2))
+    else:
+        print(f"\n{'benchmark':24s} {'median':>10s} {'min':>10s} {'stdev':>10s}")
+        for name, result in results.items():
+            print(f"{name:24s} {result['median_ms']:8.3f}ms {result['min_ms']:8.3f}ms {result['stdev_ms']:8.3f}ms")
+        if rows:
+            print(f"\nCompared with {args.baseline} (threshold {args.threshold:.0%}):")
+            for row in rows:
+                marker = "  REGRESSED" if row["regressed"] else ""
+                print(f"{row['name']:24s} {row['baseline_ms']:8.3f}ms -> {row['median_ms']:8.3f}ms "
+                      f"({row['ratio']:.2f}x){marker}")
+
+    if args.check and any(row["regressed"] for row in rows):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Behave Startup Import Benchmark.
+
+Loads what a behave process loads before the first scenario runs
+(features/environment.py and the step modules) in a fresh interpreter
+under `python -X importtime`, and reports the import cost.
+
+Heavy dependencies (Appium, Selenium, requests, NumPy) are imported at
+first use, so none of them should be loaded at startup; --check fails if
+one is.
+
+Usage:
+    python benchmarks/startup_imports.py                 # all profiles
+    python benchmarks/startup_imports.py --profile api --check
+    python benchmarks/startup_imports.py --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Files loaded at startup by each kind of behave run
+PROFILES = {
+    "api": ["features/environment.py", "features/steps/weather_api_steps.py"],
+    "app": ["features/environment.py", "features/steps/weather_api_steps.py",
+            "features/steps/weather_app_steps.py"],
+}
+
+# Packages that must only be imported when a step needs them
+DEFERRED_PACKAGES = ("appium", "selenium", "requests", "numpy")
+
+# Executed in the child interpreter: mirrors how behave puts the features
+# directory on sys.path and executes environment.py and the step files
+_LOADER = """
+import os, runpy, sys, json
+root, files = sys.argv[1], sys.argv[2:]
+sys.path[:0] = [os.path.join(root, "features"), root]
+os.chdir(root)
+for path in files:
+    name = os.path.splitext(os.path.basename(path))[0]
+    if "steps." + name in sys.modules:
+        continue  # already imported by environment.py, behave would not re-register it
+    runpy.run_path(os.path.join(root, path), run_name=name)
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """
+    Parses `-X importtime` output.
+
+    Returns:
+        list: One dict per import with module, self_us, cumulative_us and depth.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        name = name.rstrip()
+        imports.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            # One separator space, then two spaces per nesting level
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+        })
+    return imports
+
+
+def measure_startup(profile: str, repeat: int = 5, top: int = 10) -> Dict:
+    """
+    Measures the startup import cost of a profile.
+
+    Args:
+        profile (str): Key of PROFILES.
+        repeat (int): Number of fresh interpreters to run; wall times are reported as the median.
+        top (int): Number of slowest top-level imports to report.
+
+    Returns:
+        dict: Wall and import times in milliseconds, module count, the deferred
+            packages that were loaded anyway, and the slowest imports.
+    """
+    walls, import_totals = [], []
+    imports: List[Dict] = []
+    modules: List[str] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _LOADER, PROJECT_ROOT] + PROFILES[profile],
+            capture_output=True, text=True, cwd=PROJECT_ROOT)
+        walls.append((time.perf_counter() - started) * 1000)
+        if result.returncode != 0:
+            errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+            raise RuntimeError(f"Loading profile '{profile}' failed:\n" + "\n".join(errors[-10:]))
+        imports = parse_importtime(result.stderr)
+        modules = json.loads(result.stdout.strip().splitlines()[-1])
+        import_totals.append(sum(entry["self_us"] for entry in imports) / 1000)
+
+    top_level = sorted((entry for entry in imports if entry["depth"] == 0),
+                       key=lambda entry: entry["cumulative_us"], reverse=True)
+    return {
+        "profile": profile,
+        "wall_ms": round(statistics.median(walls), 1),
+        "import_ms": round(statistics.median(import_totals), 1),
+        "modules": len(modules),
+        "deferred_loaded": sorted({m.split(".")[0] for m in modules} & set(DEFERRED_PACKAGES)),
+        "top": [(entry["module"], round(entry["cumulative_us"] / 1000, 1)) for entry in top_level[:top]],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure behave startup import time")
+    parser.add_argument("--profile", choices=sorted(PROFILES), action="append",
+                        help="Profile to measure (repeatable, default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per profile (default: 5)")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with 1 if a deferred package is imported at startup")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure_startup(profile, args.repeat) for profile in args.profile or sorted(PROFILES)]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print(f"[{result['profile']}] wall {result['wall_ms']:.1f} ms, imports {result['import_ms']:.1f} ms, "
+                  f"{result['modules']} modules")
+            for module, cumulative_ms in result["top"]:
+                print(f"    {cumulative_ms:8.1f} ms  {module}")
+            if result["deferred_loaded"]:
+                print(f"    loaded at startup: {', '.join(result['deferred_loaded'])}")
+
+    if args.check and any(result["deferred_loaded"] for result in results):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,12 +5,9 @@ echo "启动Appium服务器..."
 appium --log appium.log --local-timezone &
 APPIUM_PID=$!
 
-# 等待Appium服务器启动
+# 等待Appium服务器就绪（轮询 /status，就绪即返回，最多等待 180 秒）
 echo "等待Appium服务器启动..."
-sleep 15
-
-# 检查Appium服务器状态
-if curl -f http://127.0.0.1:4723/status; then
+if python -m utils.appium_health --deadline "${APPIUM_STARTUP_DEADLINE:-180}"; then
     echo "Appium服务器启动成功"
 else
     echo "Appium服务器启动失败"
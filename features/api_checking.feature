@@ -1,4 +1,5 @@
 # language: en
+@api
 Feature: Hong Kong Observatory API Testing
   As a test engineer
   I want to test the Hong Kong Observatory weather API
@@ -9,4 +10,12 @@ Feature: Hong Kong Observatory API Testing
     Then I send request to the API
     And I check response status is successful
     And I extract the relative humidity for the day after tommorrow
-    And I display API response summary
\ No newline at end of file
+    And I display API response summary
+
+  @slo
+  Scenario: 9-day forecast API meets its response-time SLO
+    When I get API of 9-day forcast from Hong Kong Observatory
+    Then the p50 response time over 40 samples is below 1000 ms
+    And the p95 response time over 40 samples is below 2000 ms
+    And the p90 response time over 40 samples is below 2000 ms with 95% confidence
+    And the median connection setup time is below 1500 ms
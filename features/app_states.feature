@@ -0,0 +1,23 @@
+# language: en
+Feature: Start scenarios from a prepared app state
+  As a tester
+  I want scenarios to start in the app state they need
+  So that they do not spend time navigating there through the UI
+
+  Scenario: Read the 9-day forecast from a prepared state
+    Given the app is in the "forecast" state
+    Then I should see the 9-day forecast section displayed
+    And I should see weather information for 9 days
+    And each day should display temperature range
+    And each day should display humidity range
+    And I close the app
+
+  Scenario: Open the settings page from a prepared state
+    Given the app is in the "settings" state
+    Then the settings page should be displayed
+    And I close the app
+
+  Scenario: Start with a city selected
+    Given the app is in the "city_kowloon" state
+    Then I should see the current temperature information
+    And I close the app
@@ -7,10 +7,38 @@ import time
 import json
 from datetime import datetime
 from steps.weather_api_steps import reset_api_context
+from utils import events
+from utils import failure_manifest
+from utils.command_metrics import format_summary, get_command_metrics
+from utils.device_pool import get_device_pool, requirement_from_tags
+
+
+def _status_name(status):
+    """Returns a behave status (enum in behave 1.2.6, str earlier) as a string."""
+    return getattr(status, 'name', status)
 
 
 def before_all(context):
     """Executed before all tests start."""
+    # Structured progress events; console output is one subscriber and can be
+    # turned off with -D console=off or BEHAVE_CONSOLE=off (e.g. in CI)
+    context.events = events.create_event_bus(context.config.userdata)
+    context.events.publish(events.RUN_START, platform=context.config.userdata.get(
+        "platform", os.environ.get("APP_PLATFORM", "android")))
+
+    # Failed scenarios are collected for the rerun manifest written in after_all
+    context.failed_scenarios = []
+
+    # Runtime coverage for test impact analysis: -D impact_coverage=PATH or IMPACT_COVERAGE=PATH
+    coverage_path = context.config.userdata.get("impact_coverage", os.environ.get("IMPACT_COVERAGE"))
+    context.impact_coverage = None
+    if coverage_path:
+        from utils.impact_analysis import CoverageRecorder
+        context.impact_coverage = CoverageRecorder(coverage_path)
+
+    # WebDriver command counts and latencies, recorded by AppDriver's sessions
+    context.command_metrics = get_command_metrics()
+
     print("=" * 50)
     print("Starting My Observatory App Automation Tests")
     print(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -30,15 +58,39 @@ def before_all(context):
 
 def before_feature(context, feature):
     """Executed before each feature file."""
-    print(f"\nStarting feature: {feature.name}")
     context.feature_start_time = time.time()
+    context.events.publish(events.FEATURE_START, name=feature.name,
+                           location=str(feature.location), tags=list(feature.tags))
 
 
 def before_scenario(context, scenario):
     """Executed before each scenario."""
-    print(f"  - Starting scenario: {scenario.name}")
     context.scenario_start_time = time.time()
     context.scenario_name = scenario.name
+    context.events.publish(events.SCENARIO_START, name=scenario.name, feature=scenario.feature.name,
+                           location=str(scenario.location), tags=list(scenario.effective_tags))
+
+    if context.impact_coverage:
+        context.impact_coverage.start(f"{scenario.location.filename}:{scenario.location.line}")
+    context.command_metrics.start_scenario(scenario.name)
+
+    # @slo scenarios send dozens of requests; they only hit the public HKO API when asked
+    # to (-D slo=true), and otherwise run against an explicitly configured base URL
+    userdata = context.config.userdata
+    if "slo" in scenario.effective_tags and not (
+            userdata.getbool("slo") or userdata.get("hko_base_url") or os.environ.get("HKO_API_BASE_URL")):
+        scenario.skip("@slo scenario: set HKO_API_BASE_URL (e.g. mock) or pass -D slo=true")
+
+    # Devices are matched to the scenario's tags (@android11, @tablet, ...) and only
+    # acquired when a step opens the app; @api scenarios never hold one
+    context.device = None
+    context.device_requirement = requirement_from_tags(scenario.effective_tags)
+    device_pool = get_device_pool()
+    if context.device_requirement is not None and device_pool.devices:
+        platform = context.config.userdata.get("platform", os.environ.get("APP_PLATFORM", "android"))
+        requirement = context.device_requirement.with_default_platform(platform)
+        if not device_pool.candidates(requirement):
+            scenario.skip(f"No registered device matches {requirement.describe()}")
 
     # Reset API context for each scenario
     reset_api_context()
@@ -47,16 +99,29 @@ def before_scenario(context, scenario):
     context.api_response = None
     context.api_data = None
     context.relative_humidity = None
+    context.latency = None
 
 
 def after_scenario(context, scenario):
     """Executed after each scenario."""
+    if context.impact_coverage:
+        context.impact_coverage.stop()
     scenario_duration = time.time() - context.scenario_start_time
+    commands = context.command_metrics.end_scenario()
+    context.events.publish(events.SCENARIO_END, name=scenario.name, feature=scenario.feature.name,
+                           location=str(scenario.location), status=_status_name(scenario.status),
+                           duration=scenario_duration, commands=commands["commands"],
+                           device=context.device.name if context.device else None)
+    if commands["commands"]:
+        print(f"  - {format_summary(commands)}")
 
     # Save API test results to JSON file
-    if hasattr(context, 'api_response') and context.api_response:
+    if getattr(context, 'api_response', None) or getattr(context, 'latency', None):
         save_api_test_result(context, scenario)
 
+    if _status_name(scenario.status) == "failed":
+        context.failed_scenarios.append(failure_manifest.failure_entry(scenario))
+
     # Take a screenshot if the scenario fails and driver is available
     if scenario.status == "failed":
         if hasattr(context, 'driver') and context.driver:
@@ -65,6 +130,13 @@ def after_scenario(context, scenario):
             context.driver.take_screenshot(filename)
             print(f"  - Failure screenshot saved: {filename}")
 
+    # Give the device back as soon as the scenario is done with it
+    if context.device:
+        if getattr(context, 'driver', None):
+            context.driver.quit_driver()
+        get_device_pool().release(context.device)
+        print(f"  - Released device: {context.device.name}")
+
 
 def save_api_test_result(context, scenario):
     """Save API test results to JSON file."""
@@ -79,12 +151,15 @@ def save_api_test_result(context, scenario):
             'api_url': getattr(context, 'api_url', None),
             'status_code': getattr(context.api_response, 'status_code', None) if hasattr(context, 'api_response') else None,
             'response_time': getattr(context, 'response_time', None),
+            'latency': getattr(context, 'latency', None),
             'relative_humidity': getattr(context, 'relative_humidity', None),
             'target_date': str(getattr(context, 'target_date', None)),
         }
 
-        # Save to reports directory
-        filename = f"reports/api_test_{timestamp}.json"
+        # Save to reports directory; the scenario's file and line keep scenarios
+        # finishing in the same second from overwriting each other
+        feature_name = os.path.splitext(os.path.basename(scenario.location.filename))[0]
+        filename = f"reports/api_test_{timestamp}_{feature_name}_{scenario.location.line}.json"
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(result_data, f, indent=2, ensure_ascii=False)
 
@@ -97,8 +172,8 @@ def save_api_test_result(context, scenario):
 def after_feature(context, feature):
     """Executed after each feature file."""
     feature_duration = time.time() - context.feature_start_time
-    print(
-        f"Feature finished: {feature.name} (Duration: {feature_duration:.2f}s)")
+    context.events.publish(events.FEATURE_END, name=feature.name, location=str(feature.location),
+                           status=_status_name(feature.status), duration=feature_duration)
 
 
 def after_all(context):
@@ -112,50 +187,63 @@ def after_all(context):
     if hasattr(context, 'driver') and context.driver:
         context.driver.quit_driver()
 
-    # Print Behave built-in statistics (robust version)
+    # Persist the failure manifest for `run_tests.py --rerun-failed`
+    manifest_path = failure_manifest.get_manifest_path(context.config.userdata)
+    try:
+        failure_manifest.write_manifest(manifest_path, context.failed_scenarios)
+        if context.failed_scenarios:
+            print(f"Failure manifest saved: {manifest_path} ({len(context.failed_scenarios)} scenarios)")
+    except OSError as e:
+        print(f"Failed to save failure manifest: {e}")
+
+    if context.impact_coverage:
+        context.impact_coverage.save()
+        print(f"Impact coverage saved: {context.impact_coverage.path}")
+
+    # -D command_metrics=PATH or COMMAND_METRICS=PATH; a .prom path gets Prometheus text format
+    if context.command_metrics.run:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        metrics_path = context.config.userdata.get(
+            "command_metrics", os.environ.get("COMMAND_METRICS", f"reports/command_metrics_{timestamp}.json"))
+        try:
+            print(f"Command metrics saved: {context.command_metrics.write(metrics_path)}")
+        except OSError as e:
+            print(f"Failed to save command metrics: {e}")
+
+    # Publish Behave built-in statistics (robust version)
+    summary = None
     runner = getattr(context, '_runner', None)
     if runner and hasattr(runner, 'features'):
         features = runner.features
-        total_features = len(features)
-        total_scenarios = sum(len(f.scenarios) for f in features)
-        passed_scenarios = sum(
-            1 for f in features for s in f.scenarios if getattr(s.status, 'name', s.status) == "passed"
-        )
-        failed_scenarios = sum(
-            1 for f in features for s in f.scenarios if getattr(s.status, 'name', s.status) == "failed"
-        )
-        total_steps = sum(len(s.steps) for f in features for s in f.scenarios)
-        passed_steps = sum(
-            1 for f in features for s in f.scenarios for step in s.steps if getattr(step.status, 'name', step.status) == "passed"
-        )
-        failed_steps = sum(
-            1 for f in features for s in f.scenarios for step in s.steps if getattr(step.status, 'name', step.status) == "failed"
-        )
-        skipped_steps = sum(
-            1 for f in features for s in f.scenarios for step in s.steps if getattr(step.status, 'name', step.status) == "skipped"
-        )
-
-        print(f"Total features: {total_features}")
-        print(f"Total scenarios: {total_scenarios}")
-        print(f"Passed scenarios: {passed_scenarios}")
-        print(f"Failed scenarios: {failed_scenarios}")
-        print(f"Total steps: {total_steps}")
-        print(f"Passed steps: {passed_steps}")
-        print(f"Failed steps: {failed_steps}")
-        print(f"Skipped steps: {skipped_steps}")
+        scenarios = [s for f in features for s in f.scenarios]
+        steps = [step for s in scenarios for step in s.steps]
+        summary = {
+            'features': len(features),
+            'scenarios': len(scenarios),
+            'scenarios_passed': sum(1 for s in scenarios if _status_name(s.status) == "passed"),
+            'scenarios_failed': sum(1 for s in scenarios if _status_name(s.status) == "failed"),
+            'steps': len(steps),
+            'steps_passed': sum(1 for step in steps if _status_name(step.status) == "passed"),
+            'steps_failed': sum(1 for step in steps if _status_name(step.status) == "failed"),
+            'steps_skipped': sum(1 for step in steps if _status_name(step.status) == "skipped"),
+        }
+    context.events.publish(events.RUN_END, summary=summary)
+    context.events.close()
 
 
 def before_step(context, step):
     """Executed before each step."""
-    print(f"    - Executing step: {step.name}")
+    context.step_start_time = time.monotonic()
+    context.step_commands = context.command_metrics.total
+    context.events.publish(events.STEP_START, name=step.name, keyword=step.keyword,
+                           location=str(step.location))
 
 
 def after_step(context, step):
     """Executed after each step."""
-    if step.status == "failed":
-        print(f"    - Step failed: {step.name}")
-        # More failure handling logic can be added here
-    elif step.status == "passed":
-        print(f"    - Step passed: {step.name}")
-    else:
-        print(f"    - Step skipped: {step.name}")
+    # More failure handling logic can be added here
+    context.events.publish(events.STEP_END, name=step.name, keyword=step.keyword,
+                           location=str(step.location), status=_status_name(step.status),
+                           duration=time.monotonic() - context.step_start_time,
+                           commands=context.command_metrics.total - context.step_commands,
+                           error=step.error_message if _status_name(step.status) == "failed" else None)
@@ -5,8 +5,8 @@ Hong Kong Observatory API Definition
 ========================
 """
 
-import requests
 import json
+import os
 from datetime import datetime, timedelta
 from behave import when, then
 import time
@@ -22,6 +22,7 @@ class WeatherAPIContext:
         self.status_code = None
         self.response_data = None
         self.relative_humidity = None
+        self.latency_reports = {}
 
     def reset(self):
         """reset context"""
@@ -29,17 +30,39 @@ class WeatherAPIContext:
         self.status_code = None
         self.response_data = None
         self.relative_humidity = None
+        self.latency_reports = {}
 
 
 # Global context
 api_context = WeatherAPIContext()
 
+HKO_BASE_URL = "https://data.weather.gov.hk"
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "config", "config.yaml")
+
+
+def get_hko_base_url(context):
+    """
+    Base URL of the HKO open data API.
+
+    Taken from -D hko_base_url=..., then $HKO_API_BASE_URL, then the public API.
+    The value "mock" selects http_config.api_services.mock_api from
+    config/config.yaml (the local mock, python -m utils.mock_hko_api).
+    """
+    base_url = context.config.userdata.get("hko_base_url") or os.environ.get("HKO_API_BASE_URL") or HKO_BASE_URL
+    if base_url == "mock":
+        import yaml
+
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f)
+        base_url = config["http_config"]["api_services"]["mock_api"]["base_url"]
+    return base_url.rstrip("/")
+
 
 @when('I get API of 9-day forcast from Hong Kong Observatory')
 def step_get_api_url(context):
     print("Setting the API URL")
 
-    api_context.base_url = "https://data.weather.gov.hk"
+    api_context.base_url = get_hko_base_url(context)
     api_context.api_url = f"{api_context.base_url}/weatherAPI/opendata/weather.php"
 
     params = {
@@ -62,6 +85,9 @@ def step_get_api_url(context):
 @then('I send request to the API')
 def step_send_request(context):
     """Step 2: Send HTTP request"""
+    # Imported here so behave startup does not pay for requests until an API step runs
+    import requests
+
     print("Sending HTTP request to Hong Kong Observatory API")
 
     try:
@@ -102,6 +128,81 @@ def step_send_request(context):
         raise AssertionError(f"API request failed: {e}")
 
 
+def get_latency_report(context, samples):
+    """
+    Latency samples of the current API URL, measured once per scenario and sample count.
+
+    Warm-up requests (-D latency_warmup=N, default a tenth of the samples, at least 3)
+    open the pooled connection first; -D latency_interval=SECONDS spaces the requests
+    out for rate-limited APIs.
+    """
+    from utils.latency_sampler import LatencySampler
+
+    key = (api_context.full_url, samples)
+    if key not in api_context.latency_reports:
+        warmup = int(context.config.userdata.get("latency_warmup", max(3, samples // 10)))
+        interval = float(context.config.userdata.get("latency_interval", 0))
+        print(f"Sampling {api_context.full_url}: {warmup} warm-up + {samples} measured requests")
+        report = LatencySampler(api_context.full_url).run(samples, warmup, interval)
+        api_context.latency_reports[key] = report
+        context.latency = report.summary()
+        print(f"Latency summary: {json.dumps(context.latency)}")
+        if report.errors:
+            first = report.errors[0]
+            raise AssertionError(f"{len(report.errors)} of {samples} latency samples failed, "
+                                 f"e.g. {first.error or f'status code {first.status}'}")
+    return api_context.latency_reports[key]
+
+
+def check_response_time(context, percentile, samples, limit, confidence=None):
+    """Asserts a server response-time percentile, or its one-sided upper confidence bound, against a limit in ms."""
+    if getattr(api_context, 'full_url', None) is None:
+        raise AssertionError("No API URL set up")
+    report = get_latency_report(context, samples)
+    try:
+        estimate = report.percentile(percentile, confidence=(confidence or 95) / 100, one_sided=bool(confidence))
+    except ValueError as e:
+        raise AssertionError(str(e))
+    print(f"Server response time: {estimate.describe()}")
+
+    measured = estimate.upper if confidence else estimate.value
+    if confidence and not estimate.exact:
+        raise AssertionError(f"{samples} samples are too few to bound p{percentile:g} with {confidence}% "
+                             f"confidence: {estimate.describe()}")
+    if measured * 1000 >= limit:
+        bound = f"{confidence}% upper bound of " if confidence else ""
+        raise AssertionError(f"{bound}p{percentile:g} response time {measured * 1000:.1f} ms "
+                             f"is not below {limit:g} ms ({estimate.describe()})")
+
+
+@then('the p{percentile:g} response time over {samples:d} samples is below {limit:g} ms')
+def step_check_response_time(context, percentile, samples, limit):
+    """Latency SLO on the point estimate of a percentile."""
+    check_response_time(context, percentile, samples, limit)
+
+
+@then('the p{percentile:g} response time over {samples:d} samples is below {limit:g} ms '
+      'with {confidence:d}% confidence')
+def step_check_response_time_confidence(context, percentile, samples, limit, confidence):
+    """Latency SLO on the upper confidence bound, so noise cannot pass a regression."""
+    check_response_time(context, percentile, samples, limit, confidence)
+
+
+@then('the median connection setup time is below {limit:g} ms')
+def step_check_connection_setup(context, limit):
+    """DNS + TCP connect + TLS handshake, measured on fresh connections after the last sampling."""
+    if not api_context.latency_reports:
+        raise AssertionError("No latency samples taken yet")
+    report = list(api_context.latency_reports.values())[-1]
+    if not report.connections:
+        raise AssertionError(f"Could not open a direct connection to {report.url}")
+    setup = report.summary()["connection"]
+    print(f"Connection setup (median): dns {setup['dns']} ms, connect {setup['connect']} ms, "
+          f"tls {setup['tls']} ms")
+    if setup["total"] >= limit:
+        raise AssertionError(f"Connection setup {setup['total']} ms is not below {limit:g} ms")
+
+
 @then('I check response status is successful')
 def step_check_status(context):
     print("Checking API response status code")
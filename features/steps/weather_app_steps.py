@@ -4,15 +4,50 @@ Step implementations for the My Observatory app tests.
 from behave import given, when, then, step
 from utils.app_driver import AppDriver
 from utils.test_data_manager import TestDataManager
-from utils.page_objects import MainPage, SearchPage, MenuPage, SettingsPage
+from utils.page_objects import MainPage, SearchPage, MenuPage, SettingsPage, ForecastPage
+from utils.app_states import AppStatePreparer
+from utils.device_pool import DeviceError, DeviceRequirement, get_device_pool
+import os
 import time
 
 
+def get_target_platform(context):
+    """Gets the platform under test: `behave -D platform=ios`, else $APP_PLATFORM, else android."""
+    return context.config.userdata.get("platform", os.environ.get("APP_PLATFORM", "android"))
+
+
+def start_app_driver(context):
+    """
+    Starts an AppDriver session for the scenario.
+    
+    With devices in config/devices.yaml, waits for a free device that matches
+    the scenario's tags (see before_scenario); after_scenario releases it.
+    Opening the app again within the scenario restarts the session on the
+    same device. Without devices, uses the platform's config.yaml capabilities.
+    """
+    requirement = getattr(context, 'device_requirement', DeviceRequirement())
+    if requirement is None:
+        raise DeviceError("API-only (@api) scenarios do not get a device")
+    if getattr(context, 'driver', None) is not None:
+        context.driver.quit_driver()
+    
+    device = getattr(context, 'device', None)
+    pool = get_device_pool()
+    if device is None and pool.devices:
+        requirement = requirement.with_default_platform(get_target_platform(context))
+        device = pool.acquire(requirement, owner=getattr(context, 'scenario_name', ''))
+        context.device = device
+        print(f"Using device {device.describe()}")
+    
+    context.driver = AppDriver(platform=get_target_platform(context), device=device)
+    context.driver.start_driver()
+    return context.driver
+
+
 @given('I have opened the My Observatory app')
 def step_open_weather_app(context):
     """Opens the My Observatory app."""
-    context.driver = AppDriver(platform="android")
-    context.driver.start_driver()
+    start_app_driver(context)
     context.main_page = MainPage(context.driver)
     context.test_data = TestDataManager()
     
@@ -20,6 +55,23 @@ def step_open_weather_app(context):
     time.sleep(3)
 
 
+@given('the app is in the "{state_name}" state')
+def step_app_in_state(context, state_name):
+    """Puts the app directly into a named state from config/app_states.yaml."""
+    if getattr(context, 'driver', None) is None or context.driver.driver is None:
+        start_app_driver(context)
+        context.test_data = TestDataManager()
+    
+    elapsed = AppStatePreparer(context.driver).prepare(state_name)
+    print(f"App state '{state_name}' prepared in {elapsed:.2f}s")
+    
+    context.main_page = MainPage(context.driver)
+    context.search_page = SearchPage(context.driver)
+    context.menu_page = MenuPage(context.driver)
+    context.settings_page = SettingsPage(context.driver)
+    context.forecast_page = ForecastPage(context.driver)
+
+
 @given('I am on the main page')
 def step_on_main_page(context):
     """Confirms that the current page is the main page."""
@@ -72,6 +124,13 @@ def step_click_settings_button(context):
     time.sleep(2)
 
 
+@when('I click the "{tab_name}" tab')
+def step_click_tab(context, tab_name):
+    """Clicks a tab on the main page, e.g. "9-Day Forecast"."""
+    context.main_page.click_tab(tab_name)
+    context.forecast_page = ForecastPage(context.driver)
+
+
 @when('I toggle the temperature unit')
 def step_toggle_temperature_unit(context):
     """Toggles the temperature unit setting."""
@@ -115,10 +174,7 @@ def step_see_wind_speed_info(context):
     """Verifies that the wind speed information is displayed."""
     wind_speed = context.main_page.get_wind_speed()
     assert wind_speed is not None, "Wind speed information not found."
-    wind_range = context.test_data.get_expected_weather_range().get("wind_speed_range", {})
-    min_wind = wind_range.get("min", 0)
-    max_wind = wind_range.get("max", 100)
-    assert min_wind <= wind_speed <= max_wind, f"Wind speed value {wind_speed} is not within a reasonable range."
+    assert context.test_data.validate_wind_speed(wind_speed), f"Wind speed value {wind_speed} is not within a reasonable range."
 
 
 @then('the search page should be displayed')
@@ -141,6 +197,55 @@ def step_settings_page_should_display(context):
     assert context.driver.is_element_present(context.settings_page.TEMPERATURE_UNIT_TOGGLE), "Temperature unit toggle not found, not on the settings page."
 
 
+@then('I should see the 9-day forecast section displayed')
+def step_forecast_section_displayed(context):
+    """Verifies that the 9-day forecast list is displayed."""
+    assert context.forecast_page.is_displayed(), "Forecast list not found, not on the 9-day forecast page."
+
+
+@then('I should see weather information for {day_count:d} days')
+def step_see_forecast_days(context, day_count):
+    """Reads all forecast rows at once and verifies their number."""
+    context.forecast_days = context.forecast_page.get_forecast_days()
+    assert len(context.forecast_days) == day_count, \
+        f"Expected {day_count} forecast days, found {len(context.forecast_days)}."
+
+
+def _forecast_days(context):
+    """Forecast rows read by an earlier step, or read now."""
+    if getattr(context, 'forecast_days', None) is None:
+        context.forecast_days = context.forecast_page.get_forecast_days()
+    return context.forecast_days
+
+
+@then('each day should display temperature range')
+def step_each_day_temperature_range(context):
+    """Verifies that every forecast day shows a valid temperature range."""
+    days = _forecast_days(context)
+    missing = [day.date for day in days if day.temperature is None]
+    assert not missing, f"No temperature range for: {', '.join(missing)}"
+    inverted = [day.date for day in days if day.temperature.low > day.temperature.high]
+    assert not inverted, f"Minimum temperature above maximum for: {', '.join(inverted)}"
+    result = context.test_data.validate_temperatures(
+        [value for day in days for value in (day.temperature.low, day.temperature.high)])
+    assert result.all_valid, \
+        f"Temperature out of range for: {', '.join(sorted({days[i // 2].date for i in result.invalid_indices}))}"
+
+
+@then('each day should display humidity range')
+def step_each_day_humidity_range(context):
+    """Verifies that every forecast day shows a valid humidity range."""
+    days = _forecast_days(context)
+    missing = [day.date for day in days if day.humidity is None]
+    assert not missing, f"No humidity range for: {', '.join(missing)}"
+    inverted = [day.date for day in days if day.humidity.low > day.humidity.high]
+    assert not inverted, f"Minimum humidity above maximum for: {', '.join(inverted)}"
+    result = context.test_data.validate_humidities(
+        [value for day in days for value in (day.humidity.low, day.humidity.high)])
+    assert result.all_valid, \
+        f"Humidity out of range for: {', '.join(sorted({days[i // 2].date for i in result.invalid_indices}))}"
+
+
 @step('I close the app')
 def step_close_app(context):
     """Closes the application."""
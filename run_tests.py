@@ -6,18 +6,31 @@ import os
 import sys
 import subprocess
 import argparse
+import threading
 from datetime import datetime
 
 
-def run_behave_tests(tags=None, format_type="pretty", parallel=False, output_file=None):
+# Reports a run can write besides its console output, all from the same behave
+# process: text is the console output teed to a file, the others are extra
+# formatters with their own output
+REPORT_FORMATS = ("text", "json", "junit", "allure")
+
+ALLURE_FORMATTER = "allure_behave.formatter:AllureFormatter"
+
+
+def build_behave_command(tags=None, format_type="pretty", parallel=False, output_file=None,
+                         platform=None, paths=None, reports=None):
     """
-    Run behave tests
+    Build the behave command line
     
     Args:
         tags (str): Tag filter
         format_type (str): Output format
         parallel (bool): Whether to run in parallel
         output_file (str): Output file path
+        platform (str): Target platform ("android" or "ios")
+        paths (list): Feature files or directories to run (default: all)
+        reports (dict): Extra report outputs by name ("json", "junit", "allure") to path
     """
     cmd = ["behave"]
     
@@ -25,6 +38,10 @@ def run_behave_tests(tags=None, format_type="pretty", parallel=False, output_fil
     if tags:
         cmd.extend(["--tags", tags])
     
+    # Add target platform
+    if platform:
+        cmd.extend(["-D", f"platform={platform}"])
+    
     # Add format
     cmd.extend(["--format", format_type])
     
@@ -32,116 +49,527 @@ def run_behave_tests(tags=None, format_type="pretty", parallel=False, output_fil
     if parallel:
         cmd.extend(["--processes", "2"])
     
-    # Add output file
+    # Add output file; with extra formatters the main one still needs an
+    # explicit output ("-" is stdout), as behave pairs formats and outfiles by position
     if output_file:
         cmd.extend(["--outfile", output_file])
+    elif reports:
+        cmd.extend(["--outfile", "-"])
+    
+    # Add report formatters, fed by the same run
+    reports = reports or {}
+    if "json" in reports:
+        cmd.extend(["--format", "json", "--outfile", reports["json"]])
+    if "allure" in reports:
+        # Allure writes one result file per scenario as soon as it finishes
+        cmd.extend(["--format", ALLURE_FORMATTER, "--outfile", reports["allure"]])
+    if "junit" in reports:
+        cmd.extend(["--junit", "--junit-directory", reports["junit"]])
     
     # Add verbose output
     cmd.append("--verbose")
     
+    if paths:
+        cmd.extend(paths)
+    
+    return cmd
+
+
+def new_events_file(suffix=""):
+    """Return a fresh path for a run's JSONL event stream"""
+    os.makedirs("reports", exist_ok=True)
+    # Microseconds and pid keep runs started in the same second apart; the sink appends
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    return os.path.abspath(f"reports/events_{timestamp}_{os.getpid()}{suffix}.jsonl")
+
+
+def report_paths(reports):
+    """
+    Return the output path of each requested report for a new run
+    
+    Args:
+        reports (iterable): Report names from REPORT_FORMATS
+    
+    Returns:
+        dict: Report name to file or directory path. Allure is left out when
+            allure-behave is not installed.
+    """
+    import importlib.util
+    
+    # Microseconds keep consecutive runs (e.g. rerun attempts) from sharing a file
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    paths = {
+        "text": f"reports/test_report_{timestamp}.txt",
+        "json": f"reports/behave_{timestamp}.json",
+        "junit": "reports/junit",
+        "allure": "reports/allure-results",
+    }
+    selected = {}
+    for name in reports or ():
+        if name not in paths:
+            raise ValueError(f"Unknown report '{name}', expected one of: {', '.join(REPORT_FORMATS)}")
+        if name == "allure" and importlib.util.find_spec("allure_behave") is None:
+            print("allure-behave is not installed (pip install allure-behave), skipping the Allure report.")
+            continue
+        selected[name] = paths[name]
+    os.makedirs("reports", exist_ok=True)
+    for name in ("junit", "allure"):
+        if name in selected:
+            os.makedirs(selected[name], exist_ok=True)
+    return selected
+
+
+def run_behave_tests(tags=None, format_type="pretty", parallel=False, output_file=None, platform=None,
+                     paths=None, extra_env=None, reports=None):
+    """
+    Run behave tests
+    
+    All requested reports come from this one behave run: each extra
+    formatter writes its own file while the console formatter streams.
+    
+    Args:
+        tags (str): Tag filter
+        format_type (str): Output format
+        parallel (bool): Whether to run in parallel
+        output_file (str): Output file path
+        platform (str): Target platform ("android" or "ios")
+        paths (list): Feature files, directories or "path:line" locations to run
+        extra_env (dict): Extra environment variables for behave
+        reports (iterable): Reports to write, from REPORT_FORMATS
+    """
+    from utils.output_stream import EventFollower, ProgressTracker, stream_process
+    
+    outputs = report_paths(reports)
+    output_file = output_file or outputs.pop("text", None)
+    
+    # Formatter output goes to stdout and is teed into the report file, so the
+    # console shows progress live and the report holds the complete output.
+    cmd = build_behave_command(tags, format_type, parallel, platform=platform, paths=paths, reports=outputs)
+    
     print(f"Executing command: {' '.join(cmd)}")
+    if output_file:
+        print(f"Teeing output to: {output_file}")
     
+    # Progress comes from the structured event stream written by the hooks,
+    # so it keeps working when console output is turned off
+    events_file = new_events_file()
+    env = dict(os.environ, BEHAVE_EVENTS_FILE=events_file, **(extra_env or {}))
+    tracker = ProgressTracker()
+    follower = EventFollower(events_file, tracker).start()
     try:
-        # On Windows, use system default encoding to avoid UTF-8 decoding errors
-        if os.name == 'nt':  # Windows
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True,
-                                    encoding='gbk', errors='ignore')
-        else:
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True,
-                                    encoding='utf-8', errors='ignore')
-
+        returncode = stream_process(cmd, tee_path=output_file, env=env)
+    finally:
+        follower.stop()
+    print(tracker.final_message())
+    print(f"Events written to: {events_file}")
+    for name, path in outputs.items():
+        print(f"{name} report: {path}")
+    if "allure" in outputs:
+        print(f"Run 'allure serve {outputs['allure']}' to view the Allure report.")
+    archive_run(events_file)
+    
+    if returncode == 0:
         print("Tests executed successfully!")
-        if result.stdout:
-            print("Output:")
-            print(result.stdout)
         return True
+    
+    print(f"Test execution failed: behave exited with code {returncode}")
+    for failed_step in tracker.failed_steps:
+        print(f"  - Failed step: {failed_step}")
+    return False
+
+
+def archive_run(events_file):
+    """Append a finished run's results to the run archive (reports/run_archive.sqlite)"""
+    import sqlite3
+    from utils.run_archive import RunArchive
+    
+    if not os.path.exists(events_file):
+        return
+    try:
+        with RunArchive() as archive:
+            count = archive.ingest(events_file, force=True)
+        if count:
+            print(f"Archived {count} scenario results: python -m utils.run_archive runs")
+    except (sqlite3.Error, OSError) as e:
+        print(f"Failed to archive the run: {e}")
+
+
+def rerun_failed_tests(manifest_path=None, attempts=1, platform=None, reports=None):
+    """
+    Rerun only the scenarios recorded in the failure manifest
+    
+    Each attempt runs every recorded location in a single behave process
+    and writes its own manifest, so per-scenario outcomes can be scored
+    for flakiness. Afterwards the main manifest holds the scenarios that
+    still failed on the last attempt, and reports/flakiness.json holds the
+    per-scenario scores. An attempt that ends without writing its manifest
+    (behave crashed) counts as failed for every scenario, and the main
+    manifest is then left as it was.
+    
+    Args:
+        manifest_path (str): Failure manifest to read (default: reports/failed_scenarios.json)
+        attempts (int): How many times to rerun the failed scenarios
+        platform (str): Target platform ("android" or "ios")
+        reports (iterable): Reports to write for each attempt, from REPORT_FORMATS
+    """
+    import json
+    from utils import failure_manifest
+    
+    manifest_path = manifest_path or failure_manifest.get_manifest_path()
+    failures = failure_manifest.read_manifest(manifest_path)
+    if not failures:
+        print(f"No failed scenarios recorded in {manifest_path}, nothing to rerun.")
+        return True
+    
+    entries = {entry["location"]: entry for entry in failures}
+    locations = list(entries)
+    print(f"Rerunning {len(locations)} failed scenarios, {attempts} time(s):")
+    for location in locations:
+        print(f"  - {location} ({entries[location]['scenario']})")
+    
+    fail_counts = {location: 0 for location in locations}
+    still_failing = []
+    incomplete = False
+    for attempt in range(1, attempts + 1):
+        print(f"\n--- Rerun attempt {attempt}/{attempts} ---")
+        attempt_manifest = os.path.abspath(f"reports/rerun_{attempt}_failed_scenarios.json")
+        # A manifest left over from an earlier rerun must not stand in for this attempt
+        if os.path.exists(attempt_manifest):
+            os.remove(attempt_manifest)
+        passed = run_behave_tests(platform=platform, paths=locations, reports=reports,
+                                  extra_env={"FAILURE_MANIFEST": attempt_manifest})
+        if os.path.exists(attempt_manifest) or passed:
+            failed_now = {entry["location"] for entry in failure_manifest.read_manifest(attempt_manifest)}
+        else:
+            # behave crashed before after_all wrote the manifest: nothing is known to pass
+            print(f"Attempt {attempt} wrote no failure manifest, counting every scenario as failed")
+            failed_now = set(locations)
+            incomplete = True
+        for location in locations:
+            if location in failed_now:
+                fail_counts[location] += 1
+        still_failing = [entries[location] for location in locations if location in failed_now]
+    
+    scores = []
+    print("\nRerun results:")
+    for location in locations:
+        failed = fail_counts[location]
+        score = failure_manifest.flakiness_score(attempts, failed)
+        verdict = "passing" if failed == 0 else "failing" if failed == attempts else "flaky"
+        scores.append({**entries[location], "runs": attempts, "failures": failed,
+                       "flakiness": score, "verdict": verdict})
+        print(f"  - {location}: {attempts - failed}/{attempts} passed, flakiness {score:.2f} ({verdict})")
+    
+    with open("reports/flakiness.json", "w", encoding="utf-8") as f:
+        json.dump(scores, f, indent=2, ensure_ascii=False)
+    print(f"Flakiness report saved: reports/flakiness.json")
+    if incomplete:
+        print(f"Keeping {manifest_path}: not every attempt completed")
+        return False
+    failure_manifest.write_manifest(manifest_path, still_failing)
+    
+    return not still_failing
+
+
+def run_impacted_tests(since, tags=None, platform=None, reports=None):
+    """
+    Run only the scenarios affected by changes since a git revision
+    
+    Uses the static scenario index (plus runtime coverage recorded with
+    IMPACT_COVERAGE, if present) from utils/impact_analysis.py.
+    
+    Args:
+        since (str): Git revision to diff against, e.g. "origin/main"
+        tags (str): Tag filter
+        platform (str): Target platform ("android" or "ios")
+        reports (iterable): Reports to write, from REPORT_FORMATS
+    """
+    from utils.impact_analysis import ALL, ImpactIndex, git_changed_lines
+    
+    try:
+        changes = git_changed_lines(since)
     except subprocess.CalledProcessError as e:
-        print(f"Test execution failed: {e}")
-        if e.stdout:
-            print("Standard Output:")
-            print(e.stdout)
-        if e.stderr:
-            print("Error Output:")
-            print(e.stderr)
+        print(f"git diff against {since} failed: {e.stderr.strip() if e.stderr else e}")
         return False
-    except UnicodeDecodeError as e:
-        print(f"Encoding error: {e}")
-        print("Trying to rerun with a different encoding...")
-        try:
-            # Try not to capture output, just print to console
-            result = subprocess.run(cmd, check=True)
-            print("Tests executed successfully!")
-            return True
-        except subprocess.CalledProcessError as e:
-            print(f"Test execution failed: {e}")
-            return False
+    
+    index = ImpactIndex.build()
+    selected, reasons = index.affected_by(changes)
+    print(f"{len(changes)} files changed since {since}")
+    for reason in reasons:
+        print(f"  - {reason}")
+    
+    if ALL in selected:
+        print("Changes affect every scenario, running the full suite.")
+        return run_behave_tests(tags=tags, platform=platform, reports=reports)
+    if not selected:
+        print("No scenarios are affected by the changes, nothing to run.")
+        return True
+    
+    locations = sorted(selected)
+    print(f"Running {len(locations)} of {len(index.scenarios)} scenarios.")
+    return run_behave_tests(tags=tags, platform=platform, paths=locations, reports=reports)
 
 
-def run_smoke_tests():
+def run_smoke_tests(reports=None):
     """Run smoke tests"""
     print("Running smoke tests...")
-    return run_behave_tests(tags="@smoke", format_type="pretty")
+    return run_behave_tests(tags="@smoke", format_type="pretty", reports=reports)
 
 
-def run_regression_tests():
+def run_regression_tests(reports=None):
     """Run regression tests"""
     print("Running regression tests...")
-    return run_behave_tests(format_type="pretty")
+    return run_behave_tests(format_type="pretty", reports=reports)
+
+
+def discover_feature_files(features_dir="features"):
+    """Return all feature files under the features directory, sorted"""
+    feature_files = []
+    for root, _, files in os.walk(features_dir):
+        feature_files.extend(os.path.join(root, f) for f in files if f.endswith(".feature"))
+    return sorted(feature_files)
 
 
-def run_tests_with_report():
-    """Run tests and generate a report"""
-    print("Running tests and generating a report...")
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = f"reports/test_report_{timestamp}.txt"
+def run_with_managed_servers(server_count, tags=None, format_type="pretty", platform=None,
+                             base_port=4723, appium_command="appium"):
+    """
+    Run tests against Appium servers started and supervised by this script
+    
+    One Appium server is started per worker on its own port, with its own
+    systemPort/chromedriverPort ranges. Feature files are split round-robin
+    across the workers, which run as concurrent behave processes. Crashed
+    servers are restarted by the pool while the workers keep running.
+    Each worker writes its own failure manifest; they are merged into the
+    main one for --rerun-failed when all workers are done.
+    
+    Args:
+        server_count (int): Number of Appium servers / behave workers
+        tags (str): Tag filter
+        format_type (str): Output format
+        platform (str): Target platform ("android" or "ios")
+        base_port (int): Port of the first Appium server
+        appium_command (str): Command used to launch Appium
+    """
+    from utils import failure_manifest
+    from utils.appium_server import AppiumServerPool
+    from utils.output_stream import EventFollower, ProgressTracker, stream_process
     
-    # Ensure the reports directory exists
+    feature_files = discover_feature_files()
+    if not feature_files:
+        print("No feature files found.")
+        return False
+    server_count = min(server_count, len(feature_files))
+    shards = [feature_files[i::server_count] for i in range(server_count)]
     os.makedirs("reports", exist_ok=True)
     
-    return run_behave_tests(
-        format_type="pretty",
-        output_file=output_file
-    )
+    with AppiumServerPool(server_count, base_port=base_port, command=appium_command) as pool:
+        console_lock = threading.Lock()
+        results = {}
+        
+        def run_worker(index, shard):
+            cmd = build_behave_command(tags, format_type, platform=platform, paths=shard)
+            env = dict(os.environ, **pool.worker_env(index))
+            log_path = f"reports/worker_{index}.txt"
+            with console_lock:
+                print(f"Worker {index} (Appium port {env['APPIUM_PORT']}): {' '.join(cmd)}")
+            env["BEHAVE_EVENTS_FILE"] = new_events_file(f"_w{index}")
+            # Concurrent workers would overwrite each other's failures in the shared manifest
+            env["FAILURE_MANIFEST"] = os.path.abspath(f"reports/worker_{index}_failed_scenarios.json")
+            if os.path.exists(env["FAILURE_MANIFEST"]):
+                os.remove(env["FAILURE_MANIFEST"])
+            tracker = ProgressTracker(label=f"w{index}")
+            follower = EventFollower(env["BEHAVE_EVENTS_FILE"], tracker, console_lock=console_lock).start()
+            try:
+                returncode = stream_process(cmd, tee_path=log_path, env=env,
+                                            prefix=f"[w{index}] ", console_lock=console_lock)
+            finally:
+                follower.stop()
+            results[index] = (returncode, tracker, log_path, env["FAILURE_MANIFEST"], env["BEHAVE_EVENTS_FILE"])
+        
+        threads = [threading.Thread(target=run_worker, args=(index, shard))
+                   for index, shard in enumerate(shards)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        success = True
+        failures = []
+        for index in sorted(results):
+            returncode, tracker, log_path, worker_manifest, events_file = results[index]
+            status = "passed" if returncode == 0 else f"failed (exit code {returncode})"
+            print(f"Worker {index} {status}, output: {log_path}")
+            print(tracker.final_message())
+            success = success and returncode == 0
+            # Archived one worker at a time, after all of them finished
+            archive_run(events_file)
+            if os.path.exists(worker_manifest) or returncode == 0:
+                failures.extend(failure_manifest.read_manifest(worker_manifest))
+            else:
+                # The worker died before after_all: rerun its whole shard
+                failures.extend({"location": path, "feature": path, "scenario": "(all scenarios)", "tags": []}
+                                for path in shards[index])
+        manifest_path = failure_manifest.get_manifest_path()
+        failure_manifest.write_manifest(manifest_path, failures)
+        if failures:
+            print(f"Failure manifest saved: {manifest_path} ({len(failures)} entries)")
+        
+        restarts = sum(server.restarts for server in pool.servers)
+        if restarts:
+            print(f"Appium servers restarted during the run: {restarts}")
+    
+    return success
 
 
-def run_tests_with_allure():
-    """Run tests and generate an Allure report"""
-    print("Running tests and generating an Allure report...")
-    
-    # Ensure the allure results directory exists
-    os.makedirs("reports/allure-results", exist_ok=True)
+def select_scenarios(tags=None):
+    """
+    Return the scenarios matching a tag filter, in file order
     
-    cmd = [
-        "behave",
-        "--format=allure_behave.formatter:AllureFormatter",
-        "--outfile=reports/allure-results"
-    ]
+    Args:
+        tags (str): Tag filter as given to behave --tags, e.g. "@smoke" or "~@slow"
+    """
+    from behave.tag_expression import TagExpression
+    from utils.impact_analysis import discover_scenarios
     
-    try:
-        # On Windows, use system default encoding to avoid UTF-8 decoding errors
-        if os.name == 'nt':  # Windows
-            result = subprocess.run(
-                cmd, check=True, encoding='gbk', errors='ignore')
-        else:
-            result = subprocess.run(
-                cmd, check=True, encoding='utf-8', errors='ignore')
+    scenarios = discover_scenarios()
+    if not tags:
+        return scenarios
+    expression = TagExpression([tags])
+    return [scenario for scenario in scenarios if expression.check(scenario.tags)]
 
-        print("Allure report generated successfully!")
-        print("Run 'allure serve reports/allure-results' to view the report.")
+
+def run_coordinator(tags=None, platform=None, host="0.0.0.0", port=8765, lease_timeout=60.0,
+                    max_attempts=2, local_workers=0):
+    """
+    Serve the scenarios as a work queue for workers on any host
+    
+    Workers started with --worker URL lease one scenario at a time, run
+    it and post the result back, so fast nodes take more work. A worker
+    that stops sending heartbeats loses its lease and the scenario is
+    handed to another worker. Failed scenarios go to the failure manifest,
+    so --rerun-failed works as after a local run.
+    
+    Args:
+        tags (str): Tag filter
+        platform (str): Target platform sent to the workers ("android" or "ios")
+        host (str): Address to bind
+        port (int): Port to listen on (0 picks a free port)
+        lease_timeout (float): Seconds a lease stays valid without a heartbeat
+        max_attempts (int): Times a scenario is handed out before it counts as an error
+        local_workers (int): Worker processes to start on this machine
+    """
+    import json
+    from utils import failure_manifest
+    from utils.work_queue import Coordinator, ScenarioQueue
+    
+    scenarios = {scenario.location: scenario for scenario in select_scenarios(tags)}
+    if not scenarios:
+        print("No scenarios match, nothing to run.")
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"Allure report generation failed: {e}")
-        return False
-    except UnicodeDecodeError as e:
-        print(f"Encoding error: {e}")
-        print("Trying to rerun with a different encoding...")
+    
+    queue = ScenarioQueue(scenarios, lease_timeout=lease_timeout, max_attempts=max_attempts,
+                          run={"platform": platform} if platform else None)
+    workers = []
+    with Coordinator(queue, host=host, port=port) as coordinator:
+        print(f"Coordinator serving {len(scenarios)} scenarios at {coordinator.url}")
+        print(f"Start workers with: python run_tests.py --worker {coordinator.url}")
+        local_url = f"http://127.0.0.1:{coordinator.port}"
+        for index in range(local_workers):
+            workers.append(subprocess.Popen([sys.executable, os.path.abspath(__file__),
+                                             "--worker", local_url, "--worker-id", f"local-{index}"]))
+        
+        finished = 0
+        while not queue.wait(timeout=5):
+            status = queue.status()
+            if status["finished"] != finished:
+                finished = status["finished"]
+                print(f"[coordinator] {finished}/{status['total']} scenarios done, "
+                      f"{status['leased']} running, {status['pending']} pending")
+        # Let local workers see the queue is done before the server goes away
+        for worker in workers:
+            try:
+                worker.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                worker.terminate()
+    
+    results = queue.ordered_results()
+    status = queue.status()
+    print("\nDistributed run results:")
+    for result in results:
+        print(f"  - {result['location']}: {result['status']} on {result['worker']} "
+              f"({result['duration']:.1f}s, attempt {result['attempt']})")
+    print("Workers:")
+    for name, stats in sorted(status["workers"].items()):
+        print(f"  - {name}: {stats['completed']} scenarios, {stats['failed']} failed, "
+              f"{stats['lost']} lost, busy {stats['busy_seconds']:.1f}s")
+    for requeue in status["requeued"]:
+        print(f"  Requeued {requeue['location']} from {requeue['worker']}: {requeue['reason']}")
+    
+    os.makedirs("reports", exist_ok=True)
+    with open("reports/distributed_results.json", "w", encoding="utf-8") as f:
+        json.dump({"results": results, "workers": status["workers"], "requeued": status["requeued"]},
+                  f, indent=2, ensure_ascii=False)
+    failures = [result for result in results if result["status"] not in ("passed", "skipped")]
+    failure_manifest.write_manifest(failure_manifest.get_manifest_path(), [
+        {"location": result["location"], "feature": scenarios[result["location"]].feature,
+         "scenario": scenarios[result["location"]].name, "tags": list(scenarios[result["location"]].tags)}
+        for result in failures
+    ])
+    print("Results saved: reports/distributed_results.json")
+    
+    return not failures
+
+
+def run_worker_node(url, worker_id=None, platform=None):
+    """
+    Run scenarios leased from a coordinator until its queue is done
+    
+    Each scenario runs in its own behave process. Output goes to
+    reports/workers/<worker>/ on this machine.
+    
+    Args:
+        url (str): Coordinator URL, e.g. http://build-host:8765
+        worker_id (str): Worker name (default: <hostname>-<pid>)
+        platform (str): Target platform if the coordinator does not set one
+    """
+    from utils.output_stream import EventFollower, ProgressTracker, stream_process
+    from utils.work_queue import default_worker_id, run_worker
+    
+    worker_id = worker_id or default_worker_id()
+    log_dir = os.path.join("reports", "workers", worker_id)
+    os.makedirs(log_dir, exist_ok=True)
+    counter = iter(range(1, sys.maxsize))
+    
+    def run_scenario(location, run):
+        number = next(counter)
+        cmd = build_behave_command(platform=run.get("platform") or platform, paths=[location])
+        log_path = os.path.join(log_dir, f"{number:04d}.txt")
+        # A per-worker manifest keeps workers sharing a checkout from overwriting each other's
+        env = dict(os.environ,
+                   BEHAVE_EVENTS_FILE=new_events_file(f"_{worker_id}_{number}"),
+                   FAILURE_MANIFEST=os.path.abspath(os.path.join(log_dir, "failed_scenarios.json")))
+        print(f"[{worker_id}] Running {location}")
+        tracker = ProgressTracker(label=worker_id)
+        follower = EventFollower(env["BEHAVE_EVENTS_FILE"], tracker).start()
         try:
-            result = subprocess.run(cmd, check=True)
-            print("Allure report generated successfully!")
-            return True
-        except subprocess.CalledProcessError as e:
-            print(f"Allure report generation failed: {e}")
-            return False
+            returncode = stream_process(cmd, tee_path=log_path, env=env, prefix=f"[{worker_id}] ")
+        finally:
+            follower.stop()
+        archive_run(env["BEHAVE_EVENTS_FILE"])
+        scenarios = tracker.summary.get("scenarios", {})
+        if returncode != 0:
+            status = "failed"
+        elif not scenarios.get("passed") and not scenarios.get("failed"):
+            status = "skipped"
+        else:
+            status = "passed"
+        return {"status": status, "returncode": returncode, "failed_steps": tracker.failed_steps,
+                "log": os.path.abspath(log_path)}
+    
+    print(f"Worker {worker_id} pulling scenarios from {url}")
+    ran = run_worker(url, run_scenario, worker=worker_id)
+    print(f"Worker {worker_id} finished after {ran} scenarios")
+    return True
 
 
 def main():
@@ -149,10 +577,48 @@ def main():
     parser = argparse.ArgumentParser(description="My Observatory App Automation Test Runner")
     parser.add_argument("--smoke", action="store_true", help="Run smoke tests")
     parser.add_argument("--regression", action="store_true", help="Run regression tests")
-    parser.add_argument("--report", action="store_true", help="Generate a test report")
-    parser.add_argument("--allure", action="store_true", help="Generate an Allure report")
+    parser.add_argument("--report", action="store_true", help="Generate a text test report (same as --reports text)")
+    parser.add_argument("--allure", action="store_true", help="Generate Allure results (same as --reports allure)")
+    parser.add_argument("--reports", metavar="LIST",
+                        help=f"Comma-separated reports to write from the same run: {', '.join(REPORT_FORMATS)}")
     parser.add_argument("--tags", type=str, help="Specify tag filter")
     parser.add_argument("--parallel", action="store_true", help="Run tests in parallel")
+    parser.add_argument("--rerun-failed", action="store_true",
+                        help="Rerun only the scenarios that failed in the last run")
+    parser.add_argument("--rerun-count", type=int, default=1, metavar="N",
+                        help="With --rerun-failed, rerun each failed scenario N times and score flakiness")
+    parser.add_argument("--manifest", metavar="PATH",
+                        help="Failure manifest to read (default: reports/failed_scenarios.json)")
+    parser.add_argument("--changed-since", metavar="REF",
+                        help="Run only the scenarios affected by changes since a git revision")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Turn off per-step console output from the hooks (progress is still reported)")
+    parser.add_argument("--platform", choices=["android", "ios"], help="Target platform (default: android)")
+    parser.add_argument("--wait-for-appium", type=float, nargs="?", const=-1, metavar="SECONDS",
+                        help="Wait until the Appium server reports ready before running "
+                             "(default deadline: appium_server.timeout in config.yaml)")
+    parser.add_argument("--appium-servers", type=int, metavar="N",
+                        help="Start N managed Appium servers and run the features on N parallel workers")
+    parser.add_argument("--appium-base-port", type=int, default=4723,
+                        help="Port of the first managed Appium server (default: 4723)")
+    parser.add_argument("--appium-command", default="appium",
+                        help="Command used to launch managed Appium servers (default: appium)")
+    parser.add_argument("--coordinator", action="store_true",
+                        help="Serve the scenarios as a work queue for --worker processes on any host")
+    parser.add_argument("--coordinator-host", default="0.0.0.0",
+                        help="Address the coordinator binds (default: 0.0.0.0)")
+    parser.add_argument("--coordinator-port", type=int, default=8765,
+                        help="Port the coordinator listens on (default: 8765)")
+    parser.add_argument("--lease-timeout", type=float, default=60.0, metavar="SECONDS",
+                        help="Requeue a scenario when its worker sends no heartbeat for this long (default: 60)")
+    parser.add_argument("--max-attempts", type=int, default=2, metavar="N",
+                        help="Times a scenario is handed out again after its worker was lost (default: 2)")
+    parser.add_argument("--local-workers", type=int, default=0, metavar="N",
+                        help="With --coordinator, also start N workers on this machine")
+    parser.add_argument("--worker", metavar="URL",
+                        help="Run scenarios leased from the coordinator at URL")
+    parser.add_argument("--worker-id", help="Worker name (default: <hostname>-<pid>); keep it fixed across "
+                                            "restarts so the coordinator requeues a lost lease at once")
     
     args = parser.parse_args()
     
@@ -162,19 +628,71 @@ def main():
     
     success = False
     
-    if args.smoke:
-        success = run_smoke_tests()
+    reports = [name.strip() for name in (args.reports or "").split(",") if name.strip()]
+    if args.report:
+        reports.append("text")
+    if args.allure:
+        reports.append("allure")
+    unknown = [name for name in reports if name not in REPORT_FORMATS]
+    if unknown:
+        parser.error(f"unknown report(s): {', '.join(unknown)}; expected: {', '.join(REPORT_FORMATS)}")
+    reports = list(dict.fromkeys(reports))
+    # Multi-process runs have no single behave run whose reports could be written
+    if reports:
+        for flag, used in (("--appium-servers", args.appium_servers), ("--coordinator", args.coordinator),
+                           ("--worker", args.worker)):
+            if used:
+                parser.error(f"--reports/--report/--allure cannot be combined with {flag}")
+    
+    # Steps read the platform from behave userdata or APP_PLATFORM; the
+    # environment variable also reaches the preset runs below.
+    if args.platform:
+        os.environ["APP_PLATFORM"] = args.platform
+    if args.quiet:
+        os.environ["BEHAVE_CONSOLE"] = "off"
+    
+    if args.wait_for_appium is not None:
+        from utils.appium_health import AppiumNotReadyError, wait_for_appium
+        try:
+            wait_for_appium(deadline=None if args.wait_for_appium < 0 else args.wait_for_appium)
+        except AppiumNotReadyError as e:
+            print(f"\n❌ {e}")
+            sys.exit(1)
+    
+    if args.rerun_failed:
+        success = rerun_failed_tests(args.manifest, max(1, args.rerun_count), platform=args.platform,
+                                     reports=reports)
+    elif args.coordinator:
+        success = run_coordinator(
+            tags="@smoke" if args.smoke else args.tags,
+            platform=args.platform,
+            host=args.coordinator_host,
+            port=args.coordinator_port,
+            lease_timeout=args.lease_timeout,
+            max_attempts=args.max_attempts,
+            local_workers=args.local_workers,
+        )
+    elif args.worker:
+        success = run_worker_node(args.worker, worker_id=args.worker_id, platform=args.platform)
+    elif args.changed_since:
+        success = run_impacted_tests(args.changed_since, tags=args.tags, platform=args.platform, reports=reports)
+    elif args.appium_servers:
+        success = run_with_managed_servers(
+            args.appium_servers,
+            tags="@smoke" if args.smoke else args.tags,
+            platform=args.platform,
+            base_port=args.appium_base_port,
+            appium_command=args.appium_command,
+        )
+    elif args.smoke:
+        success = run_smoke_tests(reports)
     elif args.regression:
-        success = run_regression_tests()
-    elif args.report:
-        success = run_tests_with_report()
-    elif args.allure:
-        success = run_tests_with_allure()
+        success = run_regression_tests(reports)
     elif args.tags:
-        success = run_behave_tests(tags=args.tags, parallel=args.parallel)
+        success = run_behave_tests(tags=args.tags, parallel=args.parallel, platform=args.platform, reports=reports)
     else:
         # Default to running all tests
-        success = run_behave_tests(parallel=args.parallel)
+        success = run_behave_tests(parallel=args.parallel, platform=args.platform, reports=reports)
     
     if success:
         print("\n✅ Tests finished successfully!")
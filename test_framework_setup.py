@@ -3,13 +3,27 @@
 Framework Setup Validation Script
 Used to check if the environment for the APP automation test framework is configured correctly.
 """
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
 import os
+import shutil
 import sys
+import threading
+import time
 import yaml
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
+# Results of the slow tool checks are cached here, keyed by a machine fingerprint
+CACHE_FILE = os.path.join('reports', '.env_check_cache.json')
+CACHE_TTL = 24 * 60 * 60
+
+
 def check_python_version():
     """Check Python version"""
     print("🔍 Checking Python version...")
@@ -39,11 +53,11 @@ def check_dependencies():
     
     missing_packages = []
     for package, import_name in package_imports.items():
-        try:
-            __import__(import_name)
+        # Locate the package without importing it (importing appium/selenium takes seconds)
+        if importlib.util.find_spec(import_name) is not None:
             print(f"✅ {package}")
-        except ImportError as e:
-            print(f"❌ {package} - Not installed, error: {e}")
+        else:
+            print(f"❌ {package} - Not installed")
             missing_packages.append(package)
     
     if missing_packages:
@@ -134,31 +148,36 @@ def check_appium():
 
     print(f"📝 Will try the following Appium commands: {appium_commands}")
 
-    for appium_cmd in appium_commands:
+    def probe(appium_cmd):
+        """Runs `<cmd> --version`; returns (result, error)."""
+        # For commands with spaces, need to split them
+        if isinstance(appium_cmd, str) and ' ' in appium_cmd:
+            cmd_parts = appium_cmd.split()
+        else:
+            cmd_parts = [appium_cmd]
         try:
-            print(f"Attempting to execute: {appium_cmd}")
-
-            # For commands with spaces, need to split them
-            if isinstance(appium_cmd, str) and ' ' in appium_cmd:
-                cmd_parts = appium_cmd.split()
-            else:
-                cmd_parts = [appium_cmd]
-
-            result = subprocess.run(cmd_parts + ['--version'],
-                                     capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                print(f"✅ Appium is installed: {result.stdout.strip()}")
-                print(f"   Using path: {appium_cmd}")
-                return True
-            else:
-                print(f"❌ Command execution failed: {appium_cmd}")
-                print(f"   Error output: {result.stderr}")
-        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-            print(f"❌ Command not found or timed out: {appium_cmd}, error: {e}")
-            continue
+            return subprocess.run(cmd_parts + ['--version'],
+                                  capture_output=True, text=True, timeout=10), None
         except Exception as e:
-            print(f"❌ An unknown error occurred while executing command: {appium_cmd}, error: {e}")
-            continue
+            return None, e
+
+    # Probe every candidate at once; a missing `appium` should not wait on a slow `npx appium`
+    with ThreadPoolExecutor(max_workers=len(appium_commands)) as executor:
+        probes = list(executor.map(probe, appium_commands))
+
+    for appium_cmd, (result, error) in zip(appium_commands, probes):
+        print(f"Attempting to execute: {appium_cmd}")
+        if isinstance(error, (subprocess.TimeoutExpired, FileNotFoundError)):
+            print(f"❌ Command not found or timed out: {appium_cmd}, error: {error}")
+        elif error is not None:
+            print(f"❌ An unknown error occurred while executing command: {appium_cmd}, error: {error}")
+        elif result.returncode == 0:
+            print(f"✅ Appium is installed: {result.stdout.strip()}")
+            print(f"   Using path: {appium_cmd}")
+            return True
+        else:
+            print(f"❌ Command execution failed: {appium_cmd}")
+            print(f"   Error output: {result.stderr}")
 
     print("❌ All Appium path attempts failed.")
     print("   Please run: npm install -g appium")
@@ -205,7 +224,7 @@ def check_project_structure():
     
     required_files = [
         'requirements.txt', 'behave.ini', 'run_tests.py', 'README.md',
-        'config/config.yaml', 'test_data/weather_data.yaml',
+        'config/config.yaml', 'config/locators.yaml', 'test_data/weather_data.yaml',
         'features/weather_app.feature', 'features/steps/weather_app_steps.py',
         'features/environment.py', 'utils/app_driver.py',
         'utils/test_data_manager.py', 'utils/page_objects.py'
@@ -278,12 +297,160 @@ def check_test_data():
         return False
 
 
-def main():
+class _ThreadOutput(io.TextIOBase):
+    """stdout replacement that gives each check thread its own output buffer."""
+
+    def __init__(self, fallback):
+        self._local = threading.local()
+        self._fallback = fallback
+
+    def capture(self):
+        self._local.buffer = io.StringIO()
+
+    def release(self):
+        buffer = self._local.buffer
+        self._local.buffer = None
+        return buffer.getvalue()
+
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer or self._fallback).write(text)
+
+    def flush(self):
+        self._fallback.flush()
+
+
+def _mtime(path):
+    """Modification time of a path, or None if it does not exist."""
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _fingerprint(*parts):
+    """Hashes the given values into a cache key."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _path_fingerprint():
+    """PATH entries and their mtimes (a directory's mtime changes when tools are added or removed)."""
+    return [(entry, _mtime(entry)) for entry in os.environ.get('PATH', '').split(os.pathsep) if entry]
+
+
+def _tool_fingerprint(*tools):
+    """Resolved location and mtime of each tool on PATH."""
+    located = [(tool, shutil.which(tool)) for tool in tools]
+    return [(tool, path, _mtime(path) if path else None) for tool, path in located]
+
+
+# Cache keys of the slow checks; checks not listed here always run
+CACHE_KEYS = {
+    "Python Dependencies": lambda: _fingerprint(
+        sys.executable, sys.version, [(entry, _mtime(entry)) for entry in sys.path]),
+    "Appium": lambda: _fingerprint(
+        _path_fingerprint(), _tool_fingerprint('appium', 'npm', 'npx', 'node'), os.environ.get('APPDATA')),
+    "Android SDK": lambda: _fingerprint(
+        os.environ.get('ANDROID_HOME'),
+        _mtime(os.path.join(os.environ.get('ANDROID_HOME', ''), 'platform-tools', 'adb'))),
+}
+
+
+def load_cache(path=CACHE_FILE):
+    """Reads the check cache, ignoring a missing or corrupt file."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache, path=CACHE_FILE):
+    """Writes the check cache."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2, ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def run_checks(checks, deadline=60.0, use_cache=True):
+    """
+    Runs the checks concurrently, one thread each, within an overall deadline.
+
+    Each check's printed output is captured separately so it can be shown in
+    order afterwards. Passing results of the checks in CACHE_KEYS are cached
+    and reused while the machine fingerprint is unchanged.
+
+    Args:
+        checks (list): (name, function) pairs.
+        deadline (float): Seconds to wait for all checks; unfinished checks fail.
+        use_cache (bool): Whether to read and update the cache.
+
+    Returns:
+        list: One dict per check with name, passed, cached, duration and output.
+    """
+    cache = load_cache() if use_cache else {}
+    now = time.time()
+    results = {}
+    threads = []
+    output = _ThreadOutput(sys.stdout)
+
+    def run(name, check_func, key):
+        output.capture()
+        started = time.monotonic()
+        try:
+            passed = bool(check_func())
+        except Exception as e:
+            print(f"❌ {name} check failed: {e}")
+            passed = False
+        results[name] = {"name": name, "passed": passed, "cached": False, "key": key,
+                         "duration": round(time.monotonic() - started, 3), "output": output.release()}
+
+    original_stdout = sys.stdout
+    sys.stdout = output
+    try:
+        for name, check_func in checks:
+            key = CACHE_KEYS[name]() if name in CACHE_KEYS else None
+            entry = cache.get(name)
+            if key and entry and entry.get("key") == key and now - entry.get("time", 0) < CACHE_TTL:
+                results[name] = {"name": name, "passed": True, "cached": True, "key": key,
+                                 "duration": 0.0, "output": entry.get("output", "")}
+                continue
+            # Daemon threads, so a check stuck past the deadline cannot keep the process alive
+            thread = threading.Thread(target=run, args=(name, check_func, key), name=f"check-{name}", daemon=True)
+            thread.start()
+            threads.append((name, thread))
+
+        end = time.monotonic() + deadline
+        for name, thread in threads:
+            thread.join(max(0.0, end - time.monotonic()))
+    finally:
+        sys.stdout = original_stdout
+
+    ordered = []
+    for name, _ in checks:
+        result = results.get(name) or {
+            "name": name, "passed": False, "cached": False, "key": None, "duration": deadline,
+            "output": f"❌ {name} check did not finish within {deadline:.0f}s\n"}
+        if use_cache and result["key"] and result["passed"] and not result["cached"]:
+            cache[name] = {"key": result["key"], "time": now, "output": result["output"]}
+        ordered.append(result)
+    if use_cache:
+        save_cache(cache)
+    return ordered
+
+
+def main(argv=None):
     """Main function"""
-    print("=" * 60)
-    print("My Observatory App Automation Test Framework - Environment Check")
-    print("=" * 60)
-    
+    parser = argparse.ArgumentParser(description="Check the test framework environment")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON only")
+    parser.add_argument("--deadline", type=float, default=60.0,
+                        help="Seconds to wait for all checks to finish (default: 60)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not update cached results")
+    args = parser.parse_args(argv)
+
     checks = [
         ("Python Version", check_python_version),
         ("Python Dependencies", check_dependencies),
@@ -293,31 +460,41 @@ def main():
         ("Configuration Files", check_config_files),
         ("Test Data", check_test_data)
     ]
-    
-    results = []
-    for name, check_func in checks:
-        try:
-            result = check_func()
-            results.append((name, result))
-        except Exception as e:
-            print(f"❌ {name} check failed: {e}")
-            results.append((name, False))
-    
+
+    started = time.monotonic()
+    results = run_checks(checks, deadline=args.deadline, use_cache=not args.no_cache)
+    passed = sum(1 for result in results if result["passed"])
+    total = len(results)
+
+    if args.json:
+        print(json.dumps({
+            "passed": passed == total,
+            "duration": round(time.monotonic() - started, 3),
+            "checks": [{k: v for k, v in result.items() if k != "key"} for result in results],
+        }, indent=2, ensure_ascii=False))
+        return passed == total
+
+    print("=" * 60)
+    print("My Observatory App Automation Test Framework - Environment Check")
+    print("=" * 60)
+
+    for result in results:
+        if result["cached"]:
+            print(f"\n🔍 {result['name']}: unchanged since last check (cached)")
+        else:
+            print(result["output"], end="")
+
     # Summary
     print("\n" + "=" * 60)
     print("Check Results Summary:")
     print("=" * 60)
-    
-    passed = 0
-    total = len(results)
-    
-    for name, result in results:
-        status = "✅ Passed" if result else "❌ Failed"
-        print(f"{name}: {status}")
-        if result:
-            passed += 1
-    
-    print(f"\nOverall Result: {passed}/{total} checks passed.")
+
+    for result in results:
+        status = "✅ Passed" if result["passed"] else "❌ Failed"
+        suffix = " (cached)" if result["cached"] else f" ({result['duration']:.2f}s)"
+        print(f"{result['name']}: {status}{suffix}")
+
+    print(f"\nOverall Result: {passed}/{total} checks passed in {time.monotonic() - started:.2f}s.")
     
     if passed == total:
         print("\n🎉 Congratulations! Framework environment is configured correctly. You can start.")
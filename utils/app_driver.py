@@ -3,26 +3,46 @@ Appium Driver Management Class for Automation Testing.
 """
 import yaml
 import os
-from appium import webdriver
-from appium.webdriver.common.appiumby import AppiumBy
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+import time
+from utils.appium_health import load_appium_server_config, wait_for_appium
+from utils.command_metrics import get_command_metrics
+
+
+# Appium and Selenium are imported inside the methods that need them, so
+# modules that only reference AppDriver (e.g. API-only behave runs) do not
+# pay for loading the WebDriver stack at startup.
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Standard W3C capabilities; every other capability is sent with the "appium:" prefix
+W3C_CAPABILITIES = {
+    "platformName", "browserName", "browserVersion", "acceptInsecureCerts",
+    "pageLoadStrategy", "proxy", "setWindowRect", "timeouts", "unhandledPromptBehavior",
+}
 
 
 class AppDriver:
     """App Driver Management Class"""
     
-    def __init__(self, platform="android"):
+    def __init__(self, platform="android", device=None):
         """
         Initializes the App Driver.
         
         Args:
             platform (str): The target platform, supports "android" or "ios".
+            device (Device): Registry device to start the session on (see
+                utils/device_pool.py); its capabilities override config.yaml.
         """
-        self.platform = platform
+        self.platform = device.platform if device else platform
+        self.device = device
         self.driver = None
         self.config = self._load_config()
+        # environments also holds the HTTP sections (development, staging, ...);
+        # only those with a platform_name describe an app platform
+        platforms = [name for name, settings in self.config['environments'].items()
+                     if isinstance(settings, dict) and 'platform_name' in settings]
+        if self.platform not in platforms:
+            raise ValueError(f"Unknown platform '{self.platform}', expected one of: {', '.join(platforms)}")
         
     def _load_config(self):
         """Loads the configuration file."""
@@ -30,23 +50,114 @@ class AppDriver:
         with open(config_path, 'r', encoding='utf-8') as file:
             return yaml.safe_load(file)
     
+    def _build_capabilities(self):
+        """
+        Builds W3C capabilities from the platform section of config.yaml.
+        
+        snake_case keys are converted to camelCase, vendor capabilities get the
+        "appium:" prefix, and ${workspaceFolder} is expanded to the project root.
+        
+        Returns:
+            dict: The capabilities for the new session.
+        """
+        settings = dict(self.config['environments'][self.platform])
+        if self.device:
+            settings['platform_version'] = self.device.os_version
+            if self.device.udid:
+                settings['udid'] = self.device.udid
+            settings.update(self.device.capabilities)
+        
+        capabilities = {}
+        for key, value in settings.items():
+            head, *rest = key.split('_')
+            name = head + ''.join(part.capitalize() for part in rest)
+            if name not in W3C_CAPABILITIES and ':' not in name:
+                name = f"appium:{name}"
+            if isinstance(value, str):
+                value = value.replace("${workspaceFolder}", PROJECT_ROOT)
+            capabilities[name] = value
+        capabilities.update(self._worker_port_capabilities())
+        return capabilities
+    
+    def _worker_port_capabilities(self):
+        """
+        Device-side port capabilities for a managed worker.
+        
+        run_tests.py gives each parallel worker its own port ranges (see
+        utils/appium_server.py) so sessions do not serialize on shared ports.
+        """
+        capabilities = {}
+        system_port = os.environ.get("APPIUM_SYSTEM_PORT")
+        if system_port:
+            key = "appium:wdaLocalPort" if self.platform == "ios" else "appium:systemPort"
+            capabilities[key] = int(system_port)
+        chromedriver_range = os.environ.get("APPIUM_CHROMEDRIVER_PORT_RANGE")
+        if chromedriver_range and self.platform == "android":
+            first, last = (int(port) for port in chromedriver_range.split("-"))
+            capabilities["appium:chromedriverPorts"] = [[first, last]]
+        return capabilities
+    
+    def get_server_url(self):
+        """
+        Builds the Appium server URL: the device's own server if it has one, else
+        the configuration, honouring APPIUM_HOST/APPIUM_PORT.
+        """
+        if self.device and self.device.appium:
+            return self.device.appium.rstrip('/')
+        appium_config = self.config['appium']
+        host = os.environ.get("APPIUM_HOST", appium_config['host'])
+        port = os.environ.get("APPIUM_PORT", appium_config['port'])
+        return f"http://{host}:{port}{appium_config['path']}"
+    
     def start_driver(self):
-        """Starts the Appium driver."""
+        """
+        Starts the Appium driver.
+        
+        Waits for the server's /status to report ready, then creates the
+        session, retrying failed attempts with backoff up to the
+        appium_server max_retries in http_config.
+        """
+        from appium import webdriver
+        from selenium.common.exceptions import WebDriverException
+        
         try:
-            # Get platform-specific configuration
-            platform_config = self.config['environments'][self.platform]
-            appium_config = self.config['appium']
+            # Get platform-specific capabilities
+            capabilities = self._build_capabilities()
             
             # Build the Appium server URL
-            server_url = f"http://{appium_config['host']}:{appium_config['port']}{appium_config['path']}"
+            server_url = self.get_server_url()
+            server_config = load_appium_server_config(self.config)
+            
+            # Wait until the server is up instead of failing on the first request
+            wait_for_appium(server_url, config=self.config)
             
             # Create the driver instance
-            self.driver = webdriver.Remote(server_url, platform_config)
+            max_retries = server_config.get('max_retries', 1)
+            delay = 1.0
+            metrics = get_command_metrics()
+            for attempt in range(max_retries + 1):
+                started = time.perf_counter()
+                try:
+                    self.driver = webdriver.Remote(server_url, capabilities)
+                    metrics.record('newSession', time.perf_counter() - started)
+                    break
+                except WebDriverException as e:
+                    metrics.record('newSession', time.perf_counter() - started, error=True)
+                    if attempt == max_retries:
+                        raise
+                    print(f"Session creation failed (attempt {attempt + 1}/{max_retries + 1}): {e.msg}")
+                    time.sleep(delay)
+                    delay *= 2
+                    wait_for_appium(server_url, config=self.config, verbose=False)
+            
+            # Count and time every WebDriver command the session sends from here on
+            metrics.instrument(self.driver)
             
             # Set implicit wait
             self.driver.implicitly_wait(self.config['test_data']['implicit_wait'])
             
-            print(f"Successfully started driver for {self.platform} platform.")
+            device = f" on {self.device.name}" if self.device else ""
+            print(f"Successfully started driver for {self.platform} platform{device}.")
             return self.driver
             
         except Exception as e:
@@ -57,6 +168,7 @@ class AppDriver:
         """Quits the driver."""
         if self.driver:
             self.driver.quit()
+            self.driver = None
             print("Driver has been quit.")
     
     def find_element(self, locator, timeout=None):
@@ -64,12 +176,17 @@ class AppDriver:
         Finds an element.
         
         Args:
-            locator (tuple): Element locator (By, value).
+            locator (tuple): Element locator (By, value), or a registry Locator
+                with an optional fallback.
             timeout (int): Timeout in seconds.
             
         Returns:
             WebElement: The found element.
         """
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+        
         if timeout is None:
             timeout = self.config['test_data']['default_timeout']
             
@@ -79,6 +196,12 @@ class AppDriver:
             )
             return element
         except TimeoutException:
+            # Registry locators may carry an explicit (slower) fallback strategy.
+            # The screen has had the full timeout to settle, so try it once.
+            fallback = getattr(locator, 'fallback', None)
+            if fallback is not None:
+                print(f"Element not found: {locator}, trying fallback: {fallback}")
+                return self.find_element(fallback, timeout=0)
             print(f"Element not found: {locator}")
             raise
     
@@ -98,8 +221,50 @@ class AppDriver:
         element = self.find_element(locator, timeout)
         return element.text
     
+    def find_elements(self, locator, parent=None):
+        """
+        Finds all elements matching a locator, without waiting beyond the implicit wait.
+        
+        Args:
+            locator (tuple): Element locator (By, value).
+            parent (WebElement): Search below this element instead of the whole screen.
+            
+        Returns:
+            list: The matching WebElements.
+        """
+        return (parent or self.driver).find_elements(*locator)
+    
+    def scroll(self, element, direction="down", percent=0.9):
+        """
+        Scrolls a scrollable element (RecyclerView, table) by one gesture.
+        
+        Android uses `mobile: scrollGesture`, which reports whether the element
+        can scroll further, so the end of a list is known without another
+        swipe. XCUITest's `mobile: scroll` reports nothing.
+        
+        Args:
+            element (WebElement): The scrollable element.
+            direction (str): "down" or "up".
+            percent (float): Share of the element's height to scroll (Android).
+            
+        Returns:
+            bool: Whether the element can scroll further in that direction, or
+                None when the platform does not say (iOS).
+        """
+        if self.platform == "ios":
+            self.driver.execute_script("mobile: scroll", {"elementId": element.id, "direction": direction})
+            return None
+        return bool(self.driver.execute_script("mobile: scrollGesture", {
+            "elementId": element.id, "direction": direction, "percent": percent}))
+    
+    def get_page_source(self):
+        """Gets the page source XML of the current screen in a single command."""
+        return self.driver.page_source
+    
     def is_element_present(self, locator, timeout=None):
         """Checks if an element is present."""
+        from selenium.common.exceptions import TimeoutException
+        
         try:
             self.find_element(locator, timeout)
             return True
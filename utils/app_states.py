@@ -0,0 +1,283 @@
+"""
+App State Preparation.
+
+Puts the app directly into a named state declared in config/app_states.yaml
+(a screen, a selected city, changed settings) with deep links, activity
+intents with extras, pushed SharedPreferences or emulator snapshots, instead
+of cold-starting it and navigating there through the UI.
+"""
+import base64
+import os
+import shlex
+import subprocess
+import time
+from typing import Any, Callable, Dict, List, Optional
+from xml.sax.saxutils import quoteattr
+
+import yaml
+
+from utils.locator_registry import get_locator_registry
+
+
+DEFAULT_STATES_PATH = os.path.join(os.path.dirname(__file__), "..", "config", "app_states.yaml")
+
+PLATFORMS = ("android", "ios")
+
+
+class AppStateError(ValueError):
+    """Raised for invalid state definitions or unknown states."""
+
+
+# Action name -> (handler(preparer, argument), platforms the action supports)
+ACTIONS: Dict[str, Any] = {}
+
+
+def action(name: str, platforms=PLATFORMS):
+    """Registers a state preparation action."""
+    def register(handler: Callable[["AppStatePreparer", Any], None]):
+        ACTIONS[name] = (handler, platforms)
+        return handler
+    return register
+
+
+def shared_prefs_xml(values: Dict[str, Any]) -> str:
+    """Renders values in the Android SharedPreferences XML format."""
+    lines = ["<?xml version='1.0' encoding='utf-8' standalone='yes' ?>", "<map>"]
+    for key, value in values.items():
+        name = quoteattr(str(key))
+        if isinstance(value, bool):
+            lines.append(f"    <boolean name={name} value=\"{str(value).lower()}\" />")
+        elif isinstance(value, int):
+            tag = "int" if -2 ** 31 <= value < 2 ** 31 else "long"
+            lines.append(f"    <{tag} name={name} value=\"{value}\" />")
+        elif isinstance(value, float):
+            lines.append(f"    <float name={name} value=\"{value}\" />")
+        else:
+            text = quoteattr(str(value))[1:-1]
+            lines.append(f"    <string name={name}>{text}</string>")
+    lines.append("</map>")
+    return "\n".join(lines) + "\n"
+
+
+def _intent_extras(extras: Dict[str, Any]) -> List[List[str]]:
+    """Converts extras to UiAutomator2 startActivity [type, key, value] triples."""
+    triples = []
+    for key, value in extras.items():
+        if isinstance(value, bool):
+            triples.append(["z", key, str(value).lower()])
+        elif isinstance(value, int):
+            triples.append(["i", key, str(value)])
+        elif isinstance(value, float):
+            triples.append(["f", key, str(value)])
+        else:
+            triples.append(["s", key, str(value)])
+    return triples
+
+
+@action("deep_link")
+def _deep_link(preparer, url):
+    app_key = "bundleId" if preparer.platform == "ios" else "package"
+    preparer.execute("mobile: deepLink", {"url": url, app_key: preparer.app_id})
+    preparer.needs_launch = False
+
+
+@action("start_activity", platforms=("android",))
+def _start_activity(preparer, spec):
+    activity = spec["activity"]
+    intent = activity if "/" in activity else f"{preparer.app_id}/{activity}"
+    args = {"intent": intent}
+    if spec.get("extras"):
+        args["extras"] = _intent_extras(spec["extras"])
+    preparer.execute("mobile: startActivity", args)
+    preparer.needs_launch = False
+
+
+@action("shared_prefs", platforms=("android",))
+def _shared_prefs(preparer, spec):
+    # The app rewrites its preferences when it stops, so stop it before pushing
+    _terminate(preparer, True)
+    data = base64.b64encode(shared_prefs_xml(spec["values"]).encode("utf-8")).decode("ascii")
+    preparer.driver.driver.push_file(f"@{preparer.app_id}/shared_prefs/{spec['file']}.xml", data)
+
+
+@action("shell", platforms=("android",))
+def _shell(preparer, command):
+    # Quoted arguments keep their spaces, e.g. am broadcast ... --es msg "a b"
+    program, *args = shlex.split(command)
+    preparer.execute("mobile: shell", {"command": program, "args": args})
+
+
+@action("snapshot", platforms=("android",))
+def _snapshot(preparer, name):
+    serial = preparer.driver.driver.capabilities.get("udid") or os.environ.get("ANDROID_SERIAL")
+    command = ["adb"] + (["-s", serial] if serial else []) + ["emu", "avd", "snapshot", "load", name]
+    result = subprocess.run(command, capture_output=True, text=True, timeout=120)
+    if result.returncode != 0 or "KO" in result.stdout:
+        raise AppStateError(f"Loading emulator snapshot '{name}' failed: {(result.stderr or result.stdout).strip()}")
+    preparer.needs_launch = True
+
+
+@action("terminate")
+def _terminate(preparer, enabled):
+    if enabled:
+        preparer.execute("mobile: terminateApp", {preparer.app_key: preparer.app_id})
+        preparer.needs_launch = True
+
+
+@action("launch")
+def _launch(preparer, enabled):
+    if enabled:
+        preparer.execute("mobile: activateApp", {preparer.app_key: preparer.app_id})
+        preparer.needs_launch = False
+
+
+class AppStateRegistry:
+    """Loads and validates the named app states."""
+
+    def __init__(self, path: str = DEFAULT_STATES_PATH):
+        """
+        Initializes the registry.
+
+        Args:
+            path (str): Path to the app states YAML file.
+
+        Raises:
+            AppStateError: If any state definition is invalid.
+        """
+        self.path = path
+        with open(path, 'r', encoding='utf-8') as file:
+            data = yaml.safe_load(file) or {}
+        self.app_ids: Dict[str, str] = data.get("app_id", {}) or {}
+        self.states: Dict[str, Dict[str, Any]] = data.get("states", {}) or {}
+        self._validate()
+
+    def _validate(self):
+        """Validates every state, collecting all errors."""
+        errors = []
+        for name, state in self.states.items():
+            if not isinstance(state, dict):
+                errors.append(f"{name}: state must be a mapping")
+                continue
+            if state.get("extends") and state["extends"] not in self.states:
+                errors.append(f"{name}: extends unknown state '{state['extends']}'")
+            for section in ("steps",) + PLATFORMS:
+                for index, step in enumerate(state.get(section) or []):
+                    where = f"{name}.{section}[{index}]"
+                    if not isinstance(step, dict) or len(step) != 1:
+                        errors.append(f"{where}: each step must have exactly one action")
+                        continue
+                    action_name = next(iter(step))
+                    if action_name not in ACTIONS:
+                        errors.append(f"{where}: unknown action '{action_name}', expected one of: "
+                                      f"{', '.join(ACTIONS)}")
+                    elif section != "steps" and section not in ACTIONS[action_name][1]:
+                        errors.append(f"{where}: action '{action_name}' is not supported on {section}")
+            wait_for = state.get("wait_for")
+            if wait_for and "." not in wait_for:
+                errors.append(f"{name}: wait_for must be 'page.element'")
+        if errors:
+            raise AppStateError(f"Invalid app states in {self.path}:\n  " + "\n  ".join(errors))
+
+    def _chain(self, name: str) -> List[str]:
+        """The state and the states it extends, nearest first."""
+        chain, current = [], name
+        while current:
+            if current not in self.states:
+                raise AppStateError(f"Unknown app state '{current}', expected one of: {', '.join(self.states)}")
+            if current in chain:
+                raise AppStateError(f"App state '{name}' extends itself through '{current}'")
+            chain.append(current)
+            current = self.states[current].get("extends")
+        return chain
+
+    def steps(self, name: str, platform: str) -> List[Dict[str, Any]]:
+        """
+        The actions that prepare a state on a platform, including those of the states it extends.
+
+        Raises:
+            AppStateError: For unknown states or actions the platform does not support.
+        """
+        steps = []
+        for state_name in reversed(self._chain(name)):
+            state = self.states[state_name]
+            for step in list(state.get("steps") or []) + list(state.get(platform) or []):
+                action_name = next(iter(step))
+                if platform not in ACTIONS[action_name][1]:
+                    raise AppStateError(f"{state_name}: action '{action_name}' is not supported on {platform}")
+                steps.append(step)
+        return steps
+
+    def wait_for(self, name: str) -> Optional[str]:
+        """The "page.element" a state waits for, inherited from the states it extends if not set."""
+        for state_name in self._chain(name):
+            wait_for = self.states[state_name].get("wait_for")
+            if wait_for:
+                return wait_for
+        return None
+
+
+class AppStatePreparer:
+    """Prepares named app states on a running AppDriver session."""
+
+    def __init__(self, driver, registry: Optional[AppStateRegistry] = None):
+        """
+        Args:
+            driver (AppDriver): Driver with a started session.
+            registry (AppStateRegistry): States to use (default: config/app_states.yaml).
+        """
+        self.driver = driver
+        self.registry = registry or get_app_state_registry()
+        self.platform = driver.platform
+        self.needs_launch = False
+
+    @property
+    def app_key(self) -> str:
+        return "bundleId" if self.platform == "ios" else "appId"
+
+    @property
+    def app_id(self) -> str:
+        environment = self.driver.config['environments'].get(self.platform, {})
+        app_id = environment.get('bundle_id' if self.platform == "ios" else 'app_package')
+        return app_id or self.registry.app_ids.get(self.platform, "")
+
+    def execute(self, script: str, args: Dict[str, Any]):
+        return self.driver.driver.execute_script(script, args)
+
+    def prepare(self, name: str, timeout=None) -> float:
+        """
+        Puts the app into a named state.
+
+        Args:
+            name (str): State name in config/app_states.yaml.
+            timeout (int): Seconds to wait for the state's wait_for element.
+
+        Returns:
+            float: Seconds the preparation took.
+
+        Raises:
+            AppStateError: If the state is unknown or cannot be prepared on this platform.
+        """
+        started = time.monotonic()
+        self.needs_launch = False
+        for step in self.registry.steps(name, self.platform):
+            (action_name, argument), = step.items()
+            ACTIONS[action_name][0](self, argument)
+        if self.needs_launch:
+            _launch(self, True)
+
+        wait_for = self.registry.wait_for(name)
+        if wait_for:
+            page, element = wait_for.split(".", 1)
+            self.driver.find_element(get_locator_registry().get(page, element, self.platform), timeout)
+        return time.monotonic() - started
+
+
+_default_registry: Optional[AppStateRegistry] = None
+
+
+def get_app_state_registry() -> AppStateRegistry:
+    """Returns the shared registry, loading and validating config/app_states.yaml on first use."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = AppStateRegistry()
+    return _default_registry
@@ -0,0 +1,146 @@
+"""
+Appium Server Readiness Probing.
+
+Polls the Appium ``/status`` endpoint with exponential backoff until the
+server reports ready or a deadline passes, so callers wait exactly as long
+as the server needs instead of sleeping for a fixed time.
+
+Usage:
+    python -m utils.appium_health --deadline 180
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Optional
+
+import yaml
+
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config", "config.yaml")
+
+DEFAULT_BASE_URL = "http://127.0.0.1:4723"
+DEFAULT_DEADLINE = 30
+
+
+class AppiumNotReadyError(TimeoutError):
+    """Raised when the Appium server does not become ready before the deadline."""
+
+
+def load_appium_server_config(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Gets the ``appium_server`` entry of ``http_config.api_services``.
+
+    Args:
+        config (dict): The parsed config.yaml; loaded from disk if omitted.
+
+    Returns:
+        dict: The appium_server settings (base_url, timeout, max_retries, ...).
+    """
+    if config is None:
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as file:
+            config = yaml.safe_load(file)
+    return (config.get("http_config", {})
+                  .get("api_services", {})
+                  .get("appium_server", {})) or {}
+
+
+def get_status(base_url: str, timeout: float = 5) -> Optional[Dict[str, Any]]:
+    """
+    Queries the server's ``/status`` endpoint once.
+
+    Args:
+        base_url (str): Appium server URL, e.g. http://127.0.0.1:4723.
+        timeout (float): Request timeout in seconds.
+
+    Returns:
+        dict: The status payload if the server is up and ready, otherwise None.
+    """
+    # urllib.request pulls in http.client and email; only load it when polling
+    import urllib.error
+    import urllib.request
+
+    request = urllib.request.Request(base_url.rstrip("/") + "/status",
+                                     headers={"Accept": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        return None
+    # Appium 2 reports {"value": {"ready": true, ...}}; older servers omit "ready"
+    value = payload.get("value") if isinstance(payload, dict) else None
+    if isinstance(value, dict) and value.get("ready") is False:
+        return None
+    return payload
+
+
+def wait_for_appium(base_url: Optional[str] = None, deadline: Optional[float] = None,
+                    initial_delay: float = 0.1, max_delay: float = 2.0,
+                    config: Optional[Dict[str, Any]] = None, verbose: bool = True) -> Dict[str, Any]:
+    """
+    Waits until the Appium server is ready.
+
+    Args:
+        base_url (str): Server URL; defaults to http_config.api_services.appium_server.base_url.
+        deadline (float): Maximum seconds to wait; defaults to that entry's timeout.
+        initial_delay (float): First delay between polls, doubled after each failure.
+        max_delay (float): Upper bound on the delay between polls.
+        config (dict): Parsed config.yaml, to avoid reloading it.
+        verbose (bool): Print progress.
+
+    Returns:
+        dict: The status payload returned by the server.
+
+    Raises:
+        AppiumNotReadyError: If the server is not ready before the deadline.
+    """
+    server_config = load_appium_server_config(config)
+    base_url = base_url or server_config.get("base_url", DEFAULT_BASE_URL)
+    if deadline is None:
+        deadline = server_config.get("timeout", DEFAULT_DEADLINE)
+
+    start = time.monotonic()
+    end = start + deadline
+    delay = initial_delay
+    attempts = 0
+    while True:
+        attempts += 1
+        remaining = end - time.monotonic()
+        status = get_status(base_url, timeout=max(0.5, min(5.0, remaining)))
+        if status is not None:
+            if verbose:
+                print(f"Appium server ready at {base_url} "
+                      f"after {time.monotonic() - start:.2f}s ({attempts} attempts)")
+            return status
+
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            raise AppiumNotReadyError(
+                f"Appium server at {base_url} not ready after {deadline}s ({attempts} attempts)")
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+def main(argv=None):
+    """Command line entry point; exits non-zero if the server does not become ready."""
+    parser = argparse.ArgumentParser(description="Wait for the Appium server to become ready")
+    parser.add_argument("--url", help="Appium server URL (default: appium_server.base_url in config.yaml)")
+    parser.add_argument("--deadline", type=float, help="Maximum seconds to wait (default: appium_server.timeout)")
+    args = parser.parse_args(argv)
+
+    try:
+        wait_for_appium(args.url, args.deadline)
+        return 0
+    except AppiumNotReadyError as e:
+        print(f"❌ {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Managed Appium Server Processes.
+
+Spawns one Appium server per test worker on distinct ports, gives each
+worker its own systemPort/chromedriverPort range so parallel UiAutomator2
+sessions never contend for the same device-side ports, and restarts any
+server that crashes or stops answering /status during the run.
+"""
+import os
+import shlex
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from utils.appium_health import get_status, wait_for_appium
+
+
+DEFAULT_LOG_DIR = os.path.join(os.path.dirname(__file__), "..", "reports", "appium-logs")
+
+
+class AppiumServer:
+    """A single supervised Appium server process."""
+
+    def __init__(self, index: int, host: str, port: int, system_port: int,
+                 chromedriver_port: int, ports_per_worker: int,
+                 command: str = "appium", log_dir: str = DEFAULT_LOG_DIR):
+        """
+        Initializes the server description; call start() to launch it.
+
+        Args:
+            index (int): Worker index this server belongs to.
+            host (str): Address to bind.
+            port (int): Appium server port.
+            system_port (int): First port of the worker's UiAutomator2 systemPort / WDA range.
+            chromedriver_port (int): First port of the worker's chromedriver range.
+            ports_per_worker (int): Size of each port range.
+            command (str): Command used to launch Appium.
+            log_dir (str): Directory for the server log file.
+        """
+        self.index = index
+        self.host = host
+        self.port = port
+        self.system_port = system_port
+        self.chromedriver_port = chromedriver_port
+        self.ports_per_worker = ports_per_worker
+        self.command = command
+        self.log_path = os.path.join(log_dir, f"appium_{port}.log")
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Launches the server process."""
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        cmd = shlex.split(self.command) + [
+            "--address", self.host,
+            "--port", str(self.port),
+            "--log", self.log_path,
+            "--local-timezone",
+        ]
+        self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        print(f"Started Appium server #{self.index} on {self.url} (pid {self.process.pid})")
+
+    def stop(self, timeout: float = 10):
+        """Terminates the server process, killing it if it does not exit in time."""
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+    def is_running(self) -> bool:
+        """True if the server process has not exited."""
+        return self.process is not None and self.process.poll() is None
+
+    def worker_env(self) -> Dict[str, str]:
+        """
+        Environment variables that point a behave worker at this server.
+
+        AppDriver reads these to pick the server URL and device-side ports.
+        """
+        last_system = self.system_port + self.ports_per_worker - 1
+        last_chromedriver = self.chromedriver_port + self.ports_per_worker - 1
+        return {
+            "APPIUM_HOST": self.host,
+            "APPIUM_PORT": str(self.port),
+            "APPIUM_SYSTEM_PORT": str(self.system_port),
+            "APPIUM_SYSTEM_PORT_RANGE": f"{self.system_port}-{last_system}",
+            "APPIUM_CHROMEDRIVER_PORT_RANGE": f"{self.chromedriver_port}-{last_chromedriver}",
+            "APPIUM_WORKER_INDEX": str(self.index),
+        }
+
+
+class AppiumServerPool:
+    """Starts, supervises and stops N Appium servers."""
+
+    def __init__(self, count: int, host: str = "127.0.0.1", base_port: int = 4723,
+                 system_port_base: int = 8200, chromedriver_port_base: int = 9515,
+                 ports_per_worker: int = 10, command: str = "appium",
+                 startup_deadline: float = 120, check_interval: float = 5,
+                 max_failed_checks: int = 3, log_dir: str = DEFAULT_LOG_DIR):
+        """
+        Initializes the pool.
+
+        Args:
+            count (int): Number of servers (one per worker).
+            host (str): Address every server binds to.
+            base_port (int): Port of the first server; the others follow.
+            system_port_base (int): Start of the systemPort ranges.
+            chromedriver_port_base (int): Start of the chromedriver port ranges.
+            ports_per_worker (int): Size of each worker's port ranges.
+            command (str): Command used to launch Appium.
+            startup_deadline (float): Seconds to wait for each server to become ready.
+            check_interval (float): Seconds between supervisor health checks.
+            max_failed_checks (int): Consecutive failed /status checks before a restart.
+            log_dir (str): Directory for server log files.
+        """
+        if count < 1:
+            raise ValueError("At least one Appium server is required")
+        self.servers: List[AppiumServer] = [
+            AppiumServer(
+                index=i,
+                host=host,
+                port=base_port + i,
+                system_port=system_port_base + i * ports_per_worker,
+                chromedriver_port=chromedriver_port_base + i * ports_per_worker,
+                ports_per_worker=ports_per_worker,
+                command=command,
+                log_dir=log_dir,
+            )
+            for i in range(count)
+        ]
+        self.startup_deadline = startup_deadline
+        self.check_interval = check_interval
+        self.max_failed_checks = max_failed_checks
+        self._stop_event = threading.Event()
+        self._supervisor: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        """Starts all servers, waits until each is ready, then starts supervising them."""
+        for server in self.servers:
+            server.start()
+        try:
+            # Servers boot concurrently; wait for all of them in parallel
+            with ThreadPoolExecutor(max_workers=len(self.servers)) as executor:
+                list(executor.map(
+                    lambda server: wait_for_appium(server.url, deadline=self.startup_deadline),
+                    self.servers))
+        except Exception:
+            self.stop()
+            raise
+        self._stop_event.clear()
+        self._supervisor = threading.Thread(target=self._supervise, name="appium-supervisor", daemon=True)
+        self._supervisor.start()
+
+    def stop(self):
+        """Stops supervision and terminates every server."""
+        self._stop_event.set()
+        if self._supervisor is not None:
+            self._supervisor.join(timeout=self.check_interval + 5)
+            self._supervisor = None
+        with self._lock:
+            for server in self.servers:
+                server.stop()
+        print("All managed Appium servers stopped.")
+
+    def restart(self, server: AppiumServer) -> bool:
+        """
+        Restarts one server and waits for it to become ready again.
+
+        Returns:
+            bool: False if the pool is being stopped and the server was left alone.
+        """
+        with self._lock:
+            # stop() may have begun since the failed health check; don't bring a server back up
+            if self._stop_event.is_set():
+                return False
+            server.stop()
+            server.restarts += 1
+            print(f"Restarting Appium server #{server.index} on {server.url} (restart {server.restarts})")
+            server.start()
+        try:
+            wait_for_appium(server.url, deadline=self.startup_deadline)
+        except Exception:
+            # stop() terminated the server while it was booting
+            if self._stop_event.is_set():
+                return False
+            raise
+        return True
+
+    def _supervise(self):
+        """Health-checks every server and restarts crashed or unresponsive ones."""
+        failed_checks = {server.index: 0 for server in self.servers}
+        while not self._stop_event.wait(self.check_interval):
+            for server in self.servers:
+                if self._stop_event.is_set():
+                    return
+                if not server.is_running():
+                    print(f"Appium server #{server.index} exited unexpectedly")
+                elif get_status(server.url, timeout=2) is not None:
+                    failed_checks[server.index] = 0
+                    continue
+                else:
+                    failed_checks[server.index] += 1
+                    if failed_checks[server.index] < self.max_failed_checks:
+                        continue
+                    print(f"Appium server #{server.index} failed "
+                          f"{failed_checks[server.index]} health checks")
+                try:
+                    if not self.restart(server):
+                        return
+                    failed_checks[server.index] = 0
+                except Exception as e:
+                    print(f"Failed to restart Appium server #{server.index}: {e}")
+
+    def worker_env(self, index: int) -> Dict[str, str]:
+        """Environment variables for the worker with the given index."""
+        return self.servers[index].worker_env()
@@ -0,0 +1,233 @@
+"""
+WebDriver Command Metrics.
+
+Counts the WebDriver HTTP commands an Appium session issues and records
+their round-trip latency, per command type (findElement, getElementText,
+clickElement, screenshot, ...), for each scenario and for the whole run.
+
+AppDriver instruments every session it starts with the shared collector
+(get_command_metrics()); the behave hooks mark scenario boundaries and
+write the run summary as JSON or Prometheus text exposition format.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+
+# Histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed bucket bounds."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> List[int]:
+        """Observation counts per bucket including all smaller buckets, ending with +Inf."""
+        total, result = 0, []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class CommandStats:
+    """Count, error count and latency histogram of one command type."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.errors = 0
+        self.latency = Histogram(buckets)
+
+    @property
+    def count(self) -> int:
+        return self.latency.count
+
+    def to_dict(self) -> Dict[str, Any]:
+        latency = self.latency
+        return {
+            "count": latency.count,
+            "errors": self.errors,
+            "total_ms": round(latency.sum * 1000, 2),
+            "mean_ms": round(latency.sum * 1000 / latency.count, 2) if latency.count else 0.0,
+            "max_ms": round(latency.max * 1000, 2),
+            "buckets": dict(zip([str(bound) for bound in latency.buckets] + ["+Inf"], latency.cumulative())),
+        }
+
+
+def _is_error(response) -> bool:
+    """Whether a RemoteConnection.execute response carries a WebDriver error."""
+    if not isinstance(response, dict):
+        return False
+    value = response.get("value")
+    return (isinstance(value, dict) and "error" in value) or response.get("status") not in (None, 0, 200)
+
+
+def _summarize(stats: Dict[str, CommandStats]) -> Dict[str, Any]:
+    """Compact per-command summary (no buckets) for scenario events and console output."""
+    commands = {name: {key: value for key, value in command.to_dict().items() if key != "buckets"}
+                for name, command in sorted(stats.items(), key=lambda item: -item[1].count)}
+    return {
+        "commands": sum(command.count for command in stats.values()),
+        "errors": sum(command.errors for command in stats.values()),
+        "total_ms": round(sum(command.latency.sum for command in stats.values()) * 1000, 2),
+        "by_command": commands,
+    }
+
+
+class CommandMetrics:
+    """
+    Collects WebDriver command metrics for a run and its scenarios.
+
+    Thread-safe: commands may be recorded from any thread.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.run: Dict[str, CommandStats] = {}
+        self.scenarios: List[Dict[str, Any]] = []
+        self._scenario: Optional[Dict[str, CommandStats]] = None
+        self._scenario_name: Optional[str] = None
+        self.total = 0
+
+    def record(self, command: str, seconds: float, error: bool = False):
+        """Records one command round trip."""
+        with self._lock:
+            targets = [self.run] if self._scenario is None else [self.run, self._scenario]
+            for stats in targets:
+                command_stats = stats.get(command)
+                if command_stats is None:
+                    command_stats = stats[command] = CommandStats(self.buckets)
+                command_stats.latency.observe(seconds)
+                command_stats.errors += error
+            self.total += 1
+
+    def instrument(self, driver):
+        """
+        Wraps a WebDriver's command executor so every command is recorded.
+
+        Args:
+            driver: A selenium/appium WebDriver instance.
+
+        Returns:
+            The driver.
+        """
+        executor = driver.command_executor
+        if getattr(executor, "_command_metrics", None) is self:
+            return driver
+        execute = executor.execute
+
+        def timed_execute(command, params):
+            started = time.perf_counter()
+            try:
+                response = execute(command, params)
+            except Exception:
+                self.record(command, time.perf_counter() - started, error=True)
+                raise
+            self.record(command, time.perf_counter() - started, error=_is_error(response))
+            return response
+
+        executor.execute = timed_execute
+        executor._command_metrics = self
+        return driver
+
+    def start_scenario(self, name: str):
+        with self._lock:
+            self._scenario = {}
+            self._scenario_name = name
+
+    def end_scenario(self) -> Dict[str, Any]:
+        """
+        Closes the current scenario.
+
+        Returns:
+            dict: The scenario's command count, errors, total time and per-command summary.
+        """
+        with self._lock:
+            summary = dict(_summarize(self._scenario or {}), scenario=self._scenario_name)
+            self._scenario, self._scenario_name = None, None
+            if summary["commands"]:
+                self.scenarios.append(summary)
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "commands": sum(command.count for command in self.run.values()),
+                "by_command": {name: command.to_dict() for name, command in sorted(self.run.items())},
+                "scenarios": list(self.scenarios),
+            }
+
+    def to_prometheus(self, prefix: str = "appium") -> str:
+        """Renders the run totals and per-scenario counts in Prometheus text exposition format."""
+        def label(value):
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        with self._lock:
+            lines = [f"# HELP {prefix}_commands_total WebDriver commands sent.",
+                     f"# TYPE {prefix}_commands_total counter"]
+            for name, command in sorted(self.run.items()):
+                lines.append(f'{prefix}_commands_total{{command="{label(name)}"}} {command.count}')
+            lines += [f"# HELP {prefix}_command_errors_total WebDriver commands that returned an error.",
+                      f"# TYPE {prefix}_command_errors_total counter"]
+            for name, command in sorted(self.run.items()):
+                lines.append(f'{prefix}_command_errors_total{{command="{label(name)}"}} {command.errors}')
+            lines += [f"# HELP {prefix}_command_duration_seconds WebDriver command round-trip time.",
+                      f"# TYPE {prefix}_command_duration_seconds histogram"]
+            for name, command in sorted(self.run.items()):
+                labels = f'command="{label(name)}"'
+                bounds = [str(bound) for bound in command.latency.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, command.latency.cumulative()):
+                    lines.append(f'{prefix}_command_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{prefix}_command_duration_seconds_sum{{{labels}}} {command.latency.sum:.6f}")
+                lines.append(f"{prefix}_command_duration_seconds_count{{{labels}}} {command.count}")
+            lines += [f"# HELP {prefix}_scenario_commands_total WebDriver commands sent per scenario.",
+                      f"# TYPE {prefix}_scenario_commands_total counter"]
+            for scenario in self.scenarios:
+                for name, command in scenario["by_command"].items():
+                    lines.append(f'{prefix}_scenario_commands_total{{scenario="{label(scenario["scenario"])}",'
+                                 f'command="{label(name)}"}} {command["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> str:
+        """Writes the metrics to path: Prometheus text for .prom/.txt, JSON otherwise."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith((".prom", ".txt")):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        return path
+
+
+def format_summary(summary: Dict[str, Any], top: int = 5) -> str:
+    """One-line console summary of a scenario's commands, busiest command types first."""
+    busiest = ", ".join(f"{name} {command['count']}" for name, command in list(summary["by_command"].items())[:top])
+    errors = f", {summary['errors']} errors" if summary["errors"] else ""
+    return f"WebDriver commands: {summary['commands']} in {summary['total_ms']:.0f} ms ({busiest}){errors}"
+
+
+_default_metrics: Optional[CommandMetrics] = None
+
+
+def get_command_metrics() -> CommandMetrics:
+    """Returns the collector shared by AppDriver and the behave hooks."""
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = CommandMetrics()
+    return _default_metrics
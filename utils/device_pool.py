@@ -0,0 +1,377 @@
+"""
+Device Registry and Scheduler.
+
+Lists the devices in config/devices.yaml (platform, OS version, screen size,
+form factor) and hands them out to scenarios by capability tags:
+
+    @android / @ios           platform
+    @android11 / @ios15       platform and OS major version (several = any of them)
+    @phone / @tablet          form factor
+    @api                      API only, never holds a device
+
+A device is acquired when a scenario first opens the app and released when
+the scenario ends, so API scenarios and the time between scenarios leave
+devices free. Busy devices are marked with lock files in a directory shared
+by every behave process on the host; locks left by processes that died are
+reclaimed.
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import tempfile
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import yaml
+
+
+DEFAULT_DEVICES_PATH = os.path.join(os.path.dirname(__file__), "..", "config", "devices.yaml")
+DEFAULT_LOCK_DIR = os.path.join(tempfile.gettempdir(), "app-automation-devices")
+
+PLATFORMS = ("android", "ios")
+FORM_FACTORS = ("phone", "tablet")
+
+# Tags of scenarios that never need a device
+NO_DEVICE_TAGS = {"api"}
+
+_PLATFORM_TAG = re.compile(r"^(?P<platform>android|ios)(?P<major>\d+)?$")
+
+
+class DeviceError(RuntimeError):
+    """Raised when no device can be given to a scenario."""
+
+
+class NoMatchingDeviceError(DeviceError):
+    """No device in the registry satisfies the requirement."""
+
+
+class DeviceBusyError(DeviceError):
+    """Matching devices exist but none became free in time."""
+
+
+class Device(NamedTuple):
+    name: str
+    platform: str
+    os_version: str
+    screen_size: Tuple[int, int]
+    form_factor: str
+    udid: Optional[str] = None
+    appium: Optional[str] = None            # Appium server URL for this device
+    capabilities: Dict[str, Any] = {}       # Extra capabilities, config.yaml style keys
+
+    @property
+    def os_major(self) -> int:
+        return int(self.os_version.split(".")[0])
+
+    def describe(self) -> str:
+        width, height = self.screen_size
+        return f"{self.name} ({self.platform} {self.os_version}, {self.form_factor}, {width}x{height})"
+
+
+class DeviceRequirement(NamedTuple):
+    """What a scenario needs from a device; empty fields accept anything."""
+    targets: Tuple[Tuple[str, Optional[int]], ...] = ()   # (platform, OS major or None), any of them
+    form_factor: Optional[str] = None
+
+    def with_default_platform(self, platform: str) -> "DeviceRequirement":
+        """The requirement, restricted to a platform when its tags name none."""
+        return self if self.targets else self._replace(targets=((platform, None),))
+
+    def matches(self, device: Device) -> bool:
+        if self.form_factor and device.form_factor != self.form_factor:
+            return False
+        return not self.targets or any(
+            device.platform == platform and (major is None or device.os_major == major)
+            for platform, major in self.targets)
+
+    def describe(self) -> str:
+        parts = [f"@{platform}{major or ''}" for platform, major in self.targets]
+        if self.form_factor:
+            parts.append(f"@{self.form_factor}")
+        return " ".join(parts) or "any device"
+
+
+def requirement_from_tags(tags: Iterable[str]) -> Optional[DeviceRequirement]:
+    """
+    Builds a scenario's device requirement from its tags.
+
+    Args:
+        tags (iterable): Scenario tags, without "@" (as behave gives them).
+
+    Returns:
+        DeviceRequirement: The requirement, or None for API-only scenarios.
+    """
+    tags = [tag.lstrip("@").lower() for tag in tags]
+    if NO_DEVICE_TAGS.intersection(tags):
+        return None
+    targets, form_factor = [], None
+    for tag in tags:
+        match = _PLATFORM_TAG.match(tag)
+        if match:
+            major = match.group("major")
+            targets.append((match.group("platform"), int(major) if major else None))
+        elif tag in FORM_FACTORS:
+            form_factor = tag
+    return DeviceRequirement(tuple(targets), form_factor)
+
+
+def _parse_screen_size(value: str) -> Tuple[int, int]:
+    width, height = str(value).lower().split("x")
+    return int(width), int(height)
+
+
+def _pid_alive(pid: int) -> bool:
+    # os.kill(pid, 0) would terminate the process on Windows, so locks are never reclaimed there
+    if os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class DevicePool:
+    """The registered devices and their busy/free state."""
+
+    def __init__(self, path: str = DEFAULT_DEVICES_PATH, lock_dir: Optional[str] = None):
+        """
+        Loads the registry.
+
+        Args:
+            path (str): Path to the devices YAML file; a missing file means no devices.
+            lock_dir (str): Directory of the busy markers (default: scheduler.lock_dir,
+                else a directory under the system temp dir).
+
+        Raises:
+            ValueError: If a device definition is invalid.
+        """
+        self.path = path
+        data = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                data = yaml.safe_load(file) or {}
+        scheduler = data.get("scheduler", {}) or {}
+        self.acquire_timeout = float(scheduler.get("acquire_timeout", 600))
+        self.poll_interval = float(scheduler.get("poll_interval", 2))
+        self.lock_dir = lock_dir or os.environ.get("DEVICE_LOCK_DIR") or scheduler.get("lock_dir") or DEFAULT_LOCK_DIR
+        self.devices: List[Device] = self._load_devices(data.get("devices", []) or [])
+
+    def _load_devices(self, entries: List[Dict[str, Any]]) -> List[Device]:
+        devices, errors = [], []
+        for index, entry in enumerate(entries):
+            where = entry.get("name") or f"devices[{index}]"
+            try:
+                device = Device(
+                    name=entry["name"],
+                    platform=str(entry["platform"]).lower(),
+                    os_version=str(entry["os_version"]),
+                    screen_size=_parse_screen_size(entry["screen_size"]),
+                    form_factor=entry.get("form_factor", "phone"),
+                    udid=entry.get("udid"),
+                    appium=entry.get("appium"),
+                    capabilities=entry.get("capabilities") or {},
+                )
+                device.os_major  # Raises ValueError for a malformed os_version
+            except KeyError as e:
+                errors.append(f"{where}: missing {e.args[0]}")
+                continue
+            except ValueError as e:
+                errors.append(f"{where}: {e}")
+                continue
+            if device.platform not in PLATFORMS:
+                errors.append(f"{where}: unknown platform '{device.platform}'")
+            elif device.form_factor not in FORM_FACTORS:
+                errors.append(f"{where}: form_factor must be one of {', '.join(FORM_FACTORS)}")
+            elif any(other.name == device.name for other in devices):
+                errors.append(f"{where}: duplicate device name")
+            else:
+                devices.append(device)
+        if errors:
+            raise ValueError(f"Invalid devices in {self.path}:\n  " + "\n  ".join(errors))
+        return devices
+
+    def candidates(self, requirement: DeviceRequirement) -> List[Device]:
+        """
+        Devices that satisfy a requirement, in the order they are tried.
+
+        Phones come before tablets when the requirement does not ask for a
+        form factor, keeping the scarcer tablets free for @tablet scenarios.
+        """
+        matching = [device for device in self.devices if requirement.matches(device)]
+        if requirement.form_factor is None:
+            matching.sort(key=lambda device: device.form_factor != "phone")
+        return matching
+
+    def _lock_path(self, device: Device) -> str:
+        return os.path.join(self.lock_dir, f"{device.name}.lock")
+
+    def holder(self, device: Device) -> Optional[Dict[str, Any]]:
+        """Who holds a device (pid, host, owner, since), or None if it is free."""
+        try:
+            with open(self._lock_path(device), 'r', encoding='utf-8') as f:
+                holder = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # Being written right now
+            return {"pid": None, "host": None, "owner": "", "since": None}
+        if holder.get("host") == socket.gethostname() and holder.get("pid") and not _pid_alive(holder["pid"]):
+            return None
+        return holder
+
+    def _try_lock(self, device: Device, owner: str) -> bool:
+        path = self._lock_path(device)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if self.holder(device) is not None:
+                    return False
+                # Left behind by a process that died
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"pid": os.getpid(), "host": socket.gethostname(), "owner": owner,
+                           "since": time.time()}, f)
+            return True
+        return False
+
+    def try_acquire(self, requirement: DeviceRequirement, owner: str = "") -> Optional[Device]:
+        """
+        Marks the first free matching device busy.
+
+        Returns:
+            Device: The acquired device, or None if every matching device is busy.
+        """
+        os.makedirs(self.lock_dir, exist_ok=True)
+        for device in self.candidates(requirement):
+            if self._try_lock(device, owner):
+                return device
+        return None
+
+    def acquire(self, requirement: DeviceRequirement, owner: str = "",
+                timeout: Optional[float] = None) -> Device:
+        """
+        Waits for a free device that satisfies a requirement and marks it busy.
+
+        Args:
+            requirement (DeviceRequirement): What the scenario needs.
+            owner (str): Shown as the holder, e.g. the scenario name.
+            timeout (float): Seconds to wait (default: scheduler.acquire_timeout).
+
+        Raises:
+            NoMatchingDeviceError: If no registered device satisfies the requirement.
+            DeviceBusyError: If no matching device became free in time.
+        """
+        if not self.candidates(requirement):
+            raise NoMatchingDeviceError(f"No device in {self.path} matches {requirement.describe()}")
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waiting = False
+        while True:
+            device = self.try_acquire(requirement, owner)
+            if device is not None:
+                return device
+            if time.monotonic() >= deadline:
+                raise DeviceBusyError(f"No device matching {requirement.describe()} became free "
+                                      f"within {timeout:.0f}s")
+            if not waiting:
+                print(f"All devices matching {requirement.describe()} are busy, waiting...")
+                waiting = True
+            time.sleep(self.poll_interval)
+
+    def release(self, device: Device):
+        """Marks a device free again; only the holding process can release it."""
+        holder = self.holder(device)
+        if holder is not None and holder.get("pid") == os.getpid() and holder.get("host") == socket.gethostname():
+            os.remove(self._lock_path(device))
+
+    def force_release(self, device: Device):
+        """Marks a device free whoever holds it, e.g. after a crash on another host."""
+        try:
+            os.remove(self._lock_path(device))
+        except FileNotFoundError:
+            pass
+
+    def get(self, name: str) -> Device:
+        for device in self.devices:
+            if device.name == name:
+                return device
+        raise KeyError(f"Unknown device '{name}', expected one of: {', '.join(d.name for d in self.devices)}")
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Every device with its busy/free state and holder."""
+        result = []
+        for device in self.devices:
+            holder = self.holder(device)
+            result.append({"name": device.name, "platform": device.platform, "os_version": device.os_version,
+                           "screen_size": "x".join(map(str, device.screen_size)),
+                           "form_factor": device.form_factor, "state": "busy" if holder else "free",
+                           "holder": holder})
+        return result
+
+
+_default_pool: Optional[DevicePool] = None
+
+
+def get_device_pool() -> DevicePool:
+    """Returns the shared pool, loading config/devices.yaml (or $DEVICES_CONFIG) on first use."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = DevicePool(os.environ.get("DEVICES_CONFIG", DEFAULT_DEVICES_PATH))
+    return _default_pool
+
+
+def main(argv=None):
+    """Shows the devices and their state, or which devices each scenario can run on."""
+    parser = argparse.ArgumentParser(description="Device registry and scheduler")
+    parser.add_argument("--plan", action="store_true", help="Show the devices each scenario can run on")
+    parser.add_argument("--platform", choices=PLATFORMS, default=os.environ.get("APP_PLATFORM", "android"),
+                        help="Platform of scenarios without a platform tag (default: android)")
+    parser.add_argument("--release", metavar="NAME", help="Mark a device free, whoever holds it")
+    args = parser.parse_args(argv)
+
+    pool = get_device_pool()
+    if args.release:
+        pool.force_release(pool.get(args.release))
+        print(f"Released {args.release}")
+        return 0
+
+    if args.plan:
+        from utils.impact_analysis import discover_scenarios
+
+        for scenario in discover_scenarios():
+            requirement = requirement_from_tags(scenario.tags)
+            if requirement is None:
+                placement = "no device (API only)"
+            elif not pool.devices:
+                placement = f"{requirement.with_default_platform(args.platform).describe()} via config.yaml"
+            else:
+                requirement = requirement.with_default_platform(args.platform)
+                candidates = pool.candidates(requirement)
+                placement = (", ".join(device.name for device in candidates) if candidates
+                             else f"skipped, no device matches {requirement.describe()}")
+            print(f"{scenario.location}: {placement}")
+        return 0
+
+    if not pool.devices:
+        print(f"No devices registered in {pool.path}")
+    for entry in pool.status():
+        holder = entry["holder"]
+        state = (f"busy ({holder.get('owner') or 'unknown'}, pid {holder.get('pid')} on {holder.get('host')})"
+                 if holder else "free")
+        print(f"{entry['name']:<26} {entry['platform']:<8} {entry['os_version']:<6} {entry['form_factor']:<7} "
+              f"{entry['screen_size']:<10} {state}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,225 @@
+"""
+Structured Test Event Bus.
+
+The behave hooks publish run/feature/scenario/step events to an EventBus.
+Subscribers decide what to do with them: JsonlSink batches them to a JSONL
+file on a background thread, QueueSink hands them to in-process consumers,
+and ConsoleSubscriber prints the human-readable progress lines.
+
+Events are plain dicts with at least:
+    event   -- event type, e.g. "scenario_end"
+    ts      -- time.monotonic() timestamp (use for durations and ordering)
+    wall    -- time.time() timestamp (use for display)
+    pid     -- id of the publishing process
+"""
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+Event = Dict[str, Any]
+
+# Event types published by features/environment.py
+RUN_START = "run_start"
+RUN_END = "run_end"
+FEATURE_START = "feature_start"
+FEATURE_END = "feature_end"
+SCENARIO_START = "scenario_start"
+SCENARIO_END = "scenario_end"
+STEP_START = "step_start"
+STEP_END = "step_end"
+
+
+class EventBus:
+    """Publishes events to subscribers."""
+
+    def __init__(self):
+        self._subscribers: List[Callable[[Event], None]] = []
+        self._closers: List[Callable[[], None]] = []
+        self._pid = os.getpid()
+
+    def subscribe(self, subscriber: Callable[[Event], None]):
+        """
+        Adds a subscriber.
+
+        Args:
+            subscriber: Callable receiving each event dict. If it has a close()
+                method, that is called when the bus is closed.
+        """
+        self._subscribers.append(subscriber)
+        close = getattr(subscriber, "close", None)
+        if callable(close):
+            self._closers.append(close)
+
+    def publish(self, event_type: str, **fields) -> Event:
+        """
+        Publishes an event to every subscriber.
+
+        Args:
+            event_type (str): The event type.
+            **fields: Event payload.
+
+        Returns:
+            dict: The published event.
+        """
+        event = {"event": event_type, "ts": time.monotonic(), "wall": time.time(), "pid": self._pid}
+        event.update(fields)
+        for subscriber in self._subscribers:
+            subscriber(event)
+        return event
+
+    def close(self):
+        """Closes subscribers that hold resources, flushing buffered events."""
+        for close in self._closers:
+            close()
+        self._closers = []
+
+
+class JsonlSink:
+    """
+    Writes events to a JSONL file from a background thread.
+
+    publish() only enqueues the event; the writer thread drains the queue
+    in batches and writes each batch with a single write() call.
+    """
+
+    def __init__(self, path: str, batch_size: int = 200, flush_interval: float = 0.2):
+        """
+        Opens the sink.
+
+        Args:
+            path (str): JSONL file to append events to.
+            batch_size (int): Maximum events per write.
+            flush_interval (float): Maximum seconds an event waits before being written.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.SimpleQueue[Optional[Event]]" = queue.SimpleQueue()
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+        self._thread.start()
+
+    def __call__(self, event: Event):
+        self._queue.put(event)
+
+    def _run(self):
+        """Drains the queue in batches until the closing sentinel arrives."""
+        while True:
+            batch = []
+            try:
+                event = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            closing = event is None
+            if not closing:
+                batch.append(event)
+                while len(batch) < self.batch_size:
+                    try:
+                        event = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if event is None:
+                        closing = True
+                        break
+                    batch.append(event)
+            if batch:
+                self._file.write("".join(
+                    json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in batch))
+                self._file.flush()
+            if closing:
+                return
+
+    def close(self):
+        """Writes all pending events and closes the file."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if not self._file.closed:
+            self._file.close()
+
+
+class QueueSink:
+    """Hands events to an in-process consumer through a queue."""
+
+    def __init__(self, event_queue: Optional[queue.Queue] = None):
+        self.queue = event_queue if event_queue is not None else queue.Queue()
+
+    def __call__(self, event: Event):
+        self.queue.put_nowait(event)
+
+
+class ConsoleSubscriber:
+    """Prints human-readable progress lines for events."""
+
+    def __call__(self, event: Event):
+        handler = getattr(self, f"on_{event['event']}", None)
+        if handler:
+            handler(event)
+
+    def on_feature_start(self, event):
+        print(f"\nStarting feature: {event['name']}")
+
+    def on_scenario_start(self, event):
+        print(f"  - Starting scenario: {event['name']}")
+
+    def on_step_start(self, event):
+        print(f"    - Executing step: {event['name']}")
+
+    def on_step_end(self, event):
+        status = event['status']
+        if status in ("failed", "passed"):
+            print(f"    - Step {status}: {event['name']}")
+        else:
+            print(f"    - Step skipped: {event['name']}")
+
+    def on_feature_end(self, event):
+        print(f"Feature finished: {event['name']} (Duration: {event['duration']:.2f}s)")
+
+    def on_run_end(self, event):
+        summary = event.get("summary")
+        if not summary:
+            return
+        print(f"Total features: {summary['features']}")
+        print(f"Total scenarios: {summary['scenarios']}")
+        print(f"Passed scenarios: {summary['scenarios_passed']}")
+        print(f"Failed scenarios: {summary['scenarios_failed']}")
+        print(f"Total steps: {summary['steps']}")
+        print(f"Passed steps: {summary['steps_passed']}")
+        print(f"Failed steps: {summary['steps_failed']}")
+        print(f"Skipped steps: {summary['steps_skipped']}")
+
+
+def _is_off(value: Optional[str]) -> bool:
+    """True for "off"/"false"/"0"/"no" (case-insensitive)."""
+    return str(value).strip().lower() in ("off", "false", "0", "no")
+
+
+def create_event_bus(userdata: Optional[Dict[str, str]] = None) -> EventBus:
+    """
+    Builds the event bus for a behave run.
+
+    Configured from behave userdata (-D key=value) or environment variables:
+        events_file / BEHAVE_EVENTS_FILE  -- JSONL file to write events to
+        console / BEHAVE_CONSOLE          -- "off" disables the console progress lines
+
+    Args:
+        userdata (dict): behave's context.config.userdata.
+
+    Returns:
+        EventBus: The configured bus.
+    """
+    userdata = userdata or {}
+    bus = EventBus()
+    events_file = userdata.get("events_file", os.environ.get("BEHAVE_EVENTS_FILE"))
+    if events_file:
+        bus.subscribe(JsonlSink(events_file))
+    if not _is_off(userdata.get("console", os.environ.get("BEHAVE_CONSOLE", "on"))):
+        bus.subscribe(ConsoleSubscriber())
+    return bus
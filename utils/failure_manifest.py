@@ -0,0 +1,85 @@
+"""
+Failure Manifest for Rerunning Failed Scenarios.
+
+The after_scenario hook records every failed scenario's location
+(feature path plus line, which behave accepts as a run target), and
+after_all writes them to a JSON manifest. run_tests.py --rerun-failed
+reads the manifest and runs only those locations.
+"""
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_MANIFEST_PATH = os.path.join("reports", "failed_scenarios.json")
+
+
+def get_manifest_path(userdata: Optional[Dict[str, str]] = None) -> str:
+    """
+    Gets the manifest path: -D failure_manifest=..., else $FAILURE_MANIFEST, else the default.
+    """
+    userdata = userdata or {}
+    return userdata.get("failure_manifest", os.environ.get("FAILURE_MANIFEST", DEFAULT_MANIFEST_PATH))
+
+
+def failure_entry(scenario) -> Dict[str, Any]:
+    """
+    Builds the manifest entry for a failed behave scenario.
+
+    Args:
+        scenario: The behave Scenario.
+
+    Returns:
+        dict: location ("path:line"), feature and scenario names, and tags.
+    """
+    location = scenario.location
+    return {
+        "location": f"{location.filename}:{location.line}",
+        "feature": scenario.feature.name,
+        "scenario": scenario.name,
+        "tags": list(scenario.effective_tags),
+    }
+
+
+def write_manifest(path: str, failures: List[Dict[str, Any]]):
+    """
+    Writes the manifest atomically, replacing any previous one.
+
+    An empty list is written too, so a clean run clears old failures.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    manifest = {"generated": datetime.now().isoformat(), "failures": failures}
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def read_manifest(path: str = DEFAULT_MANIFEST_PATH) -> List[Dict[str, Any]]:
+    """
+    Reads the failures recorded in a manifest.
+
+    Returns:
+        list: Failure entries, or an empty list if the manifest does not exist.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get("failures", [])
+
+
+def flakiness_score(runs: int, failures: int) -> float:
+    """
+    Scores how flaky a scenario is over repeated runs.
+
+    Returns:
+        float: 0.0 when every run had the same outcome, up to 1.0 when it
+            passed and failed equally often.
+    """
+    if runs == 0:
+        return 0.0
+    fail_rate = failures / runs
+    return round(1.0 - abs(1.0 - 2.0 * fail_rate), 3)
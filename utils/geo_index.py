@@ -0,0 +1,186 @@
+"""
+Spatial Index over City Coordinates.
+"""
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Number of points kept in a KD-tree leaf before it is split further
+LEAF_SIZE = 8
+
+
+def _to_unit_vector(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    """Converts latitude/longitude in degrees to a point on the unit sphere."""
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return (cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat))
+
+
+def _chord_to_km(chord_sq: float) -> float:
+    """Converts a squared chord length on the unit sphere to a great-circle distance in km."""
+    half_chord = min(math.sqrt(chord_sq) / 2.0, 1.0)
+    return 2.0 * EARTH_RADIUS_KM * math.asin(half_chord)
+
+
+def _km_to_chord_sq(distance_km: float) -> float:
+    """Converts a great-circle distance in km to a squared chord length on the unit sphere."""
+    angle = min(distance_km / EARTH_RADIUS_KM, math.pi)
+    chord = 2.0 * math.sin(angle / 2.0)
+    return chord * chord
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Calculates the great-circle distance between two points.
+
+    Args:
+        lat1 (float): Latitude of the first point in degrees.
+        lon1 (float): Longitude of the first point in degrees.
+        lat2 (float): Latitude of the second point in degrees.
+        lon2 (float): Longitude of the second point in degrees.
+
+    Returns:
+        float: The distance in kilometres.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2.0 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class CitySpatialIndex:
+    """
+    KD-tree over city coordinates.
+
+    Cities are stored as 3D points on the unit sphere, so the straight-line
+    (chord) distance is monotonic with the great-circle distance and the
+    tree needs no special handling for the antimeridian or the poles.
+    """
+
+    def __init__(self, cities: Dict[str, Dict[str, Any]]):
+        """
+        Builds the index.
+
+        Args:
+            cities (dict): City data keyed by city key, as found in the test data.
+                Cities without usable coordinates are skipped.
+        """
+        self._keys: List[str] = []
+        self._points: List[Tuple[float, float, float]] = []
+        for city_key, city_data in cities.items():
+            coordinates = (city_data or {}).get("coordinates") or {}
+            latitude = coordinates.get("latitude")
+            longitude = coordinates.get("longitude")
+            if latitude is None or longitude is None:
+                continue
+            self._keys.append(city_key)
+            self._points.append(_to_unit_vector(float(latitude), float(longitude)))
+        self._root = self._build(list(range(len(self._points))))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _build(self, indices: List[int]):
+        """Recursively builds a tree node for the given point indices."""
+        if len(indices) <= LEAF_SIZE:
+            return indices
+
+        # Split on the axis with the largest spread
+        points = self._points
+        spreads = []
+        for axis in range(3):
+            values = [points[i][axis] for i in indices]
+            spreads.append(max(values) - min(values))
+        axis = spreads.index(max(spreads))
+
+        indices.sort(key=lambda i: points[i][axis])
+        middle = len(indices) // 2
+        split = points[indices[middle]][axis]
+        return (axis, split, self._build(indices[:middle]), self._build(indices[middle:]))
+
+    def nearest(self, latitude: float, longitude: float) -> Optional[Tuple[str, float]]:
+        """
+        Finds the city closest to a location.
+
+        Args:
+            latitude (float): Latitude in degrees.
+            longitude (float): Longitude in degrees.
+
+        Returns:
+            tuple: (city_key, distance_km), or None if the index is empty.
+        """
+        if not self._keys:
+            return None
+
+        query = _to_unit_vector(latitude, longitude)
+        points = self._points
+        best_sq, best_index = float("inf"), -1
+        # Each entry carries the squared distance to the splitting plane that
+        # separates it from the query, so whole subtrees can be pruned on pop.
+        stack = [(0.0, self._root)]
+        while stack:
+            plane_sq, node = stack.pop()
+            if plane_sq >= best_sq:
+                continue
+            if isinstance(node, list):
+                for i in node:
+                    p = points[i]
+                    dx, dy, dz = p[0] - query[0], p[1] - query[1], p[2] - query[2]
+                    dist_sq = dx * dx + dy * dy + dz * dz
+                    if dist_sq < best_sq:
+                        best_sq, best_index = dist_sq, i
+                continue
+
+            axis, split, left, right = node
+            diff = query[axis] - split
+            near, far = (left, right) if diff < 0 else (right, left)
+            # Push the far side first so the near side is explored first
+            stack.append((diff * diff, far))
+            stack.append((0.0, near))
+
+        return self._keys[best_index], _chord_to_km(best_sq)
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[str, float]]:
+        """
+        Finds all cities within a radius of a location.
+
+        Args:
+            latitude (float): Latitude in degrees.
+            longitude (float): Longitude in degrees.
+            radius_km (float): Search radius in kilometres.
+
+        Returns:
+            list: (city_key, distance_km) tuples, closest first.
+        """
+        if not self._keys or radius_km < 0:
+            return []
+
+        query = _to_unit_vector(latitude, longitude)
+        limit_sq = _km_to_chord_sq(radius_km)
+        points = self._points
+        matches = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                for i in node:
+                    p = points[i]
+                    dx, dy, dz = p[0] - query[0], p[1] - query[1], p[2] - query[2]
+                    dist_sq = dx * dx + dy * dy + dz * dz
+                    if dist_sq <= limit_sq:
+                        matches.append((dist_sq, i))
+                continue
+
+            axis, split, left, right = node
+            diff = query[axis] - split
+            if diff < 0 or diff * diff <= limit_sq:
+                stack.append(left)
+            if diff >= 0 or diff * diff <= limit_sq:
+                stack.append(right)
+
+        matches.sort()
+        return [(self._keys[i], _chord_to_km(dist_sq)) for dist_sq, i in matches]
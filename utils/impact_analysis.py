@@ -0,0 +1,804 @@
+"""
+Test Impact Analysis.
+
+Builds an index from each scenario to the code it exercises, then selects
+the scenarios affected by a git diff so only those need to run.
+
+The index is built by static analysis:
+    - feature files are parsed into scenarios (outline rows included) and steps
+    - steps are matched to the step definitions in features/steps/
+    - step functions, page objects and utils modules are parsed into a
+      symbol graph: which functions, methods, class attributes and locators
+      (config/locators.yaml) each symbol uses
+and can be extended with runtime coverage recorded by the behave hooks
+when IMPACT_COVERAGE is set (see CoverageRecorder).
+
+Usage:
+    python -m utils.impact_analysis --since origin/main
+"""
+import argparse
+import ast
+import fnmatch
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import yaml
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FEATURES_DIR = "features"
+STEPS_DIR = os.path.join("features", "steps")
+LOCATORS_FILE = os.path.join("config", "locators.yaml")
+DEFAULT_COVERAGE_PATH = os.path.join("reports", "impact_coverage.json")
+
+# Changes to these files can affect every scenario
+GLOBAL_FILES = {
+    "features/environment.py",
+    "config/config.yaml",
+    "config/devices.yaml",
+    "test_data/mock_ui.yaml",
+    "behave.ini",
+    "requirements.txt",
+    "run_tests.py",
+}
+
+# Data files and the module that loads them: a change affects the scenarios using that module
+DATA_FILES = {
+    "test_data/weather_data.yaml": "utils/test_data_manager.py",
+    "config/app_states.yaml": "utils/app_states.py",
+}
+
+# Files that never change what a scenario does (fnmatch patterns)
+UNRELATED_FILES = ("*.md", ".gitignore", ".github/*", "benchmarks/*")
+
+# Python sources that make up the symbol graph
+SOURCE_DIRS = ("utils", STEPS_DIR)
+
+# Marker returned when every scenario is affected
+ALL = "*"
+
+_STEP_KEYWORDS = ("Given", "When", "Then", "And", "But", "*")
+_SCENARIO_KEYWORDS = ("Scenario Outline", "Scenario Template", "Scenario", "Example")
+_EXAMPLES_KEYWORDS = ("Examples", "Scenarios")
+
+
+# ---------------------------------------------------------------------------
+# Feature files
+# ---------------------------------------------------------------------------
+
+class Step(NamedTuple):
+    step_type: str      # given / when / then
+    text: str
+    line: int
+
+
+class ScenarioInfo(NamedTuple):
+    location: str       # "path:line" as accepted by behave
+    name: str
+    feature: str
+    tags: Tuple[str, ...]
+    steps: Tuple[Step, ...]
+    first_line: int     # first line of the scenario (or outline) block
+    last_line: int      # last line of the block
+    background: Tuple[int, int]  # line range of the feature's Background, or (0, 0)
+
+
+def _keyword(line: str, keywords: Iterable[str]) -> Optional[str]:
+    """Returns the keyword a stripped line starts with, e.g. "Scenario", or None."""
+    for keyword in keywords:
+        if line.startswith(keyword + ":"):
+            return keyword
+    return None
+
+
+def parse_feature_file(path: str) -> List[ScenarioInfo]:
+    """
+    Parses a Gherkin feature file into runnable scenarios.
+
+    Scenario Outlines yield one scenario per Examples row, located at the row
+    line (as behave does). Background steps are prepended to every scenario.
+
+    Args:
+        path (str): Path of the feature file, relative to the project root.
+
+    Returns:
+        list: The scenarios in file order.
+    """
+    with open(os.path.join(PROJECT_ROOT, path), 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    feature_name = ""
+    feature_tags: List[str] = []
+    pending_tags: List[str] = []
+    background: List[Step] = []
+    background_range = (0, 0)
+    blocks = []                 # parsed scenario / outline blocks
+    current = None              # block being filled: dict
+    last_step_type = "given"
+    in_docstring = None
+    examples = None             # {"header": [...], "rows": [...]} of the current Examples table
+
+    def close_block(end_line):
+        if current is not None:
+            current["last_line"] = end_line
+            blocks.append(current)
+
+    for number, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if in_docstring:
+            if line.startswith(in_docstring):
+                in_docstring = None
+            continue
+        if line.startswith('"""') or line.startswith("```"):
+            in_docstring = line[:3]
+            continue
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("@"):
+            pending_tags.extend(tag.lstrip("@") for tag in line.split() if tag.startswith("@"))
+            continue
+
+        if line.startswith("Feature:"):
+            feature_name = line[len("Feature:"):].strip()
+            feature_tags, pending_tags = pending_tags, []
+            continue
+        if line.startswith("Background:"):
+            close_block(number - 1)
+            current, examples = {"kind": "background", "steps": [], "first_line": number}, None
+            background_range = (number, number)
+            last_step_type = "given"
+            continue
+        keyword = _keyword(line, _SCENARIO_KEYWORDS)
+        if keyword:
+            if current is not None and current["kind"] == "background":
+                background = current["steps"]
+                background_range = (current["first_line"], number - 1)
+                current = None
+            close_block(number - 1)
+            current = {
+                "kind": "outline" if keyword in ("Scenario Outline", "Scenario Template") else "scenario",
+                "name": line[len(keyword) + 1:].strip(),
+                "tags": tuple(feature_tags + pending_tags),
+                "steps": [],
+                "examples": [],
+                "first_line": number,
+            }
+            pending_tags, examples = [], None
+            last_step_type = "given"
+            continue
+        if _keyword(line, _EXAMPLES_KEYWORDS) and current is not None:
+            examples = {"header": None, "rows": [], "tags": tuple(pending_tags)}
+            current["examples"].append(examples)
+            pending_tags = []
+            continue
+        if line.startswith("|"):
+            if examples is not None:
+                cells = [cell.strip() for cell in line.strip("|").split("|")]
+                if examples["header"] is None:
+                    examples["header"] = cells
+                else:
+                    examples["rows"].append((number, cells))
+            continue  # step tables are not needed for matching
+
+        for step_keyword in _STEP_KEYWORDS:
+            if line.startswith(step_keyword + " ") or line == step_keyword:
+                if step_keyword in ("Given", "When", "Then"):
+                    last_step_type = step_keyword.lower()
+                if current is not None:
+                    current["steps"].append(Step(last_step_type, line[len(step_keyword):].strip(), number))
+                break
+
+    if current is not None and current["kind"] == "background":
+        background = current["steps"]
+        background_range = (current["first_line"], len(lines))
+        current = None
+    close_block(len(lines))
+
+    scenarios = []
+    for block in blocks:
+        if block["kind"] == "background":
+            continue
+        if block["kind"] == "scenario":
+            scenarios.append(ScenarioInfo(
+                f"{path}:{block['first_line']}", block["name"], feature_name, block["tags"],
+                tuple(background + block["steps"]), block["first_line"], block["last_line"],
+                background_range))
+            continue
+        for table in block["examples"]:
+            for row_line, cells in table["rows"]:
+                values = dict(zip(table["header"] or [], cells))
+                steps = tuple(background) + tuple(
+                    step._replace(text=_substitute(step.text, values)) for step in block["steps"])
+                scenarios.append(ScenarioInfo(
+                    f"{path}:{row_line}", _substitute(block["name"], values), feature_name,
+                    block["tags"] + table["tags"], steps, block["first_line"], block["last_line"],
+                    background_range))
+    return scenarios
+
+
+def _substitute(text: str, values: Dict[str, str]) -> str:
+    """Replaces <param> placeholders of an outline step with an Examples row."""
+    for name, value in values.items():
+        text = text.replace(f"<{name}>", value)
+    return text
+
+
+def discover_scenarios(features_dir: str = FEATURES_DIR) -> List[ScenarioInfo]:
+    """Parses every feature file under the features directory."""
+    scenarios = []
+    for root, _, files in os.walk(os.path.join(PROJECT_ROOT, features_dir)):
+        for name in sorted(files):
+            if name.endswith(".feature"):
+                relative = os.path.relpath(os.path.join(root, name), PROJECT_ROOT).replace(os.sep, "/")
+                scenarios.extend(parse_feature_file(relative))
+    return scenarios
+
+
+# ---------------------------------------------------------------------------
+# Python symbol graph
+# ---------------------------------------------------------------------------
+
+_PARSE_FIELD = re.compile(r"\{([^{}:]*)(?::([^{}]*))?\}")
+_PARSE_TYPES = {"d": r"-?\d+", "n": r"-?[\d,]+", "w": r"\w+", "f": r"-?\d*\.\d+", "g": r"-?[\d.eE+-]+"}
+
+
+def step_pattern_to_regex(pattern: str) -> "re.Pattern":
+    """Converts a behave "parse" step pattern to an anchored regular expression."""
+    parts = []
+    position = 0
+    for match in _PARSE_FIELD.finditer(pattern):
+        parts.append(re.escape(pattern[position:match.start()]))
+        parts.append(f"({_PARSE_TYPES.get(match.group(2) or '', '.+?')})")
+        position = match.end()
+    parts.append(re.escape(pattern[position:]))
+    return re.compile("^" + "".join(parts) + "$")
+
+
+class StepDefinition(NamedTuple):
+    step_type: str      # given / when / then / step
+    regex: "re.Pattern"
+    symbol: str
+
+
+class _Symbol:
+    """A function, class, class member or module-level name in the graph."""
+
+    def __init__(self, symbol_id, path, first_line, last_line):
+        self.id = symbol_id
+        self.path = path
+        self.first_line = first_line
+        self.last_line = last_line
+        self.deps: Set[str] = set()
+
+
+class SymbolGraph:
+    """
+    Symbols of the project's Python sources and what each of them uses.
+
+    Symbol ids look like "utils/page_objects.py::MainPage.click_search";
+    locators are "locator:search.city_by_name"; "<module>" stands for a
+    file's module-level statements (imports, constants without a name).
+    """
+
+    def __init__(self):
+        self.symbols: Dict[str, _Symbol] = {}
+        self.files: Dict[str, List[_Symbol]] = {}
+        self.classes: Dict[str, Dict] = {}          # class symbol id -> {bases, page, members}
+        self.imports: Dict[str, Dict[str, str]] = {}  # path -> local name -> symbol id or module path
+        self.context_types: Dict[str, str] = {}     # context attribute -> class symbol id
+        self.step_definitions: List[StepDefinition] = []
+        self.locator_lines: Dict[str, Tuple[int, int]] = {}
+
+    # -- building -----------------------------------------------------------
+
+    def build(self, source_dirs=SOURCE_DIRS, locators_file=LOCATORS_FILE):
+        """Parses every source file and resolves the dependencies between symbols."""
+        paths = []
+        for source_dir in source_dirs:
+            directory = os.path.join(PROJECT_ROOT, source_dir)
+            if os.path.isdir(directory):
+                paths.extend(
+                    f"{source_dir}/{name}".replace(os.sep, "/")
+                    for name in sorted(os.listdir(directory)) if name.endswith(".py"))
+        trees = {}
+        for path in paths:
+            with open(os.path.join(PROJECT_ROOT, path), 'r', encoding='utf-8') as f:
+                trees[path] = ast.parse(f.read(), filename=path)
+            self._collect_definitions(path, trees[path])
+        for path, tree in trees.items():
+            self._collect_dependencies(path, tree)
+        self._load_locator_lines(locators_file)
+        return self
+
+    def _add(self, symbol_id, path, node_or_lines):
+        if isinstance(node_or_lines, tuple):
+            first, last = node_or_lines
+        else:
+            first = min([node_or_lines.lineno] + [d.lineno for d in getattr(node_or_lines, "decorator_list", [])])
+            last = node_or_lines.end_lineno
+        symbol = _Symbol(symbol_id, path, first, last)
+        self.symbols[symbol_id] = symbol
+        self.files.setdefault(path, []).append(symbol)
+        return symbol
+
+    def _collect_definitions(self, path, tree):
+        """Registers the top-level symbols, class members and imports of a file."""
+        module = self._add(f"{path}::<module>", path, (0, 0))
+        imports = self.imports.setdefault(path, {})
+        # Imports inside functions count too (lazy imports keep behave startup fast)
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                self._collect_import(path, node, imports)
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                symbol = self._add(f"{path}::{node.name}", path, node)
+                symbol.deps.add(module.id)
+                self._collect_step_definition(node, symbol.id)
+            elif isinstance(node, ast.ClassDef):
+                self._collect_class(path, node, module.id)
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        self._add(f"{path}::{target.id}", path, node).deps.add(module.id)
+
+    def _collect_import(self, path, node, imports):
+        """Maps imported local names to in-project symbols or modules."""
+        if isinstance(node, ast.ImportFrom) and node.module:
+            module_path = self._module_path(node.module, path, node.level)
+            if module_path:
+                for alias in node.names:
+                    imports[alias.asname or alias.name] = f"{module_path}::{alias.name}"
+            elif node.level == 0 and node.module in ("utils",):
+                for alias in node.names:
+                    target = self._module_path(f"utils.{alias.name}", path, 0)
+                    if target:
+                        imports[alias.asname or alias.name] = target
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                module_path = self._module_path(alias.name, path, 0)
+                if module_path:
+                    imports[alias.asname or alias.name.split(".")[0]] = module_path
+
+    @staticmethod
+    def _module_path(module, importer, level):
+        """Resolves a module name to a project-relative .py path, or None if external."""
+        if level:
+            base = os.path.dirname(importer)
+            for _ in range(level - 1):
+                base = os.path.dirname(base)
+            candidates = [f"{base}/{module.replace('.', '/')}.py"]
+        else:
+            candidates = [f"{module.replace('.', '/')}.py", f"features/{module.replace('.', '/')}.py"]
+        for candidate in candidates:
+            if os.path.isfile(os.path.join(PROJECT_ROOT, candidate)):
+                return candidate
+        return None
+
+    def _collect_class(self, path, node, module_id):
+        """Registers a class, its members, its bases and its locator page name."""
+        class_id = f"{path}::{node.name}"
+        class_symbol = self._add(class_id, path, (node.lineno, node.lineno))
+        class_symbol.deps.add(module_id)
+        info = {"bases": [self._name_of(base) for base in node.bases], "page": None, "members": {}}
+        self.classes[class_id] = info
+        for item in node.body:
+            names = []
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                names = [item.name]
+            elif isinstance(item, ast.Assign):
+                names = [t.id for t in item.targets if isinstance(t, ast.Name)]
+                if "PAGE_NAME" in names and isinstance(item.value, ast.Constant):
+                    info["page"] = item.value.value
+            for name in names:
+                member = self._add(f"{class_id}.{name}", path, item)
+                member.deps.add(class_id)
+                info["members"][name] = item
+        # Docstring and class statement belong to the class symbol itself
+        class_symbol.last_line = min([node.end_lineno] + [
+            getattr(item, "lineno", node.end_lineno) - 1 for item in node.body
+            if not (isinstance(item, ast.Expr) and isinstance(item.value, ast.Constant))])
+
+    def _collect_step_definition(self, node, symbol_id):
+        """Records @given/@when/@then/@step decorators of a function."""
+        for decorator in node.decorator_list:
+            if (isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Name)
+                    and decorator.func.id in ("given", "when", "then", "step")
+                    and decorator.args and isinstance(decorator.args[0], ast.Constant)):
+                self.step_definitions.append(StepDefinition(
+                    decorator.func.id, step_pattern_to_regex(decorator.args[0].value), symbol_id))
+
+    @staticmethod
+    def _name_of(node):
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Attribute):
+            return node.attr
+        return None
+
+    def _collect_dependencies(self, path, tree):
+        """Resolves what every function, method and assignment in a file references."""
+        # Context attributes assigned page objects or helpers, e.g. context.main_page = MainPage(...)
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Call)
+                    and isinstance(node.value.func, ast.Name)):
+                class_id = self._resolve_name(path, node.value.func.id)
+                if class_id in self.classes:
+                    for target in node.targets:
+                        if (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name)
+                                and target.value.id == "context"):
+                            self.context_types[target.attr] = class_id
+
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Assign, ast.AnnAssign)):
+                names = [node.name] if hasattr(node, "name") else [
+                    t.id for t in (node.targets if isinstance(node, ast.Assign) else [node.target])
+                    if isinstance(t, ast.Name)]
+                for name in names:
+                    self._scan(path, self.symbols[f"{path}::{name}"], node, None)
+            elif isinstance(node, ast.ClassDef):
+                class_id = f"{path}::{node.name}"
+                for base in self.classes[class_id]["bases"]:
+                    base_id = self._resolve_name(path, base) if base else None
+                    if base_id in self.symbols:
+                        self.symbols[class_id].deps.add(base_id)
+                # Instantiating a class runs its constructor
+                init = self.resolve_member(class_id, "__init__")
+                if init:
+                    self.symbols[class_id].deps.add(init)
+                for name, item in self.classes[class_id]["members"].items():
+                    self._scan(path, self.symbols[f"{class_id}.{name}"], item, class_id)
+
+    def _resolve_name(self, path, name):
+        """Resolves a bare name used in a file to a symbol id."""
+        local = f"{path}::{name}"
+        if local in self.symbols:
+            return local
+        imported = self.imports.get(path, {}).get(name)
+        if imported:
+            return imported if "::" in imported else f"{imported}::<module>"
+        return None
+
+    def resolve_member(self, class_id, member):
+        """Finds the symbol defining a member, following in-project base classes."""
+        seen = set()
+        while class_id and class_id not in seen:
+            seen.add(class_id)
+            candidate = f"{class_id}.{member}"
+            if candidate in self.symbols:
+                return candidate
+            info = self.classes.get(class_id)
+            if not info or not info["bases"]:
+                return None
+            base = info["bases"][0]
+            class_id = self._resolve_name(class_id.split("::")[0], base) if base else None
+        return None
+
+    def _page_locator(self, class_id, element):
+        """Finds the locator symbol for an element on a class's page, following base classes."""
+        seen = set()
+        while class_id and class_id not in seen:
+            seen.add(class_id)
+            info = self.classes.get(class_id)
+            if not info:
+                return None
+            if info["page"]:
+                return f"locator:{info['page']}.{element}"
+            base = info["bases"][0] if info["bases"] else None
+            class_id = self._resolve_name(class_id.split("::")[0], base) if base else None
+        return None
+
+    def _scan(self, path, symbol, node, class_id):
+        """Adds the dependencies referenced inside one symbol's AST."""
+        # Local names bound to a new instance, e.g. sampler = LatencySampler(url)
+        local_types = {}
+        for child in ast.walk(node):
+            if isinstance(child, ast.Assign) and len(child.targets) == 1 and isinstance(child.targets[0], ast.Name):
+                instance_class = self._instantiated_class(path, child.value)
+                if instance_class:
+                    local_types[child.targets[0].id] = instance_class
+        for child in ast.walk(node):
+            if isinstance(child, ast.Attribute):
+                # Methods called on a new instance: LatencySampler(url).run() or sampler.run()
+                if isinstance(child.value, ast.Name) and child.value.id in local_types:
+                    owner_class = local_types[child.value.id]
+                else:
+                    owner_class = self._instantiated_class(path, child.value)
+                member = self.resolve_member(owner_class, child.attr) if owner_class else None
+                if member and member != symbol.id:
+                    symbol.deps.add(member)
+            if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
+                target = self._resolve_name(path, child.id)
+                if target and target != symbol.id:
+                    symbol.deps.add(target)
+            elif isinstance(child, ast.Attribute) and isinstance(child.value, ast.Name):
+                owner = child.value.id
+                if owner in ("self", "cls") and class_id:
+                    member = self.resolve_member(class_id, child.attr)
+                    if member and member != symbol.id:
+                        symbol.deps.add(member)
+                elif owner == "context" and child.attr in self.context_types:
+                    symbol.deps.add(self.context_types[child.attr])
+            if (isinstance(child, ast.Attribute) and isinstance(child.value, ast.Attribute)
+                    and isinstance(child.value.value, ast.Name) and child.value.value.id == "context"
+                    and child.value.attr in self.context_types):
+                member = self.resolve_member(self.context_types[child.value.attr], child.attr)
+                if member:
+                    symbol.deps.add(member)
+            if isinstance(child, ast.Call) and child.args and isinstance(child.args[0], ast.Constant):
+                func = child.func
+                called = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+                if called in ("locator", "PageLocator") and class_id:
+                    locator = self._page_locator(class_id, child.args[0].value)
+                    if locator:
+                        symbol.deps.add(locator)
+
+    def _instantiated_class(self, path, node):
+        """The in-project class a Call node instantiates, or None."""
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            class_id = self._resolve_name(path, node.func.id)
+            if class_id in self.classes:
+                return class_id
+        return None
+
+    def _load_locator_lines(self, locators_file):
+        """Records the line range of every element in the locator registry YAML."""
+        path = os.path.join(PROJECT_ROOT, locators_file)
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            root = yaml.compose(f)
+        for key, value in getattr(root, "value", []):
+            if key.value != "pages":
+                continue
+            for page_key, page_node in value.value:
+                for element_key, element_node in page_node.value:
+                    self.locator_lines[f"locator:{page_key.value}.{element_key.value}"] = (
+                        element_key.start_mark.line + 1, element_node.end_mark.line)
+
+    # -- queries ------------------------------------------------------------
+
+    def match_step(self, step: Step) -> Optional[str]:
+        """Returns the symbol of the step definition matching a step, or None."""
+        for definition in self.step_definitions:
+            if definition.step_type in (step.step_type, "step") and definition.regex.match(step.text):
+                return definition.symbol
+        return None
+
+    def closure(self, roots: Iterable[str]) -> Set[str]:
+        """Returns the roots plus every symbol they depend on, transitively."""
+        result: Set[str] = set()
+        stack = list(roots)
+        while stack:
+            symbol_id = stack.pop()
+            if symbol_id in result:
+                continue
+            result.add(symbol_id)
+            symbol = self.symbols.get(symbol_id)
+            if symbol:
+                stack.extend(symbol.deps)
+        return result
+
+    def symbols_at(self, path: str, lines: Set[int]) -> Set[str]:
+        """Returns the most specific symbols of a file covering any of the given lines."""
+        if path == LOCATORS_FILE.replace(os.sep, "/"):
+            return {locator for locator, (first, last) in self.locator_lines.items()
+                    if any(first <= line <= last for line in lines)}
+        hits = set()
+        for line in lines:
+            covering = [s for s in self.files.get(path, []) if s.first_line <= line <= s.last_line]
+            if covering:
+                # Innermost symbol: the one with the smallest range
+                hits.add(min(covering, key=lambda s: s.last_line - s.first_line).id)
+            else:
+                hits.add(f"{path}::<module>")
+        return hits
+
+
+# ---------------------------------------------------------------------------
+# Impact index
+# ---------------------------------------------------------------------------
+
+class ImpactIndex:
+    """Maps every scenario to the symbols it exercises."""
+
+    def __init__(self, scenarios: List[ScenarioInfo], graph: SymbolGraph,
+                 coverage: Optional[Dict[str, List[str]]] = None):
+        self.scenarios = {scenario.location: scenario for scenario in scenarios}
+        self.graph = graph
+        self.scenario_symbols: Dict[str, Set[str]] = {}
+        self.unmatched_steps: Dict[str, List[str]] = {}
+        for scenario in scenarios:
+            roots = set()
+            for step in scenario.steps:
+                symbol = graph.match_step(step)
+                if symbol:
+                    roots.add(symbol)
+                else:
+                    self.unmatched_steps.setdefault(scenario.location, []).append(step.text)
+            for called in (coverage or {}).get(scenario.location, []):
+                # Runtime coverage records "path:first_line" of each called function
+                path, _, line = called.rpartition(":")
+                roots |= graph.symbols_at(path, {int(line)})
+            self.scenario_symbols[scenario.location] = graph.closure(roots)
+
+    @classmethod
+    def build(cls, coverage_path: Optional[str] = DEFAULT_COVERAGE_PATH):
+        """Builds the index for the current tree, merging runtime coverage if recorded."""
+        coverage = None
+        if coverage_path and os.path.exists(os.path.join(PROJECT_ROOT, coverage_path)):
+            with open(os.path.join(PROJECT_ROOT, coverage_path), 'r', encoding='utf-8') as f:
+                coverage = json.load(f)
+        return cls(discover_scenarios(), SymbolGraph().build(), coverage)
+
+    def affected_by(self, changes: Dict[str, Set[int]]) -> Tuple[Set[str], List[str]]:
+        """
+        Selects the scenarios affected by changed lines.
+
+        Args:
+            changes (dict): Project-relative path -> changed line numbers.
+
+        Returns:
+            tuple: (scenario locations, or {ALL}; human-readable reasons)
+        """
+        selected: Set[str] = set()
+        reasons = []
+        changed_symbols: Set[str] = set()
+        for path, lines in changes.items():
+            if path in GLOBAL_FILES:
+                return {ALL}, [f"{path} affects every scenario"]
+            if path.endswith(".feature"):
+                for scenario in self.scenarios.values():
+                    if not scenario.location.startswith(path + ":"):
+                        continue
+                    background_first, background_last = scenario.background
+                    if any(scenario.first_line <= line <= scenario.last_line
+                           or background_first <= line <= background_last for line in lines):
+                        selected.add(scenario.location)
+                        reasons.append(f"{scenario.location} edited")
+                continue
+            if path == LOCATORS_FILE.replace(os.sep, "/"):
+                symbols = self.graph.symbols_at(path, lines)
+                # Lines outside every element (app_package, page keys) can affect any locator
+                ranges = self.graph.locator_lines.values()
+                if any(not any(first <= line <= last for first, last in ranges) for line in lines):
+                    return {ALL}, [f"{path} changed outside any element, which can affect every locator"]
+                changed_symbols |= symbols
+                continue
+            if path in DATA_FILES:
+                loader = DATA_FILES[path]
+                changed_symbols |= {symbol.id for symbol in self.graph.files.get(loader, [])}
+                reasons.append(f"{path} is loaded by {loader}")
+                continue
+            if path.endswith(".py") and path in self.graph.files:
+                changed_symbols |= self.graph.symbols_at(path, lines)
+                continue
+            if path.endswith(".py") and path.startswith("features/"):
+                return {ALL}, [f"{path} is loaded by behave for every scenario"]
+            if any(fnmatch.fnmatch(path, pattern) for pattern in UNRELATED_FILES):
+                continue
+            # Deleted modules, new data files, scripts: nothing says which scenarios they reach
+            return {ALL}, [f"{path} cannot be mapped to scenarios, so every scenario is affected"]
+
+        for location, symbols in self.scenario_symbols.items():
+            hit = symbols & changed_symbols
+            if hit:
+                selected.add(location)
+                reasons.append(f"{location} uses {', '.join(sorted(hit))}")
+        return selected, reasons
+
+
+def git_changed_lines(since: str, cwd: str = PROJECT_ROOT) -> Dict[str, Set[int]]:
+    """
+    Gets the lines changed between a git revision and the working tree.
+
+    Line numbers refer to the current version of each file; pure deletions
+    mark the line where content was removed.
+
+    Args:
+        since (str): Git revision to diff against, e.g. "origin/main" or "HEAD~1".
+
+    Returns:
+        dict: Project-relative path -> changed line numbers.
+    """
+    output = subprocess.run(
+        ["git", "diff", "--unified=0", "--no-color", "--no-renames", since, "--"],
+        cwd=cwd, capture_output=True, text=True, check=True, encoding='utf-8').stdout
+    changes: Dict[str, Set[int]] = {}
+    path = None
+    hunk = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+    for line in output.splitlines():
+        if line.startswith("+++ "):
+            target = line[4:]
+            path = None if target == "/dev/null" else target[2:] if target.startswith("b/") else target
+            if path:
+                changes.setdefault(path, set())
+        elif line.startswith("--- ") and line[4:] != "/dev/null":
+            # Deleted files still count, keyed by their old path
+            old = line[6:] if line.startswith("--- a/") else line[4:]
+            changes.setdefault(old, set())
+            path = old
+        elif path and line.startswith("@@"):
+            match = hunk.match(line)
+            if match:
+                start, count = int(match.group(1)), int(match.group(2) or 1)
+                changes[path].update(range(start, start + count) if count else {max(start, 1)})
+    return changes
+
+
+class CoverageRecorder:
+    """
+    Records which project functions each scenario calls (runtime coverage).
+
+    Enabled from features/environment.py when IMPACT_COVERAGE is set. Uses a
+    profile hook that only looks at call events, so it is cheap enough for
+    an occasional coverage run but is not meant to be left on.
+    """
+
+    def __init__(self, path: str = DEFAULT_COVERAGE_PATH):
+        self.path = path
+        self.coverage: Dict[str, Set[str]] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.coverage = {k: set(v) for k, v in json.load(f).items()}
+        self._current: Optional[Set[str]] = None
+        self._prefixes = tuple(os.path.join(PROJECT_ROOT, d) + os.sep for d in SOURCE_DIRS)
+        self._own_file = os.path.abspath(__file__)
+
+    def _profile(self, frame, event, arg):
+        if event != "call":
+            return
+        code = frame.f_code
+        filename = os.path.abspath(code.co_filename)
+        if filename.startswith(self._prefixes) and filename != self._own_file:
+            relative = os.path.relpath(filename, PROJECT_ROOT).replace(os.sep, "/")
+            self._current.add(f"{relative}:{code.co_firstlineno}")
+
+    def start(self, location: str):
+        """Starts recording calls for a scenario."""
+        self._current = self.coverage.setdefault(location, set())
+        sys.setprofile(self._profile)
+
+    def stop(self):
+        """Stops recording."""
+        sys.setprofile(None)
+        self._current = None
+
+    def save(self):
+        """Writes the accumulated coverage, merged with what was recorded before."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({k: sorted(v) for k, v in self.coverage.items()}, f, indent=1)
+
+
+def main(argv=None):
+    """Command line entry point: prints the scenarios affected by changes since a revision."""
+    parser = argparse.ArgumentParser(description="Select the scenarios affected by a git diff")
+    parser.add_argument("--since", default="HEAD", help="Git revision to diff against (default: HEAD)")
+    parser.add_argument("--coverage", default=DEFAULT_COVERAGE_PATH, help="Runtime coverage file to merge")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    parser.add_argument("--explain", action="store_true", help="Print why each scenario was selected")
+    args = parser.parse_args(argv)
+
+    index = ImpactIndex.build(args.coverage)
+    selected, reasons = index.affected_by(git_changed_lines(args.since))
+    locations = sorted(index.scenarios) if ALL in selected else sorted(selected)
+    if args.json:
+        print(json.dumps({"all": ALL in selected, "scenarios": locations, "reasons": reasons}, indent=2))
+    else:
+        for location in locations:
+            print(location)
+        if args.explain:
+            for reason in reasons:
+                print(f"# {reason}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
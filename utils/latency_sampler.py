@@ -0,0 +1,317 @@
+"""
+API Latency Sampling for Response-Time SLOs.
+
+Sends warm-up requests and then a number of measured requests over one
+pooled keep-alive connection, and reports response-time percentiles with
+confidence intervals. A single request's time mixes DNS, TCP connect and
+TLS handshake with the server's own time; here they are kept apart:
+
+    server   time to the response headers on a reused connection
+             (server processing plus one network round trip)
+    total    server time plus reading the body
+    connect  DNS lookup, TCP connect and TLS handshake, measured on fresh
+             connections by measure_connection()
+
+Samples that had to open a new connection (the server closed the previous
+one) are flagged and left out of the server/total percentiles.
+
+Percentile confidence intervals are distribution-free: the bounds are the
+order statistics whose ranks cover the percentile with the requested
+probability (normal approximation to the binomial), so they need no
+assumption about the shape of the latency distribution. For an SLO only the
+upper side matters: a one-sided bound at 95% is tighter than the upper end of
+a two-sided 95% interval, which holds with 97.5% confidence.
+
+    python -m utils.latency_sampler "https://data.weather.gov.hk/weatherAPI/opendata/weather.php?dataType=fnd&lang=en" \\
+        --samples 50 --warmup 5
+"""
+import argparse
+import math
+import socket
+import ssl
+import time
+from statistics import NormalDist, median
+from typing import Any, Dict, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+
+DEFAULT_HEADERS = {
+    "User-Agent": "MyObservatory-Test-Framework/1.0",
+    "Accept": "application/json",
+}
+
+
+class LatencySample(NamedTuple):
+    server: float           # seconds to the response headers
+    total: float            # seconds including the body
+    status: Optional[int]   # HTTP status, or None if the request failed
+    new_connection: bool    # the request opened a connection (includes connect/TLS time)
+    size: int               # body bytes
+    error: Optional[str] = None
+
+
+class ConnectionTiming(NamedTuple):
+    dns: float              # seconds for the address lookup
+    connect: float          # seconds for the TCP handshake
+    tls: float              # seconds for the TLS handshake (0 for http)
+
+    @property
+    def total(self) -> float:
+        return self.dns + self.connect + self.tls
+
+
+class PercentileEstimate(NamedTuple):
+    q: float                # percentile, 0-100
+    value: float            # point estimate, seconds
+    lower: float            # confidence interval bounds, seconds
+    upper: float
+    confidence: float       # e.g. 0.95
+    exact: bool             # False if there were too few samples for the upper bound
+    one_sided: bool = False  # upper bound only; lower is the fastest sample
+
+    def describe(self) -> str:
+        bound = "" if self.exact else " (upper bound capped at the slowest sample, take more samples)"
+        if self.one_sided:
+            return (f"p{self.q:g} = {self.value * 1000:.1f} ms, {self.confidence:.0%} upper bound "
+                    f"{self.upper * 1000:.1f} ms{bound}")
+        return (f"p{self.q:g} = {self.value * 1000:.1f} ms, {self.confidence:.0%} CI "
+                f"[{self.lower * 1000:.1f}, {self.upper * 1000:.1f}] ms{bound}")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """The q-th percentile (0-100) of sorted values, linearly interpolated."""
+    if not values:
+        raise ValueError("No samples")
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def percentile_interval(values: List[float], q: float, confidence: float = 0.95,
+                        one_sided: bool = False) -> PercentileEstimate:
+    """
+    Estimates a percentile with a distribution-free confidence interval.
+
+    Args:
+        values (list): Sorted samples.
+        q (float): Percentile, 0-100.
+        confidence (float): Coverage of the interval.
+        one_sided (bool): Only bound the percentile from above, with the full
+            confidence on that side (the lower bound is the fastest sample).
+    """
+    n = len(values)
+    p = q / 100
+    z = NormalDist().inv_cdf(confidence if one_sided else 0.5 + confidence / 2)
+    half_width = z * math.sqrt(n * p * (1 - p))
+    # 1-based ranks of the order statistics that bound the percentile
+    lower_rank = 1 if one_sided else math.floor(n * p - half_width)
+    upper_rank = math.ceil(n * p + half_width)
+    exact = upper_rank <= n
+    lower = values[max(lower_rank, 1) - 1]
+    upper = values[min(upper_rank, n) - 1]
+    return PercentileEstimate(q, percentile(values, q), lower, upper, confidence, exact, one_sided)
+
+
+class LatencyReport:
+    """Measured samples of one sampling run."""
+
+    def __init__(self, url: str, samples: List[LatencySample], warmup: int,
+                 connections: Optional[List[ConnectionTiming]] = None):
+        self.url = url
+        self.samples = samples
+        self.warmup = warmup
+        self.connections = connections or []
+
+    @property
+    def errors(self) -> List[LatencySample]:
+        return [sample for sample in self.samples if sample.error or not 200 <= (sample.status or 0) < 300]
+
+    @property
+    def reused(self) -> List[LatencySample]:
+        """Successful samples that reused a pooled connection."""
+        errors = set(self.errors)
+        return [sample for sample in self.samples if not sample.new_connection and sample not in errors]
+
+    def values(self, metric: str = "server") -> List[float]:
+        return sorted(getattr(sample, metric) for sample in self.reused)
+
+    def percentile(self, q: float, metric: str = "server", confidence: float = 0.95,
+                   one_sided: bool = False) -> PercentileEstimate:
+        """
+        A response-time percentile over the reused-connection samples.
+
+        Args:
+            q (float): Percentile, 0-100.
+            metric (str): "server" (to the headers) or "total" (including the body).
+            confidence (float): Coverage of the confidence interval.
+            one_sided (bool): Upper confidence bound only (see percentile_interval).
+
+        Raises:
+            ValueError: If no request succeeded on a reused connection.
+        """
+        values = self.values(metric)
+        if not values:
+            raise ValueError(f"No successful samples on a reused connection for {self.url}")
+        return percentile_interval(values, q, confidence, one_sided)
+
+    def summary(self, percentiles=(50, 90, 95, 99)) -> Dict[str, Any]:
+        """Plain-dict summary in milliseconds, e.g. for result files."""
+        summary: Dict[str, Any] = {
+            "url": self.url,
+            "samples": len(self.samples),
+            "warmup": self.warmup,
+            "errors": len(self.errors),
+            "new_connections": sum(sample.new_connection for sample in self.samples),
+        }
+        if self.reused:
+            for metric in ("server", "total"):
+                summary[metric] = {}
+                for q in percentiles:
+                    estimate = self.percentile(q, metric)
+                    summary[metric][f"p{q:g}"] = {"ms": round(estimate.value * 1000, 2),
+                                                  "ci": [round(estimate.lower * 1000, 2),
+                                                         round(estimate.upper * 1000, 2)]}
+        if self.connections:
+            summary["connection"] = {phase: round(median(getattr(timing, phase) for timing in self.connections)
+                                                  * 1000, 2) for phase in ("dns", "connect", "tls", "total")}
+        return summary
+
+
+class LatencySampler:
+    """Measures an HTTP endpoint's response times over a pooled connection."""
+
+    def __init__(self, url: str, params: Optional[Dict[str, Any]] = None,
+                 headers: Optional[Dict[str, str]] = None, timeout: float = 30, session=None):
+        """
+        Args:
+            url (str): Endpoint to request (GET).
+            params (dict): Query parameters.
+            headers (dict): Request headers (default: DEFAULT_HEADERS).
+            timeout (float): Seconds per request.
+            session (requests.Session): Session to reuse (default: a new one).
+        """
+        import requests
+
+        self.url = url
+        self.params = params
+        self.headers = headers or DEFAULT_HEADERS
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def _pool(self):
+        """The urllib3 connection pool the session uses for the URL."""
+        return self.session.get_adapter(self.url).poolmanager.connection_from_url(self.url)
+
+    def request(self) -> LatencySample:
+        """Sends one request and times it."""
+        import requests
+
+        pool = self._pool()
+        opened = pool.num_connections
+        started = time.perf_counter()
+        try:
+            response = self.session.get(self.url, params=self.params, headers=self.headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            return LatencySample(time.perf_counter() - started, time.perf_counter() - started, None,
+                                 pool.num_connections != opened, 0, f"{type(e).__name__}: {e}")
+        total = time.perf_counter() - started
+        return LatencySample(response.elapsed.total_seconds(), total, response.status_code,
+                             pool.num_connections != opened, len(response.content))
+
+    def measure_connection(self, count: int = 3) -> List[ConnectionTiming]:
+        """
+        Times DNS lookup, TCP connect and TLS handshake on fresh connections.
+
+        Connects directly to the host; proxies from the environment are not used.
+        """
+        parts = urlsplit(self.url)
+        secure = parts.scheme == "https"
+        host = parts.hostname
+        port = parts.port or (443 if secure else 80)
+        context = ssl.create_default_context() if secure else None
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            family, kind, proto, _, address = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0]
+            resolved = time.perf_counter()
+            sock = socket.socket(family, kind, proto)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(address)
+                connected = time.perf_counter()
+                tls = 0.0
+                if context is not None:
+                    sock = context.wrap_socket(sock, server_hostname=host)
+                    tls = time.perf_counter() - connected
+            finally:
+                sock.close()
+            timings.append(ConnectionTiming(resolved - started, connected - resolved, tls))
+        return timings
+
+    def run(self, samples: int = 30, warmup: int = 3, interval: float = 0.0,
+            connections: int = 3) -> LatencyReport:
+        """
+        Warms up, then measures.
+
+        Args:
+            samples (int): Measured requests.
+            warmup (int): Unmeasured requests first (open the connection, warm caches).
+            interval (float): Seconds between requests, to stay under rate limits.
+            connections (int): Fresh connections to time for connect/TLS (0 = skip;
+                left empty if the host cannot be reached directly).
+
+        Returns:
+            LatencyReport: The measured samples.
+        """
+        for _ in range(warmup):
+            self.request()
+            time.sleep(interval)
+        measured = []
+        for index in range(samples):
+            measured.append(self.request())
+            if interval and index < samples - 1:
+                time.sleep(interval)
+        try:
+            connection_timings = self.measure_connection(connections) if connections else []
+        except OSError:
+            connection_timings = []
+        return LatencyReport(self.url, measured, warmup, connection_timings)
+
+
+def main(argv=None):
+    """Samples an endpoint and prints its latency percentiles."""
+    import json
+
+    parser = argparse.ArgumentParser(description="Measure an HTTP endpoint's response-time percentiles")
+    parser.add_argument("url", help="URL to request (GET)")
+    parser.add_argument("--samples", type=int, default=50, help="Measured requests (default: 50)")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured warm-up requests (default: 5)")
+    parser.add_argument("--interval", type=float, default=0.0, help="Seconds between requests")
+    parser.add_argument("--percentiles", default="50,90,95,99", help="Percentiles to report (default: 50,90,95,99)")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence interval coverage (default: 0.95)")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    percentiles = [float(q) for q in args.percentiles.split(",")]
+    report = LatencySampler(args.url).run(args.samples, args.warmup, args.interval)
+    if args.json:
+        print(json.dumps(report.summary(percentiles), indent=2))
+        return 0 if not report.errors else 1
+
+    print(f"{args.url}: {len(report.samples)} samples after {report.warmup} warm-up requests, "
+          f"{len(report.errors)} errors, {sum(s.new_connection for s in report.samples)} new connections")
+    if report.reused:
+        for metric in ("server", "total"):
+            print(f"  {metric}:")
+            for q in percentiles:
+                print(f"    {report.percentile(q, metric, args.confidence).describe()}")
+    if report.connections:
+        summary = report.summary()["connection"]
+        print(f"  connection setup (median): dns {summary['dns']} ms, connect {summary['connect']} ms, "
+              f"tls {summary['tls']} ms")
+    return 0 if not report.errors else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,259 @@
+"""
+Locator Registry for the Page Object Model.
+
+Locators are declared per page and platform in config/locators.yaml and
+validated when the file is loaded. Each lookup returns the fastest strategy
+available for the platform; XPath is only ever used as an explicit fallback.
+"""
+import os
+import string
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+
+
+# Locator strategies, using the same values as AppiumBy so no Appium import is needed
+STRATEGIES = {
+    "id": "id",
+    "accessibility_id": "accessibility id",
+    "uiautomator": "-android uiautomator",
+    "ios_predicate": "-ios predicate string",
+    "ios_class_chain": "-ios class chain",
+    "class_name": "class name",
+    "xpath": "xpath",
+}
+
+# Strategy preference per platform, fastest first
+STRATEGY_PRIORITY = {
+    "android": ("id", "accessibility_id", "uiautomator", "class_name"),
+    "ios": ("accessibility_id", "id", "ios_predicate", "ios_class_chain", "class_name"),
+}
+
+# Strategies that may only appear under "fallback"
+FALLBACK_ONLY = ("xpath",)
+
+DEFAULT_LOCATORS_PATH = os.path.join(os.path.dirname(__file__), "..", "config", "locators.yaml")
+
+
+class LocatorError(ValueError):
+    """Raised for invalid locator definitions or unknown locator lookups."""
+
+
+class Locator(tuple):
+    """
+    An element locator (By, value).
+
+    Behaves exactly like the (By, value) tuples Selenium expects, and
+    optionally carries a fallback locator to try when the primary one
+    does not find the element.
+    """
+
+    def __new__(cls, by: str, value: str, fallback: Optional["Locator"] = None):
+        locator = super().__new__(cls, (by, value))
+        locator.fallback = fallback
+        return locator
+
+    @property
+    def by(self) -> str:
+        return self[0]
+
+    @property
+    def value(self) -> str:
+        return self[1]
+
+    def __repr__(self):
+        if self.fallback is not None:
+            return f"Locator({self[0]!r}, {self[1]!r}, fallback={self.fallback!r})"
+        return f"Locator({self[0]!r}, {self[1]!r})"
+
+
+def _quote_double(text: str) -> str:
+    """Escapes text for a double-quoted UiSelector or iOS predicate string."""
+    return str(text).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _xpath_literal(text: str) -> str:
+    """Builds an XPath string literal, including quotes, for any text."""
+    text = str(text)
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+    parts = text.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
+# How placeholder values are escaped for each strategy
+_ESCAPERS = {
+    "uiautomator": _quote_double,
+    "ios_predicate": _quote_double,
+    "ios_class_chain": _quote_double,
+    "xpath": _xpath_literal,
+}
+
+
+class LocatorRegistry:
+    """Loads, validates and resolves locators declared in YAML."""
+
+    def __init__(self, path: str = DEFAULT_LOCATORS_PATH):
+        """
+        Initializes the registry.
+
+        Args:
+            path (str): Path to the locator YAML file.
+
+        Raises:
+            LocatorError: If any locator definition is invalid.
+        """
+        self.path = path
+        with open(path, 'r', encoding='utf-8') as file:
+            data = yaml.safe_load(file) or {}
+        self.app_package = data.get("app_package", "")
+        self.pages: Dict[str, Dict[str, Dict[str, Any]]] = data.get("pages", {}) or {}
+        self._cache: Dict[Tuple[str, str, str], Tuple[Tuple[str, str], Optional[Tuple[str, str]]]] = {}
+        self._validate()
+
+    def _validate(self):
+        """Validates every locator definition, collecting all errors."""
+        errors = []
+        for page_name, elements in self.pages.items():
+            if not isinstance(elements, dict):
+                errors.append(f"{page_name}: page must map element names to definitions")
+                continue
+            for element_name, platforms in elements.items():
+                where = f"{page_name}.{element_name}"
+                if not isinstance(platforms, dict) or not platforms:
+                    errors.append(f"{where}: no platform definitions")
+                    continue
+                for platform, definition in platforms.items():
+                    errors.extend(self._validate_definition(f"{where}.{platform}", platform, definition))
+        if errors:
+            raise LocatorError(f"Invalid locators in {self.path}:\n  " + "\n  ".join(errors))
+
+    def _validate_definition(self, where: str, platform: str, definition: Any):
+        """Validates one platform's strategies for an element."""
+        errors = []
+        if platform not in STRATEGY_PRIORITY:
+            return [f"{where}: unknown platform '{platform}'"]
+        if not isinstance(definition, dict):
+            return [f"{where}: expected a mapping of strategy to value"]
+
+        strategies = {k: v for k, v in definition.items() if k != "fallback"}
+        fallback = definition.get("fallback")
+        if not strategies:
+            errors.append(f"{where}: needs at least one non-fallback strategy")
+
+        for strategy, value in strategies.items():
+            if strategy in FALLBACK_ONLY:
+                errors.append(f"{where}: '{strategy}' is only allowed under 'fallback'")
+            elif strategy not in STRATEGY_PRIORITY[platform]:
+                errors.append(f"{where}: strategy '{strategy}' is not supported on {platform}")
+            errors.extend(self._validate_value(f"{where}.{strategy}", strategy, value))
+
+        if fallback is not None:
+            if not isinstance(fallback, dict) or len(fallback) != 1:
+                errors.append(f"{where}.fallback: expected exactly one strategy")
+            else:
+                (strategy, value), = fallback.items()
+                if strategy not in STRATEGIES:
+                    errors.append(f"{where}.fallback: unknown strategy '{strategy}'")
+                errors.extend(self._validate_value(f"{where}.fallback.{strategy}", strategy, value))
+        return errors
+
+    def _validate_value(self, where: str, strategy: str, value: Any):
+        """Validates a single locator value."""
+        if not isinstance(value, str) or not value.strip():
+            return [f"{where}: value must be a non-empty string"]
+        try:
+            list(string.Formatter().parse(value))
+        except ValueError as e:
+            return [f"{where}: invalid placeholder syntax ({e})"]
+        if strategy == "id" and ":id/" not in value and not self.app_package:
+            return [f"{where}: short id '{value}' needs app_package to be set"]
+        if strategy == "uiautomator" and not value.startswith(("new UiSelector()", "new UiScrollable(")):
+            return [f"{where}: must start with 'new UiSelector()' or 'new UiScrollable('"]
+        if strategy == "ios_class_chain" and not value.startswith(("**/", "XCUIElementType")):
+            return [f"{where}: must start with '**/' or 'XCUIElementType'"]
+        return []
+
+    def _expand(self, strategy: str, value: str) -> Tuple[str, str]:
+        """Converts a strategy name and raw value into a (By, value) pair."""
+        if strategy == "id" and ":id/" not in value:
+            value = f"{self.app_package}:id/{value}"
+        return STRATEGIES[strategy], value
+
+    def _select(self, page: str, element: str, platform: str):
+        """Selects the fastest strategy (and fallback) for an element, cached per platform."""
+        key = (page, element, platform)
+        if key in self._cache:
+            return self._cache[key]
+
+        try:
+            definition = self.pages[page][element][platform]
+        except KeyError:
+            raise LocatorError(f"No {platform} locator defined for {page}.{element}") from None
+
+        for strategy in STRATEGY_PRIORITY[platform]:
+            if strategy in definition:
+                primary = (strategy, definition[strategy])
+                break
+        fallback = None
+        if definition.get("fallback"):
+            fallback = next(iter(definition["fallback"].items()))
+
+        self._cache[key] = (primary, fallback)
+        return self._cache[key]
+
+    def get(self, page: str, element: str, platform: str = "android", **params) -> Locator:
+        """
+        Resolves an element's locator for a platform.
+
+        Args:
+            page (str): Page name, e.g. "main".
+            element (str): Element name, e.g. "search_button".
+            platform (str): "android" or "ios".
+            **params: Values for {placeholders}, escaped per strategy.
+
+        Returns:
+            Locator: The fastest locator for the platform, with its fallback if declared.
+        """
+        primary, fallback = self._select(page, element, platform)
+
+        def build(strategy, value):
+            escape = _ESCAPERS.get(strategy, str)
+            try:
+                value = value.format(**{k: escape(v) for k, v in params.items()})
+            except (KeyError, IndexError) as e:
+                raise LocatorError(f"Missing value for placeholder {e} in {page}.{element}") from None
+            return self._expand(strategy, value)
+
+        fallback_locator = Locator(*build(*fallback)) if fallback else None
+        return Locator(*build(*primary), fallback=fallback_locator)
+
+
+_default_registry: Optional[LocatorRegistry] = None
+
+
+def get_locator_registry() -> LocatorRegistry:
+    """Returns the shared registry, loading and validating config/locators.yaml on first use."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = LocatorRegistry()
+    return _default_registry
+
+
+class PageLocator:
+    """
+    Page class attribute that resolves to the locator for the page's platform.
+
+    Accessed on a page instance it returns a Locator for ``page.platform``;
+    accessed on the class it returns the descriptor itself.
+    """
+
+    def __init__(self, element: str):
+        self.element = element
+
+    def __get__(self, page, owner):
+        if page is None:
+            return self
+        return page.locator(self.element)
@@ -0,0 +1,861 @@
+"""
+Mock Appium (W3C WebDriver) Server.
+
+Serves a scripted UI hierarchy (test_data/mock_ui.yaml) over the W3C
+WebDriver protocol, so AppDriver, BasePage and the page objects can be
+exercised and benchmarked without a device. Supports the locator
+strategies used in config/locators.yaml for both platforms (id,
+accessibility id, UiSelector, iOS predicate and class chain, class name,
+xpath), element text/attributes/click/input, page source, screenshots,
+deep links and activity intents (for app state preparation), pushed files
+and a configurable per-command latency.
+
+Clicking an element with `goto` switches screens; elements of the
+previous screen then raise "stale element reference", as on a device.
+
+Usage:
+    python -m utils.mock_appium_server --port 4723 --latency 0.02
+    python -m utils.mock_appium_server --command-latency find_element=0.1
+"""
+import argparse
+import copy
+import re
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from collections import Counter
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import yaml
+from flask import Flask, jsonify, request
+
+from utils.mock_server import BackgroundServer
+
+
+DEFAULT_UI_PATH = "test_data/mock_ui.yaml"
+
+# W3C element reference key
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# 1x1 transparent PNG returned for screenshots
+SCREENSHOT_PNG = ("iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII=")
+
+# Android class (last segment) -> XCUITest element type, unless ios_type is given
+IOS_TYPES = {
+    "TextView": "XCUIElementTypeStaticText",
+    "Button": "XCUIElementTypeButton",
+    "ImageButton": "XCUIElementTypeButton",
+    "EditText": "XCUIElementTypeTextField",
+    "Switch": "XCUIElementTypeSwitch",
+    "RecyclerView": "XCUIElementTypeTable",
+    "ListView": "XCUIElementTypeTable",
+    "LinearLayout": "XCUIElementTypeOther",
+    "FrameLayout": "XCUIElementTypeOther",
+}
+
+# HTTP status for each W3C error code
+ERROR_STATUS = {
+    "invalid argument": 400,
+    "invalid selector": 400,
+    "element not interactable": 400,
+    "invalid session id": 404,
+    "no such element": 404,
+    "stale element reference": 404,
+    "unknown command": 404,
+    "unknown method": 405,
+    "unsupported operation": 500,
+}
+
+
+class MockError(Exception):
+    """A W3C WebDriver error returned to the client."""
+
+    def __init__(self, error: str, message: str):
+        super().__init__(message)
+        self.error = error
+        self.message = message
+
+
+class MockElement:
+    """A node of the scripted UI tree."""
+
+    def __init__(self, spec: Dict[str, Any], screen: str, parent: Optional["MockElement"] = None):
+        self.element_id = str(uuid.uuid4())
+        self.screen = screen
+        self.parent = parent
+        self.resource_id = spec.get("id")
+        self.cls = spec.get("class", "android.view.View")
+        self.ios_type = spec.get("ios_type") or IOS_TYPES.get(self.cls.rsplit(".", 1)[-1], "XCUIElementTypeOther")
+        self.accessibility_id = spec.get("accessibility_id")
+        self.text = spec.get("text", "")
+        self.checked = spec.get("checked")
+        self.toggle = spec.get("toggle", False)
+        self.goto = spec.get("goto")
+        self.filter_by = spec.get("filter_by")
+        # Scrollable lists show visible_rows children at a time, starting at scroll_offset
+        self.visible_rows = spec.get("visible_rows")
+        self.scroll_offset = 0
+        self.children = [MockElement(child, screen, self) for child in spec.get("children", [])]
+
+    def attributes(self, platform: str, package: str) -> Dict[str, str]:
+        """Attributes as reported by UiAutomator2 (android) or XCUITest (ios)."""
+        if platform == "ios":
+            value = self.text
+            if self.checked is not None:
+                value = "1" if self.checked else "0"
+            return {
+                "type": self.ios_type,
+                "name": self.accessibility_id or self.resource_id or "",
+                "label": self.text,
+                "value": value,
+                "enabled": "true",
+                "visible": "true",
+            }
+        return {
+            "class": self.cls,
+            "resource-id": f"{package}:id/{self.resource_id}" if self.resource_id else "",
+            "text": self.text,
+            "content-desc": self.accessibility_id or "",
+            "checked": "true" if self.checked else "false",
+            "checkable": "true" if self.checked is not None else "false",
+            "clickable": "true" if self.goto or self.toggle else "false",
+            "enabled": "true",
+            "displayed": "true",
+            "package": package,
+        }
+
+    def all_text(self) -> str:
+        """Text of the element and its descendants, for list filtering."""
+        return " ".join([self.text] + [child.all_text() for child in self.children])
+
+
+class MockSession:
+    """State of one WebDriver session: platform, current screen and UI trees."""
+
+    def __init__(self, ui: Dict[str, Any], capabilities: Dict[str, Any]):
+        self.session_id = str(uuid.uuid4())
+        self.capabilities = capabilities
+        platform = str(capabilities.get("platformName", "android")).lower()
+        self.platform = "ios" if platform == "ios" else "android"
+        self.package = ui.get("app_package", "")
+        self.start_screen = ui.get("start_screen") or next(iter(ui["screens"]))
+        self.deep_links: Dict[str, Dict[str, Any]] = ui.get("deep_links") or {}
+        self.activities: Dict[str, Dict[str, Any]] = ui.get("activities") or {}
+        self.files: Dict[str, str] = {}
+        self.implicit_wait = 0.0
+        self.lock = threading.RLock()
+        # Each session gets its own copy so text input and toggles do not leak between sessions
+        self.screens = {
+            name: MockElement({"class": "android.widget.FrameLayout", "children": copy.deepcopy(elements)}, name)
+            for name, elements in ui["screens"].items()
+        }
+        self.screen = self.start_screen
+        self.history: List[str] = []
+
+    @property
+    def root(self) -> MockElement:
+        return self.screens[self.screen]
+
+    def navigate(self, screen: str):
+        if screen not in self.screens:
+            raise MockError("unsupported operation", f"Unknown screen '{screen}' in mock UI")
+        self.history.append(self.screen)
+        self.screen = screen
+
+    def back(self):
+        if self.history:
+            self.screen = self.history.pop()
+
+    def open_screen(self, screen: str):
+        """Opens a screen directly (deep link or intent), clearing the back stack."""
+        if screen not in self.screens:
+            raise MockError("unsupported operation", f"Unknown screen '{screen}' in mock UI")
+        self.screen, self.history = screen, []
+
+    def relaunch(self):
+        """Returns to the start screen with every list scrolled to the top."""
+        self.screen, self.history = self.start_screen, []
+        for root in self.screens.values():
+            for element in _walk(root):
+                element.scroll_offset = 0
+
+    def list_items(self, element: MockElement) -> List[MockElement]:
+        """Children after the element's list filter, including rows scrolled out of view."""
+        if not element.filter_by:
+            return element.children
+        query = ""
+        for candidate in _walk(self.screens[element.screen]):
+            if candidate.resource_id == element.filter_by:
+                query = candidate.text.casefold()
+                break
+        return [child for child in element.children if query in child.all_text().casefold()]
+
+    def scroll_offset(self, element: MockElement) -> int:
+        """The element's scroll offset, clamped to the current number of list items."""
+        items = self.list_items(element)
+        return min(element.scroll_offset, max(0, len(items) - element.visible_rows))
+
+    def children(self, element: MockElement) -> List[MockElement]:
+        """Visible children, applying the element's list filter and scroll position."""
+        items = self.list_items(element)
+        if not element.visible_rows:
+            return items
+        offset = self.scroll_offset(element)
+        return items[offset:offset + element.visible_rows]
+
+    def descendants(self, element: MockElement) -> List[MockElement]:
+        """Visible descendants in document order."""
+        result = []
+        stack = list(reversed(self.children(element)))
+        while stack:
+            node = stack.pop()
+            result.append(node)
+            stack.extend(reversed(self.children(node)))
+        return result
+
+    def is_attached(self, element: MockElement) -> bool:
+        """True if the element is on the current screen and not filtered out."""
+        return element is self.root or element in self.descendants(self.root)
+
+    def to_xml(self, scope: Optional[MockElement] = None):
+        """
+        Builds the page source XML for the current screen.
+
+        Returns:
+            tuple: (ElementTree root, {xml node: MockElement})
+        """
+        mapping = {}
+
+        def build(element, parent_node):
+            attributes = element.attributes(self.platform, self.package)
+            tag = attributes["type"] if self.platform == "ios" else attributes["class"]
+            node = ET.SubElement(parent_node, tag, attributes) if parent_node is not None else ET.Element(tag, attributes)
+            mapping[node] = element
+            for child in self.children(element):
+                build(child, node)
+            return node
+
+        root_tag = "AppiumAUT" if self.platform == "android" else "XCUIElementTypeApplication"
+        document = ET.Element(root_tag)
+        build(scope or self.root, document)
+        return document, mapping
+
+
+# ---------------------------------------------------------------------------
+# Locator strategies
+# ---------------------------------------------------------------------------
+
+_UISELECTOR_CALL = re.compile(r'\.(\w+)\(\s*("(?:[^"\\]|\\.)*"|true|false|-?\d+)\s*\)')
+_PREDICATE_CLAUSE = re.compile(
+    r'^\s*(\w+)\s*(==|!=|CONTAINS|BEGINSWITH|ENDSWITH|LIKE)(\[c\])?\s*(["\'])(.*)\4\s*$', re.IGNORECASE)
+_CHAIN_SEGMENT = re.compile(r'^(\*\*|[\w*]+)((?:\[(?:`[^`]*`|-?\d+)\])*)$')
+
+
+def _unquote(value: str) -> str:
+    return value[1:-1].replace('\\"', '"').replace('\\\\', '\\') if value.startswith('"') else value
+
+
+def _uiselector_filter(selector: str) -> Callable[[Dict[str, str]], bool]:
+    """Compiles a `new UiSelector()...` chain into an attribute filter."""
+    calls = _UISELECTOR_CALL.findall(selector)
+    if not selector.strip().startswith("new UiSelector()") or not calls:
+        raise MockError("invalid selector", f"Unsupported UiSelector: {selector}")
+    checks = []
+    for method, raw in calls:
+        value = _unquote(raw)
+        if method == "className":
+            checks.append(lambda a, v=value: a["class"] == v)
+        elif method == "text":
+            checks.append(lambda a, v=value: a["text"] == v)
+        elif method == "textContains":
+            checks.append(lambda a, v=value: v in a["text"])
+        elif method == "textStartsWith":
+            checks.append(lambda a, v=value: a["text"].startswith(v))
+        elif method == "textMatches":
+            checks.append(lambda a, v=value: re.fullmatch(v, a["text"]) is not None)
+        elif method == "resourceId":
+            checks.append(lambda a, v=value: a["resource-id"] == v)
+        elif method == "resourceIdMatches":
+            checks.append(lambda a, v=value: re.fullmatch(v, a["resource-id"]) is not None)
+        elif method == "description":
+            checks.append(lambda a, v=value: a["content-desc"] == v)
+        elif method == "descriptionContains":
+            checks.append(lambda a, v=value: v in a["content-desc"])
+        elif method in ("checked", "clickable", "enabled"):
+            checks.append(lambda a, k=method, v=value: a[k] == v)
+        elif method != "instance":
+            raise MockError("invalid selector", f"Unsupported UiSelector method: {method}")
+    return lambda attributes: all(check(attributes) for check in checks)
+
+
+def _predicate_filter(predicate: str) -> Callable[[Dict[str, str]], bool]:
+    """Compiles a simple NSPredicate (clauses joined by AND) into an attribute filter."""
+    checks = []
+    for clause in re.split(r"\s+AND\s+", predicate.strip(), flags=re.IGNORECASE):
+        match = _PREDICATE_CLAUSE.match(clause)
+        if not match:
+            raise MockError("invalid selector", f"Unsupported predicate clause: {clause}")
+        key, operator, case_flag, _, value = match.groups()
+        operator = operator.upper()
+        fold = (lambda s: s.casefold()) if case_flag else (lambda s: s)
+
+        def check(attributes, key=key, operator=operator, value=value, fold=fold):
+            actual, expected = fold(attributes.get(key, "")), fold(value)
+            if operator == "==":
+                return actual == expected
+            if operator == "!=":
+                return actual != expected
+            if operator == "CONTAINS":
+                return expected in actual
+            if operator == "BEGINSWITH":
+                return actual.startswith(expected)
+            if operator == "ENDSWITH":
+                return actual.endswith(expected)
+            return re.fullmatch(re.escape(expected).replace(r"\*", ".*").replace(r"\?", "."), actual) is not None
+        checks.append(check)
+    return lambda attributes: all(check(attributes) for check in checks)
+
+
+def _split_class_chain(chain: str) -> List[str]:
+    """Splits a class chain on "/" outside backtick predicates."""
+    segments, current, in_predicate = [], "", False
+    for char in chain:
+        if char == "`":
+            in_predicate = not in_predicate
+        if char == "/" and not in_predicate:
+            segments.append(current)
+            current = ""
+        else:
+            current += char
+    segments.append(current)
+    return [segment for segment in segments if segment]
+
+
+def _class_chain(session: MockSession, scope: MockElement, chain: str) -> List[MockElement]:
+    """Evaluates an XCUITest class chain query."""
+    current = [scope]
+    descendant = False
+    for segment in _split_class_chain(chain):
+        match = _CHAIN_SEGMENT.match(segment)
+        if not match:
+            raise MockError("invalid selector", f"Unsupported class chain segment: {segment}")
+        element_type, filters = match.groups()
+        if element_type == "**":
+            descendant = True
+            continue
+        candidates = []
+        for parent in current:
+            pool = session.descendants(parent) if descendant else session.children(parent)
+            for element in pool:
+                attributes = element.attributes("ios", session.package)
+                if element_type in ("*", attributes["type"]) and element not in candidates:
+                    candidates.append(element)
+        for item in re.findall(r"\[(`[^`]*`|-?\d+)\]", filters):
+            if item.startswith("`"):
+                matches = _predicate_filter(item.strip("`"))
+                candidates = [e for e in candidates if matches(e.attributes("ios", session.package))]
+            else:
+                index = int(item)
+                position = index - 1 if index > 0 else index
+                candidates = candidates[position:position + 1 or None] if -len(candidates) <= position < len(candidates) else []
+        current, descendant = candidates, False
+    return current
+
+
+def find_elements(session: MockSession, using: str, value: str,
+                  scope: Optional[MockElement] = None) -> List[MockElement]:
+    """
+    Finds elements on the session's current screen.
+
+    Args:
+        session (MockSession): The session.
+        using (str): W3C/Appium locator strategy.
+        value (str): Locator value.
+        scope (MockElement): Search below this element instead of the screen root.
+
+    Returns:
+        list: Matching elements in document order.
+    """
+    scope = scope or session.root
+    platform, package = session.platform, session.package
+
+    def matching(predicate):
+        return [e for e in session.descendants(scope) if predicate(e.attributes(platform, package))]
+
+    if using == "id":
+        if platform == "ios":
+            return matching(lambda a: a["name"] == value)
+        full_id = value if ":id/" in value else f"{package}:id/{value}"
+        return matching(lambda a: a["resource-id"] == full_id)
+    if using == "accessibility id":
+        key = "name" if platform == "ios" else "content-desc"
+        return matching(lambda a: a[key] == value)
+    if using == "class name":
+        key = "type" if platform == "ios" else "class"
+        return matching(lambda a: a[key] == value)
+    if using == "-android uiautomator" and platform == "android":
+        found = matching(_uiselector_filter(value))
+        instance = re.search(r"\.instance\((\d+)\)", value)
+        if instance:
+            index = int(instance.group(1))
+            return found[index:index + 1]
+        return found
+    if using == "-ios predicate string" and platform == "ios":
+        return matching(_predicate_filter(value))
+    if using == "-ios class chain" and platform == "ios":
+        return _class_chain(session, scope, value)
+    if using == "xpath":
+        document, mapping = session.to_xml(scope)
+        path = "." + value if value.startswith("/") else value
+        try:
+            return [mapping[node] for node in document.findall(path) if node in mapping]
+        except (SyntaxError, KeyError) as e:
+            raise MockError("invalid selector", f"Unsupported xpath {value}: {e}")
+    raise MockError("invalid selector", f"Locator strategy '{using}' is not supported on {platform}")
+
+
+# ---------------------------------------------------------------------------
+# mobile: commands
+# ---------------------------------------------------------------------------
+
+# "mobile: <name>" script handlers: handler(session, args) -> value
+MOBILE_COMMANDS: Dict[str, Callable[[MockSession, Dict[str, Any]], Any]] = {}
+
+
+def mobile_command(name: str):
+    """Registers a handler for an `execute_script("mobile: <name>", args)` call."""
+    def register(handler):
+        MOBILE_COMMANDS[f"mobile: {name}"] = handler
+        return handler
+    return register
+
+
+@mobile_command("activateApp")
+def _activate_app(session, args):
+    session.relaunch()
+
+
+@mobile_command("terminateApp")
+def _terminate_app(session, args):
+    session.relaunch()
+    return True
+
+
+@mobile_command("deepLink")
+def _deep_link(session, args):
+    url = urlsplit(args.get("url", ""))
+    link = session.deep_links.get(f"{url.scheme}://{url.netloc}{url.path}")
+    if link is None:
+        raise MockError("invalid argument", f"No deep link '{args.get('url')}' in mock UI")
+    session.open_screen(link["screen"])
+    # text: {element id: "template with {query parameters}"}
+    params = dict(parse_qsl(url.query))
+    for element_id, template in (link.get("text") or {}).items():
+        try:
+            text = template.format(**params)
+        except KeyError:
+            continue
+        for element in _walk(session.root):
+            if element.resource_id == element_id:
+                element.text = text
+
+
+@mobile_command("startActivity")
+def _start_activity(session, args):
+    activity = args.get("intent", "").split("/", 1)[-1]
+    target = session.activities.get(activity)
+    if target is None:
+        raise MockError("invalid argument", f"No activity '{activity}' in mock UI")
+    extras = {key: value for _, key, value in args.get("extras") or []}
+    session.open_screen(extras.get(target.get("screen_extra"), target["screen"]))
+
+
+@mobile_command("shell")
+def _shell(session, args):
+    return ""
+
+
+def _scroll_target(session: MockSession, args: Dict[str, Any]) -> MockElement:
+    """The list a scroll command acts on: args["elementId"], else the first scrollable list on screen."""
+    element_id = args.get("elementId") or args.get("element")
+    for element in session.descendants(session.root):
+        if element.visible_rows and (element_id is None or element.element_id == element_id):
+            return element
+    raise MockError("no such element", f"No scrollable element {element_id or ''} on screen '{session.screen}'")
+
+
+def _scroll(session: MockSession, element: MockElement, direction: str, percent: float) -> bool:
+    """Scrolls a list by percent of its visible rows; returns True if it can scroll further that way."""
+    if direction not in ("up", "down"):
+        raise MockError("invalid argument", f"Unsupported scroll direction '{direction}' in mock UI")
+    step = max(1, int(element.visible_rows * percent))
+    last = max(0, len(session.list_items(element)) - element.visible_rows)
+    offset = session.scroll_offset(element) + (step if direction == "down" else -step)
+    element.scroll_offset = min(max(offset, 0), last)
+    return element.scroll_offset < last if direction == "down" else element.scroll_offset > 0
+
+
+@mobile_command("scrollGesture")
+def _scroll_gesture(session, args):
+    # UiAutomator2: returns whether the element can still scroll in that direction
+    return _scroll(session, _scroll_target(session, args), args.get("direction", "down"),
+                   float(args.get("percent", 1.0)))
+
+
+@mobile_command("scroll")
+def _xcuitest_scroll(session, args):
+    # XCUITest: scrolls about one screen and returns nothing
+    _scroll(session, _scroll_target(session, args), args.get("direction", "down"), 1.0)
+
+
+# ---------------------------------------------------------------------------
+# Flask application
+# ---------------------------------------------------------------------------
+
+def load_ui(path: str = DEFAULT_UI_PATH) -> Dict[str, Any]:
+    """Loads the scripted UI definition."""
+    with open(path, 'r', encoding='utf-8') as f:
+        ui = yaml.safe_load(f)
+    if not ui or not ui.get("screens"):
+        raise ValueError(f"Mock UI file {path} defines no screens")
+    return ui
+
+
+def create_app(ui_path: str = DEFAULT_UI_PATH, latency: Optional[Dict[str, float]] = None,
+               max_implicit_wait: Optional[float] = None) -> Flask:
+    """
+    Creates the mock server application.
+
+    Args:
+        ui_path (str): Scripted UI YAML file.
+        latency (dict): Per-command latency in seconds; "default" applies to
+            every command without its own entry. Overrides the UI file's latency.
+        max_implicit_wait (float): Cap in seconds on the implicit wait applied when
+            a find fails (default: honour the session's implicit wait).
+
+    Returns:
+        Flask: The application. Command counts are served at GET /mock/stats.
+    """
+    ui = load_ui(ui_path)
+    latencies = dict(ui.get("latency") or {})
+    latencies.update(latency or {})
+    sessions: Dict[str, MockSession] = {}
+    stats: Counter = Counter()
+    stats_lock = threading.Lock()
+
+    app = Flask(__name__)
+    app.config["MOCK_SESSIONS"] = sessions
+    app.config["MOCK_STATS"] = stats
+
+    def command(name: str, needs_session: bool = True):
+        """Wraps a route: latency, stats, session lookup and W3C error responses."""
+        def decorate(handler):
+            @wraps(handler)
+            def route(session_id=None, **kwargs):
+                with stats_lock:
+                    stats[name] += 1
+                delay = latencies.get(name, latencies.get("default", 0.0))
+                if delay:
+                    time.sleep(delay)
+                try:
+                    if needs_session:
+                        session = sessions.get(session_id)
+                        if session is None:
+                            raise MockError("invalid session id", f"Session {session_id} does not exist")
+                        with session.lock:
+                            value = handler(session, **kwargs)
+                    else:
+                        value = handler(**kwargs)
+                except MockError as e:
+                    return jsonify({"value": {"error": e.error, "message": e.message, "stacktrace": ""}}), \
+                        ERROR_STATUS.get(e.error, 500)
+                return jsonify({"value": value})
+            route.__name__ = f"command_{name}"
+            return route
+        return decorate
+
+    def body() -> Dict[str, Any]:
+        return request.get_json(force=True, silent=True) or {}
+
+    def element_ref(element: MockElement) -> Dict[str, str]:
+        return {ELEMENT_KEY: element.element_id, "ELEMENT": element.element_id}
+
+    def lookup(session: MockSession, element_id: str) -> MockElement:
+        for root in session.screens.values():
+            if root.element_id == element_id:
+                element = root
+                break
+            element = next((e for e in _walk(root) if e.element_id == element_id), None)
+            if element:
+                break
+        else:
+            raise MockError("no such element", f"Element {element_id} is unknown")
+        if not session.is_attached(element):
+            raise MockError("stale element reference", f"Element {element_id} is no longer on screen")
+        return element
+
+    def find(session: MockSession, scope: Optional[MockElement], multiple: bool):
+        payload = body()
+        using, value = payload.get("using"), payload.get("value")
+        if not using or value is None:
+            raise MockError("invalid argument", "Both 'using' and 'value' are required")
+        deadline = time.monotonic() + (
+            session.implicit_wait if max_implicit_wait is None else min(session.implicit_wait, max_implicit_wait))
+        while True:
+            found = find_elements(session, using, value, scope)
+            if found or time.monotonic() >= deadline:
+                break
+            # The scripted UI only changes on commands, but honour the wait like a device would
+            session.lock.release()
+            try:
+                time.sleep(min(0.05, max(0.0, deadline - time.monotonic())))
+            finally:
+                session.lock.acquire()
+        if multiple:
+            return [element_ref(element) for element in found]
+        if not found:
+            raise MockError("no such element", f"No element found using {using}: {value}")
+        return element_ref(found[0])
+
+    @app.errorhandler(404)
+    def unknown_command(error):
+        return jsonify({"value": {"error": "unknown command", "message": request.path, "stacktrace": ""}}), 404
+
+    @app.errorhandler(405)
+    def unknown_method(error):
+        return jsonify({"value": {"error": "unknown method", "message": request.path, "stacktrace": ""}}), 405
+
+    @app.get("/status")
+    @command("status", needs_session=False)
+    def status():
+        return {"ready": True, "message": "Mock Appium server is ready", "build": {"version": "mock"}}
+
+    @app.get("/mock/stats")
+    def mock_stats():
+        with stats_lock:
+            return jsonify({"commands": dict(stats), "sessions": len(sessions)})
+
+    @app.post("/session")
+    @command("new_session", needs_session=False)
+    def new_session():
+        payload = body()
+        capabilities = dict(payload.get("capabilities", {}).get("alwaysMatch", {}))
+        for extra in payload.get("capabilities", {}).get("firstMatch", [{}])[:1]:
+            capabilities.update(extra)
+        capabilities.update(payload.get("desiredCapabilities", {}))
+        session = MockSession(ui, capabilities)
+        sessions[session.session_id] = session
+        return {"sessionId": session.session_id, "capabilities": capabilities}
+
+    @app.get("/session/<session_id>")
+    @command("get_session")
+    def get_session(session):
+        return session.capabilities
+
+    @app.delete("/session/<session_id>")
+    @command("delete_session")
+    def delete_session(session):
+        sessions.pop(session.session_id, None)
+
+    @app.post("/session/<session_id>/timeouts")
+    @command("set_timeouts")
+    def set_timeouts(session):
+        implicit = body().get("implicit")
+        if implicit is not None:
+            session.implicit_wait = implicit / 1000.0
+
+    @app.post("/session/<session_id>/element")
+    @command("find_element")
+    def find_element(session):
+        return find(session, None, multiple=False)
+
+    @app.post("/session/<session_id>/elements")
+    @command("find_elements")
+    def find_elements_route(session):
+        return find(session, None, multiple=True)
+
+    @app.post("/session/<session_id>/element/<element_id>/element")
+    @command("find_child_element")
+    def find_child_element(session, element_id):
+        return find(session, lookup(session, element_id), multiple=False)
+
+    @app.post("/session/<session_id>/element/<element_id>/elements")
+    @command("find_child_elements")
+    def find_child_elements(session, element_id):
+        return find(session, lookup(session, element_id), multiple=True)
+
+    @app.get("/session/<session_id>/element/<element_id>/text")
+    @command("get_text")
+    def get_text(session, element_id):
+        element = lookup(session, element_id)
+        return element.text
+
+    @app.get("/session/<session_id>/element/<element_id>/attribute/<name>")
+    @command("get_attribute")
+    def get_attribute(session, element_id, name):
+        return lookup(session, element_id).attributes(session.platform, session.package).get(name)
+
+    @app.get("/session/<session_id>/element/<element_id>/displayed")
+    @command("is_displayed")
+    def is_displayed(session, element_id):
+        lookup(session, element_id)
+        return True
+
+    @app.get("/session/<session_id>/element/<element_id>/enabled")
+    @command("is_enabled")
+    def is_enabled(session, element_id):
+        lookup(session, element_id)
+        return True
+
+    @app.get("/session/<session_id>/element/<element_id>/name")
+    @command("get_tag_name")
+    def get_tag_name(session, element_id):
+        element = lookup(session, element_id)
+        return element.ios_type if session.platform == "ios" else element.cls
+
+    @app.post("/session/<session_id>/element/<element_id>/click")
+    @command("click")
+    def click(session, element_id):
+        element = lookup(session, element_id)
+        # The click lands on the nearest clickable ancestor, e.g. a list row's text
+        target = element
+        while target is not None and not (target.goto or target.toggle):
+            target = target.parent
+        if target is None:
+            return None
+        if target.toggle:
+            target.checked = not target.checked
+        if target.goto:
+            session.navigate(target.goto)
+
+    @app.post("/session/<session_id>/element/<element_id>/clear")
+    @command("clear")
+    def clear(session, element_id):
+        lookup(session, element_id).text = ""
+
+    @app.post("/session/<session_id>/element/<element_id>/value")
+    @command("send_keys")
+    def send_keys(session, element_id):
+        payload = body()
+        text = payload.get("text")
+        if text is None:
+            text = "".join(payload.get("value", []))
+        element = lookup(session, element_id)
+        element.text += text
+
+    @app.get("/session/<session_id>/source")
+    @command("page_source")
+    def page_source(session):
+        document, _ = session.to_xml()
+        return '<?xml version="1.0" encoding="UTF-8"?>' + ET.tostring(document, encoding="unicode")
+
+    @app.get("/session/<session_id>/screenshot")
+    @command("screenshot")
+    def screenshot(session):
+        return SCREENSHOT_PNG
+
+    @app.get("/session/<session_id>/element/<element_id>/screenshot")
+    @command("element_screenshot")
+    def element_screenshot(session, element_id):
+        lookup(session, element_id)
+        return SCREENSHOT_PNG
+
+    @app.post("/session/<session_id>/appium/device/push_file")
+    @command("push_file")
+    def push_file(session):
+        payload = body()
+        session.files[payload.get("path", "")] = payload.get("data", "")
+
+    @app.post("/session/<session_id>/back")
+    @command("back")
+    def back(session):
+        session.back()
+
+    @app.post("/session/<session_id>/execute/sync")
+    @command("execute_script")
+    def execute_script(session):
+        payload = body()
+        script = payload.get("script", "")
+        handler = MOBILE_COMMANDS.get(script)
+        if handler is None:
+            raise MockError("unsupported operation", f"Script '{script}' is not supported by the mock server")
+        args = payload.get("args") or [{}]
+        return handler(session, args[0] if args else {})
+
+    return app
+
+
+def _walk(root: MockElement):
+    """All elements below root, including filtered-out ones."""
+    stack = list(root.children)
+    while stack:
+        element = stack.pop()
+        yield element
+        stack.extend(element.children)
+
+
+class MockAppiumServer(BackgroundServer):
+    """
+    Runs the mock server on a background thread.
+
+    Example:
+        with MockAppiumServer(port=0) as server:
+            os.environ["APPIUM_PORT"] = str(server.port)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 4723, ui_path: str = DEFAULT_UI_PATH,
+                 latency: Optional[Dict[str, float]] = None, max_implicit_wait: Optional[float] = None,
+                 quiet: bool = True):
+        """
+        Creates the server; port 0 picks a free port. quiet=True turns off per-request logging.
+        """
+        super().__init__(create_app(ui_path, latency, max_implicit_wait), host, port, quiet, name="mock-appium")
+
+    @property
+    def stats(self) -> Counter:
+        """Number of requests served per command."""
+        return self.app.config["MOCK_STATS"]
+
+
+def _parse_latency(values: List[str]) -> Dict[str, float]:
+    """Parses repeated `command=seconds` arguments."""
+    latency = {}
+    for item in values:
+        name, _, seconds = item.partition("=")
+        if not seconds:
+            raise argparse.ArgumentTypeError(f"Expected command=seconds, got '{item}'")
+        latency[name] = float(seconds)
+    return latency
+
+
+def main(argv=None):
+    """Command line entry point: serves the mock until interrupted."""
+    parser = argparse.ArgumentParser(description="Mock Appium (W3C WebDriver) server")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=4723, help="Port to listen on (default: 4723)")
+    parser.add_argument("--ui", default=DEFAULT_UI_PATH, help=f"Scripted UI file (default: {DEFAULT_UI_PATH})")
+    parser.add_argument("--latency", type=float, help="Latency in seconds added to every command")
+    parser.add_argument("--command-latency", action="append", default=[], metavar="COMMAND=SECONDS",
+                        help="Latency for one command, e.g. find_element=0.1 (repeatable)")
+    parser.add_argument("--max-implicit-wait", type=float,
+                        help="Cap in seconds on the implicit wait applied to failed finds")
+    parser.add_argument("--quiet", action="store_true", help="Do not log every request")
+    args = parser.parse_args(argv)
+
+    latency = _parse_latency(args.command_latency)
+    if args.latency is not None:
+        latency["default"] = args.latency
+    server = MockAppiumServer(args.host, args.port, args.ui, latency, args.max_implicit_wait, quiet=args.quiet)
+    print(f"Mock Appium server listening on {server.url} (UI: {args.ui})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
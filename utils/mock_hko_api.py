@@ -0,0 +1,370 @@
+"""
+Mock Hong Kong Observatory Open Data API.
+
+A local stand-in for https://data.weather.gov.hk/weatherAPI/opendata/weather.php
+that serves generated 9-day forecasts (dataType=fnd) for any date, with
+fault injection for load-testing the API client:
+
+    latency / jitter       delay before the response, in seconds
+    rate_limit             requests per second; extra requests get 429 + Retry-After
+    throttle_rate          probability of a 429 response
+    error_rate             probability of a 5xx response (one of error_statuses)
+    drip_bytes / drip_interval
+                           send the body in chunks of drip_bytes, sleeping
+                           drip_interval seconds between chunks
+    scale                  multiply the number of forecast days (payload size)
+
+Faults are set on the command line, changed at runtime with
+POST /mock/faults (JSON), or overridden per request with mock_<name>
+query parameters, e.g. ?dataType=fnd&mock_status=503. The forecast for a
+given date (?date=YYYYMMDD, default today) is always the same.
+
+Usage:
+    python -m utils.mock_hko_api --port 3000
+    python -m utils.mock_hko_api --latency 0.2 --error-rate 0.1 --rate-limit 20
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, Response, jsonify, request
+
+from utils.mock_server import BackgroundServer
+
+
+WEATHER_PATH = "/weatherAPI/opendata/weather.php"
+
+# Weather texts and weekday names per language (lang=en / tc / sc)
+WEATHER = {
+    "en": ["Sunny periods.", "Mainly cloudy with a few showers.", "Sunny intervals and a few showers.",
+           "Cloudy with occasional showers.", "Fine.", "Hot with sunny periods. Isolated showers later."],
+    "tc": ["部分時間有陽光。", "大致多雲，有幾陣驟雨。", "短暫時間有陽光，有幾陣驟雨。", "多雲，有時有驟雨。", "天晴。", "炎熱，部分時間有陽光。稍後有一兩陣驟雨。"],
+    "sc": ["部分时间有阳光。", "大致多云，有几阵骤雨。", "短暂时间有阳光，有几阵骤雨。", "多云，有时有骤雨。", "天晴。", "炎热，部分时间有阳光。稍后有一两阵骤雨。"],
+}
+WINDS = {
+    "en": ["East force 3 to 4.", "Southeast force 3.", "South to southwest force 2 to 3.", "North force 4, occasionally 5."],
+    "tc": ["東風3至4級。", "東南風3級。", "南至西南風2至3級。", "北風4級，間中5級。"],
+    "sc": ["东风3至4级。", "东南风3级。", "南至西南风2至3级。", "北风4级，间中5级。"],
+}
+WEEKDAYS = {
+    "en": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+    "tc": ["星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日"],
+    "sc": ["星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日"],
+}
+GENERAL_SITUATION = {
+    "en": "An anticyclone over southeastern China will bring generally fine weather to the coast of Guangdong.",
+    "tc": "華南沿岸天氣大致良好，一道反氣旋正覆蓋華東南。",
+    "sc": "华南沿岸天气大致良好，一道反气旋正覆盖华东南。",
+}
+ICONS = [50, 51, 52, 53, 54, 60, 62]
+PSR_LEVELS = ["Low", "Medium Low", "Medium", "Medium High", "High"]
+
+
+def generate_forecast(base_date: date, lang: str = "en", days: int = 9) -> Dict[str, Any]:
+    """
+    Generates a 9-day forecast (dataType=fnd) payload.
+
+    The forecast starts the day after base_date, like the real API, and is
+    seeded by the date and language so the same request always returns the
+    same data.
+
+    Args:
+        base_date (date): Date the forecast is issued on.
+        lang (str): "en", "tc" or "sc".
+        days (int): Number of forecast days (9, or more when scaling the payload).
+
+    Returns:
+        dict: The payload in the weather.php fnd schema.
+    """
+    lang = lang if lang in WEATHER else "en"
+    rng = random.Random(f"{base_date:%Y%m%d}-{lang}")
+    forecasts = []
+    for offset in range(1, days + 1):
+        day = base_date + timedelta(days=offset)
+        min_temp = rng.randint(14, 27)
+        min_rh = rng.randint(45, 80)
+        forecasts.append({
+            "forecastDate": day.strftime("%Y%m%d"),
+            "week": WEEKDAYS[lang][day.weekday()],
+            "forecastWind": rng.choice(WINDS[lang]),
+            "forecastWeather": rng.choice(WEATHER[lang]),
+            "forecastMaxtemp": {"value": min_temp + rng.randint(3, 8), "unit": "C"},
+            "forecastMintemp": {"value": min_temp, "unit": "C"},
+            "forecastMaxrh": {"value": min(100, min_rh + rng.randint(10, 25)), "unit": "percent"},
+            "forecastMinrh": {"value": min_rh, "unit": "percent"},
+            "ForecastIcon": rng.choice(ICONS),
+            "PSR": rng.choice(PSR_LEVELS),
+        })
+    issued = datetime(base_date.year, base_date.month, base_date.day, 11, 30)
+    record_time = issued.replace(hour=7, minute=0).strftime("%Y-%m-%dT%H:%M:%S+08:00")
+    return {
+        "generalSituation": GENERAL_SITUATION[lang],
+        "weatherForecast": forecasts,
+        "updateTime": issued.strftime("%Y-%m-%dT%H:%M:%S+08:00"),
+        "seaTemp": {"place": "North Point", "value": rng.randint(20, 29), "unit": "C", "recordTime": record_time},
+        "soilTemp": [
+            {"place": "Hong Kong Observatory", "value": round(rng.uniform(20, 30), 1), "unit": "C",
+             "recordTime": record_time, "depth": {"unit": "metre", "value": depth}}
+            for depth in (0.5, 1.0)
+        ],
+    }
+
+
+class FaultConfig:
+    """Fault injection settings of the mock API."""
+
+    FIELDS = {
+        "latency": float,
+        "jitter": float,
+        "rate_limit": float,
+        "throttle_rate": float,
+        "error_rate": float,
+        "error_statuses": list,
+        "drip_bytes": int,
+        "drip_interval": float,
+        "scale": int,
+    }
+
+    def __init__(self, **settings):
+        self.latency = 0.0
+        self.jitter = 0.0
+        self.rate_limit = 0.0       # 0 = unlimited
+        self.throttle_rate = 0.0
+        self.error_rate = 0.0
+        self.error_statuses: List[int] = [500, 502, 503, 504]
+        self.drip_bytes = 0         # 0 = send the body at once
+        self.drip_interval = 0.0
+        self.scale = 1
+        self.update(settings)
+
+    def update(self, settings: Dict[str, Any]):
+        """
+        Updates settings, converting values to the expected types.
+
+        Raises:
+            ValueError: For unknown settings or invalid values.
+        """
+        for name, value in settings.items():
+            if name not in self.FIELDS:
+                raise ValueError(f"Unknown fault setting '{name}', expected one of: {', '.join(self.FIELDS)}")
+            if self.FIELDS[name] is list:
+                value = [int(status) for status in (value.split(",") if isinstance(value, str) else value)]
+            else:
+                value = self.FIELDS[name](value)
+            setattr(self, name, value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class _RateLimiter:
+    """Token bucket allowing `rate` requests per second with a burst of one second."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self._rate = 0.0
+
+    def allow(self, rate: float) -> bool:
+        if rate <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if rate != self._rate:
+                self._rate, self._tokens = rate, rate
+            self._tokens = min(rate, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+def create_app(faults: Optional[FaultConfig] = None, forecast_date: Optional[date] = None,
+               seed: Optional[int] = None) -> Flask:
+    """
+    Creates the mock API application.
+
+    Args:
+        faults (FaultConfig): Initial fault injection settings.
+        forecast_date (date): Date forecasts are issued on when the request has no
+            ?date= (default: the current date).
+        seed (int): Seed for the random fault decisions, for reproducible runs.
+
+    Returns:
+        Flask: The application.
+    """
+    app = Flask(__name__)
+    faults = faults or FaultConfig()
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    limiter = _RateLimiter()
+    stats: Counter = Counter()
+    stats_lock = threading.Lock()
+    app.config["MOCK_FAULTS"] = faults
+    app.config["MOCK_STATS"] = stats
+
+    def record(status: int):
+        with stats_lock:
+            stats["requests"] += 1
+            stats[str(status)] += 1
+
+    def chance(probability: float) -> bool:
+        if probability <= 0:
+            return False
+        with rng_lock:
+            return rng.random() < probability
+
+    def error(status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        record(status)
+        response = jsonify({"error": message})
+        response.status_code = status
+        for name, value in (headers or {}).items():
+            response.headers[name] = value
+        return response
+
+    @app.get(WEATHER_PATH)
+    def weather():
+        # mock_<setting> query parameters override the faults for this request
+        settings = FaultConfig(**faults.as_dict())
+        try:
+            settings.update({key[len("mock_"):]: value for key, value in request.args.items()
+                             if key.startswith("mock_") and key != "mock_status"})
+        except ValueError as e:
+            return error(400, str(e))
+        forced = request.args.get("mock_status")
+        if forced and not (forced.isdigit() and 100 <= int(forced) <= 599):
+            return error(400, f"mock_status must be an HTTP status code (100-599), got '{forced}'")
+
+        delay = settings.latency
+        if settings.jitter:
+            with rng_lock:
+                delay += rng.uniform(0, settings.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if forced:
+            return error(int(forced), f"Injected status {forced}", {"Retry-After": "1"} if forced == "429" else None)
+        if not limiter.allow(settings.rate_limit) or chance(settings.throttle_rate):
+            return error(429, "Too many requests", {"Retry-After": "1"})
+        if chance(settings.error_rate):
+            with rng_lock:
+                status = rng.choice(settings.error_statuses)
+            return error(status, f"Injected server error {status}")
+
+        data_type = request.args.get("dataType")
+        if data_type != "fnd":
+            return error(400, f"Unsupported dataType '{data_type}', the mock serves dataType=fnd")
+        try:
+            base_date = (datetime.strptime(request.args["date"], "%Y%m%d").date()
+                         if "date" in request.args else forecast_date or date.today())
+        except ValueError:
+            return error(400, "date must be YYYYMMDD")
+
+        payload = generate_forecast(base_date, request.args.get("lang", "en"), days=9 * max(1, settings.scale))
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        record(200)
+        headers = {"Content-Length": str(len(body))}
+        if settings.drip_bytes <= 0:
+            return Response(body, status=200, mimetype="application/json", headers=headers)
+
+        def drip():
+            for start in range(0, len(body), settings.drip_bytes):
+                if start:
+                    time.sleep(settings.drip_interval)
+                yield body[start:start + settings.drip_bytes]
+
+        return Response(drip(), status=200, mimetype="application/json", headers=headers,
+                        direct_passthrough=True)
+
+    @app.get("/mock/faults")
+    def get_faults():
+        return jsonify(faults.as_dict())
+
+    @app.post("/mock/faults")
+    def set_faults():
+        try:
+            faults.update(request.get_json(force=True, silent=True) or {})
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(faults.as_dict())
+
+    @app.get("/mock/stats")
+    def get_stats():
+        with stats_lock:
+            return jsonify(dict(stats))
+
+    @app.post("/mock/reset")
+    def reset():
+        faults.update(FaultConfig().as_dict())
+        with stats_lock:
+            stats.clear()
+        return jsonify(faults.as_dict())
+
+    return app
+
+
+class MockHKOServer(BackgroundServer):
+    """
+    Runs the mock API on a background thread.
+
+    Example:
+        with MockHKOServer(port=0, faults=FaultConfig(error_rate=0.2)) as server:
+            os.environ["HKO_API_BASE_URL"] = server.url
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 3000, faults: Optional[FaultConfig] = None,
+                 forecast_date: Optional[date] = None, seed: Optional[int] = None, quiet: bool = True):
+        super().__init__(create_app(faults, forecast_date, seed), host, port, quiet, name="mock-hko")
+
+    @property
+    def faults(self) -> FaultConfig:
+        return self.app.config["MOCK_FAULTS"]
+
+    @property
+    def stats(self) -> Counter:
+        """Number of requests served, in total and per status code."""
+        return self.app.config["MOCK_STATS"]
+
+
+def main(argv=None):
+    """Command line entry point: serves the mock API until interrupted."""
+    parser = argparse.ArgumentParser(description="Mock Hong Kong Observatory open data API")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=3000, help="Port to listen on (default: 3000)")
+    parser.add_argument("--date", help="Issue date of the forecasts, YYYYMMDD (default: today)")
+    parser.add_argument("--seed", type=int, help="Seed for random fault injection")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second before 429 (0 = off)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Probability of a 429 response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 5xx response")
+    parser.add_argument("--error-statuses", default="500,502,503,504", help="5xx statuses to inject")
+    parser.add_argument("--drip-bytes", type=int, default=0, help="Send the body in chunks of this size (0 = off)")
+    parser.add_argument("--drip-interval", type=float, default=0.0, help="Seconds between body chunks")
+    parser.add_argument("--scale", type=int, default=1, help="Multiply the number of forecast days")
+    parser.add_argument("--quiet", action="store_true", help="Do not log every request")
+    args = parser.parse_args(argv)
+
+    faults = FaultConfig(
+        latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit, throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate, error_statuses=args.error_statuses, drip_bytes=args.drip_bytes,
+        drip_interval=args.drip_interval, scale=args.scale)
+    forecast_date = datetime.strptime(args.date, "%Y%m%d").date() if args.date else None
+    server = MockHKOServer(args.host, args.port, faults, forecast_date, args.seed, quiet=args.quiet)
+    print(f"Mock HKO API listening on {server.url}{WEATHER_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+"""
+Background WSGI Server for the Mock Services.
+
+Runs a Flask app (the mock Appium server, the mock HKO API) on a
+background thread so tests and benchmarks can start and stop it in
+process.
+"""
+import logging
+import threading
+from typing import Optional
+
+
+class BackgroundServer:
+    """
+    Serves a WSGI app on a background thread.
+
+    Example:
+        with BackgroundServer(app, port=0) as server:
+            requests.get(server.url + "/status")
+    """
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0, quiet: bool = True,
+                 name: str = "mock-server"):
+        """
+        Creates the server; port 0 picks a free port.
+
+        Args:
+            app: The WSGI application.
+            host (str): Address to bind.
+            port (int): Port to listen on.
+            quiet (bool): Turn off per-request logging.
+            name (str): Name of the serving thread.
+        """
+        from werkzeug.serving import make_server
+
+        if quiet:
+            logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+        self.app = app
+        self.host = host
+        self.name = name
+        self._server = make_server(host, port, app, threaded=True)
+        self.port = self._server.server_port
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def serve_forever(self):
+        """Serves on the calling thread until shutdown."""
+        self._server.serve_forever()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
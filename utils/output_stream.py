@@ -0,0 +1,223 @@
+"""
+Streaming Output for Test Subprocesses.
+
+Reads a child process's output line by line with a bounded line length,
+echoes it to the console as it arrives and tees it to a report file.
+Progress is tracked from the structured event stream the behave hooks
+write (utils/events.py), not from the console text. Memory use stays
+constant however long the run is.
+"""
+import codecs
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Longest line read from the pipe in one go; longer lines are passed through in pieces
+MAX_LINE_BYTES = 64 * 1024
+
+# Child output encoding, matching what the console uses on each platform
+OUTPUT_ENCODING = 'gbk' if os.name == 'nt' else 'utf-8'
+
+
+class ProgressTracker:
+    """Tracks scenario and step progress from structured events."""
+
+    def __init__(self, label: str = "", report_every: float = 0):
+        """
+        Initializes the tracker.
+
+        Args:
+            label (str): Prefix for progress messages, e.g. a worker name.
+            report_every (float): Minimum seconds between progress messages (0 = every scenario).
+        """
+        self.label = label
+        self.report_every = report_every
+        self.started = time.monotonic()
+        self.scenarios_finished = 0
+        self.features_finished = 0
+        self.steps: Dict[str, int] = {"passed": 0, "failed": 0, "skipped": 0}
+        self.failed_steps: List[str] = []
+        self.current_scenario: Optional[str] = None
+        self.summary: Dict[str, Dict[str, int]] = {}
+        self._last_report = 0.0
+
+    def feed_event(self, event: Dict) -> Optional[str]:
+        """
+        Updates progress from one structured event (see utils/events.py).
+
+        Returns:
+            str: A progress message to display, or None.
+        """
+        event_type = event.get("event")
+        if event_type == "scenario_end":
+            self.scenarios_finished += 1
+            return self._progress_message()
+        if event_type == "scenario_start":
+            self.current_scenario = event.get("name")
+        elif event_type == "step_end":
+            status = event.get("status")
+            self.steps[status if status in self.steps else "skipped"] += 1
+            if status == "failed":
+                self.failed_steps.append(f"{self.current_scenario}: {event.get('name')}")
+        elif event_type == "feature_end":
+            self.features_finished += 1
+        elif event_type == "run_end" and event.get("summary"):
+            summary = event["summary"]
+            self.summary["scenarios"] = {"passed": summary["scenarios_passed"],
+                                         "failed": summary["scenarios_failed"]}
+            self.summary["steps"] = {"passed": summary["steps_passed"], "failed": summary["steps_failed"]}
+        return None
+
+    def _progress_message(self) -> Optional[str]:
+        """Builds a progress message, rate-limited by report_every."""
+        now = time.monotonic()
+        if self.report_every and now - self._last_report < self.report_every:
+            return None
+        self._last_report = now
+        label = f"[{self.label}] " if self.label else ""
+        return (f"{label}[progress] {self.scenarios_finished} scenarios done | steps: "
+                f"{self.steps['passed']} passed, {self.steps['failed']} failed, "
+                f"{self.steps['skipped']} skipped | {now - self.started:.1f}s")
+
+    def final_message(self) -> str:
+        """Builds the end-of-run progress message."""
+        label = f"[{self.label}] " if self.label else ""
+        return (f"{label}[progress] finished: {self.scenarios_finished} scenarios, steps: "
+                f"{self.steps['passed']} passed, {self.steps['failed']} failed, "
+                f"{self.steps['skipped']} skipped in {time.monotonic() - self.started:.1f}s")
+
+
+class EventFollower:
+    """
+    Tails a JSONL event file written by the behave hooks and feeds a ProgressTracker.
+
+    Runs on a background thread; stop() reads whatever is left and returns.
+    """
+
+    def __init__(self, path: str, tracker: ProgressTracker, poll_interval: float = 0.2,
+                 console=None, console_lock: Optional[threading.Lock] = None):
+        self.path = path
+        self.tracker = tracker
+        self.poll_interval = poll_interval
+        self.console = console or sys.stdout
+        self.console_lock = console_lock
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="event-follower", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops following after the remaining events have been read."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        position = 0
+        pending = ""
+        while True:
+            stopping = self._stop.is_set()
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as file:
+                    file.seek(position)
+                    data = file.read()
+                    position = file.tell()
+                pending += data
+                *lines, pending = pending.split("\n")
+                for line in lines:
+                    self._feed(line)
+            if stopping:
+                return
+            self._stop.wait(self.poll_interval)
+
+    def _feed(self, line: str):
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return
+        message = self.tracker.feed_event(event)
+        if message:
+            if self.console_lock:
+                with self.console_lock:
+                    self.console.write(f"{message}\n")
+                    self.console.flush()
+            else:
+                self.console.write(f"{message}\n")
+                self.console.flush()
+
+
+def pump_output(stream, tee_file=None, prefix: str = "", console=None,
+                console_lock: Optional[threading.Lock] = None):
+    """
+    Copies a binary pipe to the console and a tee file, line by line.
+
+    Args:
+        stream: The child's stdout pipe (binary).
+        tee_file: Text file that receives an exact copy of the output.
+        prefix (str): Prepended to console lines, e.g. "[w0] ".
+        console: Console stream (default: sys.stdout).
+        console_lock (threading.Lock): Serializes console writes between pumps.
+    """
+    console = console or sys.stdout
+    # Incremental decoding keeps multi-byte characters intact across chunk boundaries
+    decoder = codecs.getincrementaldecoder(OUTPUT_ENCODING)(errors='replace')
+    pending = ""
+    for chunk in iter(lambda: stream.readline(MAX_LINE_BYTES), b""):
+        text = decoder.decode(chunk)
+        if tee_file is not None:
+            tee_file.write(text)
+        pending += text
+        if not text.endswith("\n") and len(pending) < MAX_LINE_BYTES:
+            continue
+        line, pending = pending.rstrip("\r\n"), ""
+        _emit(console, console_lock, prefix, line)
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        _emit(console, console_lock, prefix, pending.rstrip("\r\n"))
+
+
+def _emit(console, console_lock, prefix, line):
+    """Writes one line to the console."""
+    if console_lock:
+        console_lock.acquire()
+    try:
+        console.write(f"{prefix}{line}\n")
+        console.flush()
+    finally:
+        if console_lock:
+            console_lock.release()
+
+
+def stream_process(cmd, tee_path: Optional[str] = None, env=None, prefix: str = "",
+                   console_lock: Optional[threading.Lock] = None) -> int:
+    """
+    Runs a command, streaming its merged stdout/stderr as it is produced.
+
+    Args:
+        cmd (list): The command to run.
+        tee_path (str): File that receives a copy of the output.
+        env (dict): Environment for the child process.
+        prefix (str): Prepended to console lines.
+        console_lock (threading.Lock): Serializes console writes with other streams.
+
+    Returns:
+        int: The process exit code.
+    """
+    # Unbuffered child output so progress shows up as soon as it is printed
+    env = dict(env if env is not None else os.environ, PYTHONUNBUFFERED="1")
+    tee_file = open(tee_path, "w", encoding="utf-8") if tee_path else None
+    try:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env)
+        try:
+            pump_output(process.stdout, tee_file, prefix, console_lock=console_lock)
+        finally:
+            process.stdout.close()
+        return process.wait()
+    finally:
+        if tee_file is not None:
+            tee_file.close()
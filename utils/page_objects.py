@@ -1,15 +1,237 @@
 """
 Page Object Model for the My Observatory app.
 """
-from appium.webdriver.common.appiumby import AppiumBy
+import re
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
 from utils.app_driver import AppDriver
+from utils.locator_registry import Locator, PageLocator, get_locator_registry
+
+
+# Signed integer or decimal number. A sign does not count right after a digit or
+# separator, so the hyphen in "20-25°C" is not a minus while "Temp:-3°C" and
+# "(-3°C)" stay negative. Accepts the Unicode
+# minus sign, thousands separators ("1,234") and a decimal comma ("12,5") as
+# displayed by some locales; a comma followed by exactly three digits is a
+# thousands separator.
+_NUMBER = (r'(?:(?<![\d.,])[-+\u2212])?(?:\d{1,3}(?:,\d{3})+(?!\d)|\d+)'
+           r'(?:\.\d+|,(?!\d{3}(?!\d))\d+)?')
+
+_MEASUREMENT_PATTERN = re.compile(
+    rf'(?P<number>{_NUMBER})\s*'
+    r'(?P<unit>°\s*[CF]|\u2103|\u2109|%|km/h|kmh|kph|m/s)?',
+    re.IGNORECASE
+)
+
+# "low - high" range such as "23 - 27°C", "60-85%" or "-3 ~ 5°C"
+_RANGE_PATTERN = re.compile(
+    rf'(?P<low>{_NUMBER})\s*(?P<low_unit>°\s*[CF]|\u2103|\u2109|%)?\s*'
+    r'(?:-|\u2013|~|to)\s*'
+    rf'(?P<high>{_NUMBER})\s*'
+    r'(?P<unit>°\s*[CF]|\u2103|\u2109|%|km/h|kmh|kph|m/s)?',
+    re.IGNORECASE
+)
+
+# Thousands separator inside a matched number
+_THOUSANDS_PATTERN = re.compile(r',(?=\d{3}(?!\d))')
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Normalised spelling for each recognised unit
+_UNIT_ALIASES = {
+    '°c': '°C', '\u2103': '°C',
+    '°f': '°F', '\u2109': '°F',
+    '%': '%',
+    'km/h': 'km/h', 'kmh': 'km/h', 'kph': 'km/h',
+    'm/s': 'm/s',
+}
+
+TEMPERATURE_UNITS = ('°C', '°F')
+WIND_SPEED_UNITS = ('km/h', 'm/s')
+
+UnitFilter = Optional[Union[str, Tuple[str, ...]]]
+
+
+class Measurement(NamedTuple):
+    """A numeric value read from the screen, with its unit if one was displayed."""
+    value: Union[int, float]
+    unit: Optional[str]
+
+
+class ValueRange(NamedTuple):
+    """A "low - high" range read from the screen, with its unit if one was displayed."""
+    low: Union[int, float]
+    high: Union[int, float]
+    unit: Optional[str]
+
+
+class ForecastDay(NamedTuple):
+    """One row of the 9-day forecast."""
+    date: str
+    weekday: str
+    weather: str
+    temperature: Optional[ValueRange]
+    humidity: Optional[ValueRange]
+
+
+class SearchResult(NamedTuple):
+    """One row of the city search results."""
+    name: str
+
+
+def _normalise_unit(raw_unit):
+    """Maps a matched unit to its canonical spelling."""
+    if not raw_unit:
+        return None
+    return _UNIT_ALIASES.get(_WHITESPACE_PATTERN.sub('', raw_unit).lower())
+
+
+def _to_number(raw_number):
+    """Converts a matched number to int, or float if it has a fractional part."""
+    raw_number = _THOUSANDS_PATTERN.sub('', raw_number.replace('\u2212', '-')).replace(',', '.')
+    if '.' in raw_number:
+        return float(raw_number)
+    return int(raw_number)
+
+
+def parse_measurement(text: Optional[str], unit: UnitFilter = None) -> Optional[Measurement]:
+    """
+    Parses the first numeric value out of a display string.
+    
+    Args:
+        text (str): The displayed text, e.g. "-3.5°C" or "Humidity: 85%".
+        unit (str or tuple): If given ("°C", "°F", "%", "km/h", "m/s", or a tuple of
+            these), prefer the first value displayed with a matching unit; values
+            without a unit are used as fallback.
+    
+    Returns:
+        Measurement: The parsed value and unit, or None if the text holds no number.
+    
+    Examples (python -m doctest utils/page_objects.py):
+        >>> parse_measurement("Temp:-3°C")
+        Measurement(value=-3, unit='°C')
+        >>> parse_measurement("(-3°C)")
+        Measurement(value=-3, unit='°C')
+        >>> parse_measurement("20-25°C", unit='°C')
+        Measurement(value=25, unit='°C')
+        >>> parse_measurement("1,234 km/h")
+        Measurement(value=1234, unit='km/h')
+    """
+    if not text:
+        return None
+    
+    units = (unit,) if isinstance(unit, str) else unit
+    fallback = None
+    for match in _MEASUREMENT_PATTERN.finditer(text):
+        measurement = Measurement(_to_number(match.group('number')),
+                                  _normalise_unit(match.group('unit')))
+        if units is None or measurement.unit in units:
+            return measurement
+        if fallback is None and measurement.unit is None:
+            fallback = measurement
+    return fallback
+
+
+def parse_measurements(texts: Iterable[Optional[str]], unit: UnitFilter = None) -> List[Optional[Measurement]]:
+    """Parses many display strings in one call; see parse_measurement."""
+    return [parse_measurement(text, unit) for text in texts]
+
+
+def parse_value(text: Optional[str], unit: UnitFilter = None) -> Optional[Union[int, float]]:
+    """Parses the numeric value of a display string, or None if there is none."""
+    measurement = parse_measurement(text, unit)
+    return measurement.value if measurement else None
+
+
+def parse_range(text: Optional[str], unit: UnitFilter = None) -> Optional[ValueRange]:
+    """
+    Parses the first "low - high" range out of a display string.
+    
+    Args:
+        text (str): The displayed text, e.g. "23 - 27°C" or "Humidity 60-85%".
+        unit (str or tuple): If given, prefer the first range displayed with a
+            matching unit; ranges without a unit are used as fallback.
+    
+    Returns:
+        ValueRange: The parsed bounds and unit, or None if the text holds no range.
+    
+    Examples:
+        >>> parse_range("60-85%")
+        ValueRange(low=60, high=85, unit='%')
+        >>> parse_range("-3 ~ 5°C")
+        ValueRange(low=-3, high=5, unit='°C')
+    """
+    if not text:
+        return None
+    
+    units = (unit,) if isinstance(unit, str) else unit
+    fallback = None
+    for match in _RANGE_PATTERN.finditer(text):
+        value_range = ValueRange(_to_number(match.group('low')), _to_number(match.group('high')),
+                                 _normalise_unit(match.group('unit') or match.group('low_unit')))
+        if units is None or value_range.unit in units:
+            return value_range
+        if fallback is None and value_range.unit is None:
+            fallback = value_range
+    return fallback
+
+
+# Page source attribute matched by each locator strategy, per platform
+_SOURCE_ATTRIBUTES = {
+    "android": {"id": "resource-id", "accessibility id": "content-desc", "class name": "class"},
+    "ios": {"id": "name", "accessibility id": "name", "class name": "type"},
+}
+
+
+def _source_matcher(locator, platform):
+    """
+    Returns a predicate matching page source nodes for a locator, or None
+    if the locator's strategy cannot be evaluated on the page source.
+    """
+    attribute = _SOURCE_ATTRIBUTES.get(platform, _SOURCE_ATTRIBUTES["android"]).get(locator[0])
+    if attribute is None:
+        return None
+    value = locator[1]
+    return lambda node: node.get(attribute) == value
+
+
+def _node_text(node, platform) -> str:
+    """Displayed text of a page source node, or of its descendants if it has none."""
+    keys = ("label", "value") if platform == "ios" else ("text",)
+    for key in keys:
+        if node.get(key):
+            return node.get(key)
+    texts = (next((child.get(key) for key in keys if child.get(key)), None) for child in node.iter())
+    return " ".join(text for text in texts if text)
 
 
 class BasePage:
     """Base Page Class"""
     
+    # Page name in config/locators.yaml
+    PAGE_NAME = None
+    
     def __init__(self, driver: AppDriver):
         self.driver = driver
+        self.locators = get_locator_registry()
+    
+    @property
+    def platform(self):
+        """The platform the page's locators are resolved for."""
+        return getattr(self.driver, 'platform', 'android')
+    
+    def locator(self, element, **params) -> Locator:
+        """
+        Resolves a locator of this page from the locator registry.
+        
+        Args:
+            element (str): Element name in config/locators.yaml.
+            **params: Values for placeholders in the locator, e.g. text="Beijing".
+            
+        Returns:
+            Locator: The fastest locator for the current platform.
+        """
+        return self.locators.get(self.PAGE_NAME, element, self.platform, **params)
     
     def wait_for_element(self, locator, timeout=None):
         """Waits for an element to appear."""
@@ -26,19 +248,159 @@ class BasePage:
     def get_text(self, locator, timeout=None):
         """Gets the text of an element."""
         return self.driver.get_text(locator, timeout)
+    
+    def collect_rows(self, row, fields: Dict[str, Optional[Locator]], container=None) -> List[Dict[str, str]]:
+        """
+        Reads the fields of every row of a list in one WebDriver command.
+        
+        Fetches the page source once and extracts the field texts of all rows
+        from it, instead of a find and a getText call per field. Locators using
+        id, accessibility id or class name are matched in the source; any other
+        strategy falls back to finding the rows and their fields on the screen.
+        
+        Args:
+            row (Locator): Locator of the row elements.
+            fields (dict): Field name -> locator of the field inside a row, or None
+                for all text of the row.
+            container (Locator): List container; only rows inside it are read.
+            
+        Returns:
+            list: One {field: text} dict per row in screen order, with "" for missing fields.
+        """
+        locators = [row, container] + list(fields.values())
+        matchers = [_source_matcher(locator, self.platform) if locator is not None else None
+                    for locator in locators]
+        if any(matcher is None for matcher, locator in zip(matchers, locators) if locator is not None):
+            return self._collect_rows_from_elements(row, fields, container)
+        
+        import xml.etree.ElementTree as ET
+        
+        row_matcher, container_matcher = matchers[0], matchers[1]
+        field_matchers = dict(zip(fields, matchers[2:]))
+        document = ET.fromstring(self.driver.get_page_source())
+        scope = document
+        if container_matcher is not None:
+            scope = next((node for node in document.iter() if container_matcher(node)), None)
+            if scope is None:
+                # The list may not be on screen yet: wait for it, then read the source again
+                self.wait_for_element(container)
+                document = ET.fromstring(self.driver.get_page_source())
+                scope = next((node for node in document.iter() if container_matcher(node)), document)
+        
+        rows = []
+        for row_node in (node for node in scope.iter() if node is not scope and row_matcher(node)):
+            values = {}
+            for name, matcher in field_matchers.items():
+                if matcher is None:
+                    values[name] = _node_text(row_node, self.platform)
+                    continue
+                field_node = next((node for node in row_node.iter() if matcher(node)), None)
+                values[name] = _node_text(field_node, self.platform) if field_node is not None else ""
+            rows.append(values)
+        return rows
+    
+    def scroll_collect(self, row, fields: Dict[str, Optional[Locator]], container,
+                       key: Callable[[Dict[str, str]], str], limit: Optional[int] = None,
+                       until: Optional[Callable[[Dict[str, str]], bool]] = None,
+                       max_gestures: int = 20, percent: float = 0.9) -> List[Dict[str, str]]:
+        """
+        Reads the rows of a scrolling list, paging down from the current position.
+        
+        Each page is read with collect_rows. A row seen again (same key) fills
+        in the fields that were empty before: rows cut off at the edge of the
+        list are read partially and completed on the next page. Rows with
+        empty fields do not count towards `limit` or `until` until completed;
+        at the end of the list they are returned as read. Stops as soon as
+        `until` matches a row or `limit` complete rows are collected. On Android the scroll gesture reports when the end of the
+        list is reached, so no extra swipe is spent finding it; on iOS the end
+        is the first gesture that shows no new rows.
+        
+        Args:
+            row (Locator): Locator of the row elements.
+            fields (dict): Field name -> locator of the field inside a row (see collect_rows).
+            container (Locator): The scrollable list.
+            key (callable): Row dict -> identity used to drop duplicates.
+            limit (int): Stop after this many rows.
+            until (callable): Stop after the first row for which this returns True.
+            max_gestures (int): Upper bound on scroll gestures.
+            percent (float): Share of the list height scrolled per gesture; below 1
+                so consecutive pages overlap and no row is skipped.
+            
+        Returns:
+            list: The collected row dicts in list order (the matching row last when `until` is given).
+        """
+        list_element = self.wait_for_element(container)
+        rows: Dict[str, Dict[str, str]] = {}
+        complete = 0
+        # A row `until` matched while it still had empty fields
+        pending_match = None
+        
+        def up_to(stop_key):
+            collected = list(rows)
+            return [rows[k] for k in collected[:collected.index(stop_key) + 1]]
+        
+        can_scroll = None
+        for gesture in range(max_gestures + 1):
+            new_rows = 0
+            for values in self.collect_rows(row, fields, container):
+                row_key = key(values)
+                known = rows.get(row_key)
+                if known is None:
+                    known = rows[row_key] = dict(values)
+                else:
+                    filled = [name for name, value in known.items() if not value and values.get(name)]
+                    if not filled:
+                        continue
+                    known.update({name: values[name] for name in filled})
+                new_rows += 1
+                if until is not None and until(known):
+                    pending_match = row_key
+                if not all(known.values()):
+                    continue
+                complete += 1
+                if pending_match == row_key or (limit is not None and complete >= limit):
+                    return up_to(row_key)
+            if can_scroll is False or (gesture and can_scroll is None and not new_rows):
+                break
+            if gesture == max_gestures:
+                break
+            can_scroll = self.driver.scroll(list_element, "down", percent)
+        if pending_match is not None:
+            return up_to(pending_match)
+        return list(rows.values())
+    
+    def _collect_rows_from_elements(self, row, fields, container=None) -> List[Dict[str, str]]:
+        """collect_rows for locators the page source cannot match: one find per row field."""
+        # Row locators such as iOS class chains already name their container, so the
+        # container is only waited for and rows are searched on the whole screen
+        if container is not None:
+            self.wait_for_element(container)
+        rows = []
+        for row_element in self.driver.find_elements(row):
+            values = {}
+            for name, locator in fields.items():
+                if locator is None:
+                    values[name] = row_element.text
+                    continue
+                found = row_element.find_elements(*locator)
+                values[name] = found[0].text if found else ""
+            rows.append(values)
+        return rows
 
 
 class MainPage(BasePage):
     """Main Page"""
     
+    PAGE_NAME = "main"
+    
     # Element Locators
-    SEARCH_BUTTON = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/search_button")
-    LOCATION_BUTTON = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/location_button")
-    MENU_BUTTON = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/menu_button")
-    CURRENT_TEMPERATURE = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/current_temperature")
-    WEATHER_DESCRIPTION = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/weather_description")
-    HUMIDITY_TEXT = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/humidity_text")
-    WIND_SPEED_TEXT = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/wind_speed_text")
+    SEARCH_BUTTON = PageLocator("search_button")
+    LOCATION_BUTTON = PageLocator("location_button")
+    MENU_BUTTON = PageLocator("menu_button")
+    CURRENT_TEMPERATURE = PageLocator("current_temperature")
+    WEATHER_DESCRIPTION = PageLocator("weather_description")
+    HUMIDITY_TEXT = PageLocator("humidity_text")
+    WIND_SPEED_TEXT = PageLocator("wind_speed_text")
     
     def click_search(self):
         """Clicks the search button."""
@@ -52,13 +414,20 @@ class MainPage(BasePage):
         """Clicks the menu button."""
         self.click_element(self.MENU_BUTTON)
     
+    def click_tab(self, tab_name):
+        """Clicks a tab by its displayed name, e.g. "9-Day Forecast"."""
+        self.click_element(self.locator("tab_by_name", text=tab_name))
+    
     def get_current_temperature(self):
         """Gets the current temperature."""
         temp_text = self.get_text(self.CURRENT_TEMPERATURE)
-        # Extract the numeric part
-        import re
-        temp_match = re.search(r'(\d+)', temp_text)
-        return int(temp_match.group(1)) if temp_match else None
+        measurement = parse_measurement(temp_text, unit=TEMPERATURE_UNITS)
+        if measurement is None:
+            return None
+        # Expected ranges are in °C
+        if measurement.unit == '°F':
+            return round((measurement.value - 32) * 5 / 9, 1)
+        return measurement.value
     
     def get_weather_description(self):
         """Gets the weather description."""
@@ -67,26 +436,31 @@ class MainPage(BasePage):
     def get_humidity(self):
         """Gets the humidity."""
         humidity_text = self.get_text(self.HUMIDITY_TEXT)
-        import re
-        humidity_match = re.search(r'(\d+)', humidity_text)
-        return int(humidity_match.group(1)) if humidity_match else None
+        return parse_value(humidity_text, unit='%')
     
     def get_wind_speed(self):
         """Gets the wind speed."""
         wind_text = self.get_text(self.WIND_SPEED_TEXT)
-        import re
-        wind_match = re.search(r'(\d+)', wind_text)
-        return int(wind_match.group(1)) if wind_match else None
+        measurement = parse_measurement(wind_text, unit=WIND_SPEED_UNITS)
+        if measurement is None:
+            return None
+        # Expected ranges are in km/h
+        if measurement.unit == 'm/s':
+            return round(measurement.value * 3.6, 1)
+        return measurement.value
 
 
 class SearchPage(BasePage):
     """Search Page"""
     
+    PAGE_NAME = "search"
+    
     # Element Locators
-    SEARCH_INPUT = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/search_input")
-    SEARCH_RESULTS = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/search_results")
-    CITY_ITEM = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/city_item")
-    BACK_BUTTON = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/back_button")
+    SEARCH_INPUT = PageLocator("search_input")
+    SEARCH_RESULTS = PageLocator("search_results")
+    CITY_ITEM = PageLocator("city_item")
+    CITY_ITEM_NAME = PageLocator("city_item_name")
+    BACK_BUTTON = PageLocator("back_button")
     
     def search_city(self, city_name):
         """Searches for a city."""
@@ -94,9 +468,18 @@ class SearchPage(BasePage):
     
     def select_city(self, city_name):
         """Selects a city."""
-        # This needs to locate the element based on the actual city name
-        city_locator = (AppiumBy.XPATH, f"//android.widget.TextView[@text='{city_name}']")
-        self.click_element(city_locator)
+        self.click_element(self.locator("city_by_name", text=city_name))
+    
+    def get_results(self, limit=None) -> List[SearchResult]:
+        """
+        Gets the search results, scrolling through the list one page per read.
+        
+        Args:
+            limit (int): Stop after this many results (default: all).
+        """
+        rows = self.scroll_collect(self.CITY_ITEM, {"name": self.CITY_ITEM_NAME}, self.SEARCH_RESULTS,
+                                   key=lambda row: row["name"], limit=limit)
+        return [SearchResult(row["name"]) for row in rows]
     
     def click_back(self):
         """Clicks the back button."""
@@ -106,11 +489,13 @@ class SearchPage(BasePage):
 class MenuPage(BasePage):
     """Menu Page"""
     
+    PAGE_NAME = "menu"
+    
     # Element Locators
-    SETTINGS_BUTTON = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/settings_button")
-    ABOUT_BUTTON = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/about_button")
-    HELP_BUTTON = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/help_button")
-    CLOSE_BUTTON = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/close_button")
+    SETTINGS_BUTTON = PageLocator("settings_button")
+    ABOUT_BUTTON = PageLocator("about_button")
+    HELP_BUTTON = PageLocator("help_button")
+    CLOSE_BUTTON = PageLocator("close_button")
     
     def click_settings(self):
         """Clicks the settings button."""
@@ -132,11 +517,13 @@ class MenuPage(BasePage):
 class SettingsPage(BasePage):
     """Settings Page"""
     
+    PAGE_NAME = "settings"
+    
     # Element Locators
-    TEMPERATURE_UNIT_TOGGLE = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/temperature_unit_toggle")
-    NOTIFICATION_TOGGLE = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/notification_toggle")
-    AUTO_REFRESH_TOGGLE = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/auto_refresh_toggle")
-    LANGUAGE_SELECTOR = (AppiumBy.ID, "com.weather.forecast.weatherlive:id/language_selector")
+    TEMPERATURE_UNIT_TOGGLE = PageLocator("temperature_unit_toggle")
+    NOTIFICATION_TOGGLE = PageLocator("notification_toggle")
+    AUTO_REFRESH_TOGGLE = PageLocator("auto_refresh_toggle")
+    LANGUAGE_SELECTOR = PageLocator("language_selector")
     
     def toggle_temperature_unit(self):
         """Toggles the temperature unit."""
@@ -153,5 +540,61 @@ class SettingsPage(BasePage):
     def select_language(self, language):
         """Selects a language."""
         self.click_element(self.LANGUAGE_SELECTOR)
-        language_locator = (AppiumBy.XPATH, f"//android.widget.TextView[@text='{language}']")
-        self.click_element(language_locator) 
\ No newline at end of file
+        self.click_element(self.locator("language_by_name", text=language)) 
+
+
+class ForecastPage(BasePage):
+    """9-Day Forecast Page"""
+    
+    PAGE_NAME = "forecast"
+    
+    # Element Locators
+    FORECAST_LIST = PageLocator("forecast_list")
+    FORECAST_ITEM = PageLocator("forecast_item")
+    FORECAST_DATE = PageLocator("forecast_date")
+    FORECAST_WEEKDAY = PageLocator("forecast_weekday")
+    FORECAST_WEATHER = PageLocator("forecast_weather")
+    FORECAST_TEMPERATURE = PageLocator("forecast_temperature")
+    FORECAST_HUMIDITY = PageLocator("forecast_humidity")
+    BACK_BUTTON = PageLocator("back_button")
+    
+    def is_displayed(self, timeout=None):
+        """Checks that the forecast list is shown."""
+        return self.driver.is_element_present(self.FORECAST_LIST, timeout)
+    
+    def _forecast_fields(self):
+        return {
+            "date": self.FORECAST_DATE,
+            "weekday": self.FORECAST_WEEKDAY,
+            "weather": self.FORECAST_WEATHER,
+            "temperature": self.FORECAST_TEMPERATURE,
+            "humidity": self.FORECAST_HUMIDITY,
+        }
+    
+    @staticmethod
+    def _to_forecast_day(row) -> ForecastDay:
+        return ForecastDay(date=row["date"], weekday=row["weekday"], weather=row["weather"],
+                           temperature=parse_range(row["temperature"], unit=TEMPERATURE_UNITS),
+                           humidity=parse_range(row["humidity"], unit='%'))
+    
+    def get_forecast_days(self, limit=None) -> List[ForecastDay]:
+        """
+        Gets the forecast days with their temperature and humidity ranges,
+        scrolling through the list one page per read.
+        
+        Args:
+            limit (int): Stop after this many days (default: the whole list).
+        """
+        rows = self.scroll_collect(self.FORECAST_ITEM, self._forecast_fields(), self.FORECAST_LIST,
+                                   key=lambda row: row["date"], limit=limit)
+        return [self._to_forecast_day(row) for row in rows]
+    
+    def find_forecast_day(self, date) -> Optional[ForecastDay]:
+        """Scrolls to the forecast day displayed as `date` (e.g. "24 Oct"), or returns None."""
+        rows = self.scroll_collect(self.FORECAST_ITEM, self._forecast_fields(), self.FORECAST_LIST,
+                                   key=lambda row: row["date"], until=lambda row: row["date"] == date)
+        return self._to_forecast_day(rows[-1]) if rows and rows[-1]["date"] == date else None
+    
+    def click_back(self):
+        """Clicks the back button."""
+        self.click_element(self.BACK_BUTTON)
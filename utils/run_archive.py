@@ -0,0 +1,453 @@
+"""
+Run Archive.
+
+Keeps the scenario results of every run in one SQLite file
+(reports/run_archive.sqlite) instead of thousands of files under reports/,
+so history questions are answered with indexed queries:
+
+    python -m utils.run_archive ingest                 # archive new reports/events_*.jsonl
+    python -m utils.run_archive runs                   # latest runs
+    python -m utils.run_archive trend "9-Day Forecast" --days 30
+    python -m utils.run_archive flaky --days 30
+    python -m utils.run_archive durations --days 7
+    python -m utils.run_archive prune --older-than 7   # delete raw files already archived
+
+Runs are read from the JSONL event streams the behave hooks write (see
+utils/events.py); run_tests.py archives each run when it finishes. Every
+events file is archived once, so ingesting again is harmless.
+"""
+import argparse
+import glob
+import json
+import os
+import socket
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.failure_manifest import flakiness_score
+
+
+DEFAULT_ARCHIVE_PATH = os.path.join("reports", "run_archive.sqlite")
+EVENTS_PATTERN = os.path.join("reports", "events_*.jsonl")
+
+# Events files without a run_end are archived once they have not changed for this long
+INCOMPLETE_AFTER = 600
+
+# Raw report files that prune may delete once they are older than the cutoff;
+# events files are only deleted once they are archived
+RAW_PATTERNS = (
+    "api_result_*.json",
+    "api_test_*.json",
+    "command_metrics_*.json",
+    "command_metrics_*.prom",
+    "test_report_*.txt",
+    "rerun_*_failed_scenarios.json",
+    "worker_*.txt",
+    "workers",
+    "allure-results",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    host TEXT,
+    platform TEXT,
+    started REAL NOT NULL,
+    duration REAL,
+    scenarios INTEGER NOT NULL,
+    failed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY,
+    location TEXT NOT NULL,
+    name TEXT NOT NULL,
+    feature TEXT,
+    UNIQUE (location, name)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    scenario_id INTEGER NOT NULL REFERENCES scenarios (id),
+    status TEXT NOT NULL,
+    started REAL NOT NULL,
+    day TEXT NOT NULL,
+    duration REAL,
+    commands INTEGER,
+    device TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS results_scenario ON results (scenario_id, started);
+CREATE INDEX IF NOT EXISTS results_status ON results (status, started);
+CREATE INDEX IF NOT EXISTS results_day ON results (day);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+"""
+
+
+def percentile(values: List[float], q: float) -> float:
+    """The q-th percentile (0-100) of sorted values, linearly interpolated."""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def read_run(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Reads one run from a JSONL events file.
+
+    Returns:
+        dict: started/duration/platform and the scenario results, or None if
+            the file holds no scenarios.
+    """
+    run = {"started": None, "ended": None, "platform": None, "complete": False}
+    results, failed_steps = [], {}
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # Torn last line of a run that was killed
+            kind = event.get("event")
+            if kind == "run_start":
+                run["started"] = event.get("wall")
+                run["platform"] = event.get("platform")
+            elif kind == "run_end":
+                run["ended"] = event.get("wall")
+                run["complete"] = True
+            elif kind == "step_end" and event.get("status") == "failed":
+                # Keyed by process, as parallel behave processes share the file
+                error = event.get("error")
+                failed_steps.setdefault(event.get("pid"), f"{event.get('name')}: {error}" if error else event.get("name"))
+            elif kind == "scenario_end":
+                results.append({
+                    "location": event.get("location", ""),
+                    "name": event.get("name", ""),
+                    "feature": event.get("feature"),
+                    "status": event.get("status") or "untested",
+                    "started": event.get("wall", 0) - (event.get("duration") or 0),
+                    "duration": event.get("duration"),
+                    "commands": event.get("commands"),
+                    "device": event.get("device"),
+                    "error": failed_steps.pop(event.get("pid"), None) if event.get("status") == "failed" else None,
+                })
+    if not results:
+        return None
+    run["started"] = run["started"] or min(result["started"] for result in results)
+    run["ended"] = run["ended"] or max(result["started"] + (result["duration"] or 0) for result in results)
+    run["results"] = results
+    return run
+
+
+class RunArchive:
+    """SQLite store of archived runs and their scenario results."""
+
+    def __init__(self, path: str = DEFAULT_ARCHIVE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def is_archived(self, path: str) -> bool:
+        return self.db.execute("SELECT 1 FROM runs WHERE source = ?",
+                               (os.path.basename(path),)).fetchone() is not None
+
+    def ingest(self, path: str, force: bool = False) -> Optional[int]:
+        """
+        Archives the run in an events file.
+
+        Args:
+            path (str): JSONL events file written by the behave hooks.
+            force (bool): Archive a file without run_end even if it may still be written.
+
+        Returns:
+            int: Number of scenario results archived, or None if the file was
+                skipped (already archived, still being written, or empty).
+        """
+        if self.is_archived(path):
+            return None
+        run = read_run(path)
+        if run is None:
+            return None
+        if not run["complete"] and not force and time.time() - os.path.getmtime(path) < INCOMPLETE_AFTER:
+            return None
+
+        results = run["results"]
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (source, host, platform, started, duration, scenarios, failed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (os.path.basename(path), socket.gethostname(), run["platform"], run["started"],
+                 run["ended"] - run["started"], len(results),
+                 sum(result["status"] == "failed" for result in results)))
+            run_id = cursor.lastrowid
+            rows = []
+            for result in results:
+                self.db.execute("INSERT OR IGNORE INTO scenarios (location, name, feature) VALUES (?, ?, ?)",
+                                (result["location"], result["name"], result["feature"]))
+                scenario_id = self.db.execute("SELECT id FROM scenarios WHERE location = ? AND name = ?",
+                                              (result["location"], result["name"])).fetchone()[0]
+                day = datetime.fromtimestamp(result["started"]).strftime("%Y-%m-%d")
+                rows.append((run_id, scenario_id, result["status"], result["started"], day, result["duration"],
+                             result["commands"], result["device"], result["error"]))
+            self.db.executemany(
+                "INSERT INTO results (run_id, scenario_id, status, started, day, duration, commands, device, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(results)
+
+    def ingest_all(self, paths: Optional[Iterable[str]] = None, force: bool = False) -> Dict[str, int]:
+        """Archives every events file not archived yet (default: reports/events_*.jsonl)."""
+        archived = {}
+        for path in sorted(paths if paths is not None else glob.glob(EVENTS_PATTERN)):
+            count = self.ingest(path, force=force)
+            if count is not None:
+                archived[path] = count
+        return archived
+
+    def _since(self, days: float) -> float:
+        return (datetime.now() - timedelta(days=days)).timestamp()
+
+    def runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """The latest runs, newest first."""
+        rows = self.db.execute(
+            "SELECT id, source, platform, started, duration, scenarios, failed FROM runs "
+            "ORDER BY started DESC LIMIT ?", (limit,)).fetchall()
+        return [{"id": row[0], "source": row[1], "platform": row[2],
+                 "started": datetime.fromtimestamp(row[3]).isoformat(timespec="seconds"),
+                 "duration": round(row[4] or 0, 2), "scenarios": row[5], "failed": row[6]} for row in rows]
+
+    def _matching_scenarios(self, scenario: Optional[str]) -> Optional[List[int]]:
+        """Ids of scenarios whose name or location contains the text, or None for all."""
+        if not scenario:
+            return None
+        pattern = f"%{scenario}%"
+        return [row[0] for row in self.db.execute(
+            "SELECT id FROM scenarios WHERE name LIKE ? OR location LIKE ?", (pattern, pattern))]
+
+    def trend(self, scenario: Optional[str] = None, days: float = 30) -> List[Dict[str, Any]]:
+        """
+        Per-day outcomes and durations of matching scenarios (all if scenario is None).
+
+        Returns:
+            list: One dict per day: runs, passed, failed, pass rate and median/p95 duration.
+        """
+        ids = self._matching_scenarios(scenario)
+        if ids == []:
+            return []
+        query = "SELECT day, status, duration FROM results WHERE started >= ?"
+        params: List[Any] = [self._since(days)]
+        if ids is not None:
+            query += f" AND scenario_id IN ({','.join('?' * len(ids))})"
+            params += ids
+        query += " ORDER BY day"
+        days_seen: Dict[str, Dict[str, Any]] = {}
+        for day, status, duration in self.db.execute(query, params):
+            entry = days_seen.setdefault(day, {"day": day, "runs": 0, "passed": 0, "failed": 0, "durations": []})
+            entry["runs"] += 1
+            entry[status] = entry.get(status, 0) + 1
+            if duration is not None:
+                entry["durations"].append(duration)
+        trend = []
+        for entry in days_seen.values():
+            durations = sorted(entry.pop("durations"))
+            executed = entry["passed"] + entry["failed"]
+            entry["pass_rate"] = round(entry["passed"] / executed, 3) if executed else None
+            entry["p50"] = round(percentile(durations, 50), 3)
+            entry["p95"] = round(percentile(durations, 95), 3)
+            trend.append(entry)
+        return trend
+
+    def flaky(self, days: float = 30, min_runs: int = 3) -> List[Dict[str, Any]]:
+        """
+        Scenarios that both passed and failed, most flaky first.
+
+        Flakiness is the failure_manifest score (1.0 when passes and failures
+        are even); flips counts outcome changes between consecutive runs.
+        """
+        rows = self.db.execute(
+            "SELECT r.scenario_id, s.location, s.name, r.status FROM results r "
+            "JOIN scenarios s ON s.id = r.scenario_id "
+            "WHERE r.started >= ? AND r.status IN ('passed', 'failed') "
+            "ORDER BY r.scenario_id, r.started", (self._since(days),))
+        history: Dict[int, Dict[str, Any]] = {}
+        for scenario_id, location, name, status in rows:
+            entry = history.setdefault(scenario_id, {"location": location, "scenario": name, "runs": 0,
+                                                     "failures": 0, "flips": 0, "last": None})
+            entry["runs"] += 1
+            entry["failures"] += status == "failed"
+            if entry["last"] is not None and entry["last"] != status:
+                entry["flips"] += 1
+            entry["last"] = status
+        flaky = []
+        for entry in history.values():
+            del entry["last"]
+            if entry["runs"] < min_runs or entry["failures"] in (0, entry["runs"]):
+                continue
+            entry["flakiness"] = flakiness_score(entry["runs"], entry["failures"])
+            flaky.append(entry)
+        return sorted(flaky, key=lambda entry: (-entry["flakiness"], -entry["flips"]))
+
+    def durations(self, scenario: Optional[str] = None, days: float = 30,
+                  statuses: Iterable[str] = ("passed", "failed")) -> List[Dict[str, Any]]:
+        """Duration percentiles per scenario, slowest p95 first."""
+        ids = self._matching_scenarios(scenario)
+        if ids == []:
+            return []
+        statuses = list(statuses)
+        query = (f"SELECT r.scenario_id, s.location, s.name, r.duration FROM results r "
+                 f"JOIN scenarios s ON s.id = r.scenario_id "
+                 f"WHERE r.started >= ? AND r.duration IS NOT NULL "
+                 f"AND r.status IN ({','.join('?' * len(statuses))})")
+        params: List[Any] = [self._since(days)] + statuses
+        if ids is not None:
+            query += f" AND r.scenario_id IN ({','.join('?' * len(ids))})"
+            params += ids
+        query += " ORDER BY r.scenario_id, r.duration"
+        grouped: Dict[int, Dict[str, Any]] = {}
+        for scenario_id, location, name, duration in self.db.execute(query, params):
+            grouped.setdefault(scenario_id, {"location": location, "scenario": name, "values": []})["values"].append(duration)
+        result = []
+        for entry in grouped.values():
+            values = entry.pop("values")
+            entry.update({"runs": len(values), **{f"p{q}": round(percentile(values, q), 3) for q in (50, 90, 95, 99)},
+                          "max": round(values[-1], 3)})
+            result.append(entry)
+        return sorted(result, key=lambda entry: -entry["p95"])
+
+    def prune(self, older_than: float = 7, reports_dir: str = "reports", dry_run: bool = False) -> List[str]:
+        """
+        Deletes raw report files that the archive makes redundant.
+
+        Archived events files are deleted whatever their age; the other raw
+        reports (see RAW_PATTERNS) once they are older than older_than days.
+
+        Returns:
+            list: The deleted (or, with dry_run, deletable) paths.
+        """
+        cutoff = time.time() - older_than * 86400
+        removed = []
+        for path in glob.glob(os.path.join(reports_dir, "events_*.jsonl")):
+            if self.is_archived(path):
+                removed.append(path)
+        for pattern in RAW_PATTERNS:
+            for path in glob.glob(os.path.join(reports_dir, pattern)):
+                if os.path.isdir(path):
+                    removed.extend(_old_files(path, cutoff))
+                elif os.path.getmtime(path) < cutoff:
+                    removed.append(path)
+        if not dry_run:
+            for path in removed:
+                os.remove(path)
+            for pattern in RAW_PATTERNS:
+                for path in glob.glob(os.path.join(reports_dir, pattern)):
+                    if os.path.isdir(path):
+                        _remove_empty_dirs(path)
+        return removed
+
+
+def _old_files(directory: str, cutoff: float) -> List[str]:
+    return [os.path.join(root, name) for root, _, files in os.walk(directory) for name in files
+            if os.path.getmtime(os.path.join(root, name)) < cutoff]
+
+
+def _remove_empty_dirs(directory: str):
+    for root, _, _ in os.walk(directory, topdown=False):
+        if not os.listdir(root):
+            os.rmdir(root)
+
+
+def _print_table(rows: List[Dict[str, Any]], columns: List[str]):
+    if not rows:
+        print("No results.")
+        return
+    widths = {column: max(len(column), *(len(str(row.get(column, ""))) for row in rows)) for column in columns}
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print("  ".join(str(row.get(column, "")).ljust(widths[column]) for column in columns))
+
+
+def main(argv=None):
+    """Archives runs and answers history queries."""
+    parser = argparse.ArgumentParser(description="Scenario run archive")
+    parser.add_argument("--db", default=DEFAULT_ARCHIVE_PATH, help=f"Archive file (default: {DEFAULT_ARCHIVE_PATH})")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Archive events files not archived yet")
+    ingest.add_argument("paths", nargs="*", help="Events files (default: reports/events_*.jsonl)")
+    ingest.add_argument("--force", action="store_true", help="Also archive runs that have no run_end yet")
+
+    runs = commands.add_parser("runs", help="Latest runs")
+    runs.add_argument("--limit", type=int, default=20)
+
+    trend = commands.add_parser("trend", help="Per-day pass rate and duration of scenarios")
+    trend.add_argument("scenario", nargs="?", help="Text in the scenario name or location (default: all)")
+    trend.add_argument("--days", type=float, default=30)
+
+    flaky = commands.add_parser("flaky", help="Scenarios that both passed and failed")
+    flaky.add_argument("--days", type=float, default=30)
+    flaky.add_argument("--min-runs", type=int, default=3)
+
+    durations = commands.add_parser("durations", help="Duration percentiles per scenario")
+    durations.add_argument("scenario", nargs="?", help="Text in the scenario name or location (default: all)")
+    durations.add_argument("--days", type=float, default=30)
+
+    prune = commands.add_parser("prune", help="Delete raw report files made redundant by the archive")
+    prune.add_argument("--older-than", type=float, default=7, metavar="DAYS",
+                       help="Age of raw reports to delete (archived events files go regardless)")
+    prune.add_argument("--dry-run", action="store_true", help="Only list what would be deleted")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with RunArchive(args.db) as archive:
+        if args.command == "ingest":
+            archived = archive.ingest_all(args.paths or None, force=args.force)
+            for path, count in archived.items():
+                print(f"Archived {count} scenario results from {path}")
+            print(f"{len(archived)} runs archived into {args.db}")
+            return 0
+        if args.command == "prune":
+            archive.ingest_all()
+            removed = archive.prune(args.older_than, dry_run=args.dry_run)
+            for path in removed:
+                print(f"{'Would delete' if args.dry_run else 'Deleted'} {path}")
+            print(f"{len(removed)} raw files {'to prune' if args.dry_run else 'pruned'}")
+            return 0
+
+        if args.command == "runs":
+            rows, columns = archive.runs(args.limit), ["id", "started", "platform", "scenarios", "failed", "duration"]
+        elif args.command == "trend":
+            rows, columns = archive.trend(args.scenario, args.days), ["day", "runs", "passed", "failed",
+                                                                       "pass_rate", "p50", "p95"]
+        elif args.command == "flaky":
+            rows, columns = archive.flaky(args.days, args.min_runs), ["location", "scenario", "runs", "failures",
+                                                                       "flips", "flakiness"]
+        else:
+            rows, columns = archive.durations(args.scenario, args.days), ["location", "scenario", "runs", "p50",
+                                                                          "p90", "p95", "p99", "max"]
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+    else:
+        _print_table(rows, columns)
+        print(f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,7 +4,40 @@ Test Data Management Class.
 import yaml
 import os
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from utils.geo_index import CitySpatialIndex
+
+
+_numpy = None
+
+
+def _load_numpy():
+    """
+    Imports NumPy on first use; returns None if it is not installed.
+    
+    NumPy is optional and only needed for batch validation, so importing it
+    is deferred to keep behave startup fast.
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:  # Batch validation falls back to pure Python
+            _numpy = False
+    return _numpy or None
+
+
+class ValidationResult(NamedTuple):
+    """Result of a batch validation."""
+    mask: Any                 # Boolean mask, True where the value is valid
+    invalid_indices: List[int]
+
+    @property
+    def all_valid(self) -> bool:
+        """True if every value passed validation."""
+        return not self.invalid_indices
 
 
 class TestDataManager:
@@ -22,6 +55,19 @@ class TestDataManager:
         self.weather_types = self.weather_data.get("weather_types", {})
         self.test_users = self.weather_data.get("test_users", {})
         self.expected_weather = self.weather_data.get("expected_weather", {})
+        self.city_index = CitySpatialIndex(self.cities)
+        self._cache_ranges()
+    
+    def _cache_ranges(self):
+        """Resolves the expected weather ranges once so validation does no dict lookups."""
+        self._temperature_bounds = self._range_bounds("temperature_range", -50, 60)
+        self._humidity_bounds = self._range_bounds("humidity_range", 0, 100)
+        self._wind_speed_bounds = self._range_bounds("wind_speed_range", 0, 100)
+    
+    def _range_bounds(self, range_key: str, default_min: float, default_max: float) -> Tuple[float, float]:
+        """Gets the (min, max) bounds of an expected weather range."""
+        value_range = self.expected_weather.get(range_key, {})
+        return value_range.get("min", default_min), value_range.get("max", default_max)
     
     def _load_yaml_file(self, filename: str) -> Dict[str, Any]:
         """
@@ -66,6 +112,35 @@ class TestDataManager:
         city_data = self.get_city_data(city_key)
         return city_data.get("coordinates", {})
     
+    def find_nearest_city(self, latitude: float, longitude: float) -> Optional[str]:
+        """
+        Finds the configured city closest to a location.
+        
+        Args:
+            latitude (float): Latitude in degrees.
+            longitude (float): Longitude in degrees.
+            
+        Returns:
+            str: The city key, or None if no city has coordinates.
+        """
+        nearest = self.city_index.nearest(latitude, longitude)
+        return nearest[0] if nearest else None
+    
+    def find_cities_within(self, latitude: float, longitude: float,
+                           radius_km: float) -> List[Tuple[str, float]]:
+        """
+        Finds all configured cities within a radius of a location.
+        
+        Args:
+            latitude (float): Latitude in degrees.
+            longitude (float): Longitude in degrees.
+            radius_km (float): Search radius in kilometres.
+            
+        Returns:
+            List: (city_key, distance_km) tuples, closest first.
+        """
+        return self.city_index.within(latitude, longitude, radius_km)
+    
     def get_weather_type(self, weather_key: str) -> str:
         """Gets a weather type."""
         return self.weather_types.get(weather_key, "")
@@ -96,18 +171,58 @@ class TestDataManager:
         Returns:
             bool: True if within range, False otherwise.
         """
-        temp_range = self.expected_weather.get("temperature_range", {})
-        min_temp = temp_range.get("min", -50)
-        max_temp = temp_range.get("max", 60)
+        min_temp, max_temp = self._temperature_bounds
         return min_temp <= temperature <= max_temp
     
     def validate_humidity(self, humidity: float) -> bool:
         """Validates if the humidity is within a reasonable range."""
-        humidity_range = self.expected_weather.get("humidity_range", {})
-        min_humidity = humidity_range.get("min", 0)
-        max_humidity = humidity_range.get("max", 100)
+        min_humidity, max_humidity = self._humidity_bounds
         return min_humidity <= humidity <= max_humidity
     
+    def validate_wind_speed(self, wind_speed: float) -> bool:
+        """Validates if the wind speed is within a reasonable range."""
+        min_wind, max_wind = self._wind_speed_bounds
+        return min_wind <= wind_speed <= max_wind
+    
+    def validate_temperatures(self, temperatures: Sequence[float]) -> ValidationResult:
+        """
+        Validates many temperature values in one call.
+        
+        Args:
+            temperatures (Sequence[float]): The temperature values, e.g. all
+                forecast days or a historical series. None counts as invalid.
+            
+        Returns:
+            ValidationResult: Boolean mask and the indices of invalid values.
+        """
+        return self._validate_batch(temperatures, self._temperature_bounds)
+    
+    def validate_humidities(self, humidities: Sequence[float]) -> ValidationResult:
+        """Validates many humidity values in one call."""
+        return self._validate_batch(humidities, self._humidity_bounds)
+    
+    def validate_wind_speeds(self, wind_speeds: Sequence[float]) -> ValidationResult:
+        """Validates many wind speed values in one call."""
+        return self._validate_batch(wind_speeds, self._wind_speed_bounds)
+    
+    @staticmethod
+    def _validate_batch(values: Sequence[float], bounds: Tuple[float, float]) -> ValidationResult:
+        """
+        Checks values against (min, max) bounds.
+        
+        Uses a NumPy mask when NumPy is installed, otherwise a list of booleans.
+        """
+        low, high = bounds
+        np = _load_numpy()
+        if np is not None:
+            array = np.asarray(values, dtype=float)
+            # NaN (including converted None) compares False and is reported invalid
+            mask = (array >= low) & (array <= high)
+            return ValidationResult(mask, np.flatnonzero(~mask).tolist())
+        
+        mask = [value is not None and low <= value <= high for value in values]
+        return ValidationResult(mask, [i for i, valid in enumerate(mask) if not valid])
+    
     def get_all_cities(self) -> Dict[str, Dict[str, Any]]:
         """Gets all city data."""
         return self.cities
@@ -0,0 +1,420 @@
+"""
+Distributed Scenario Work Queue.
+
+Spreads scenarios over worker processes on any number of hosts without an
+external broker. The coordinator (run_tests.py --coordinator) serves the
+scenario queue over HTTP; workers (run_tests.py --worker URL) lease one
+scenario at a time, run it and post the result back. Workers pull work as
+soon as they are free, so faster nodes run more scenarios.
+
+A lease is valid for lease_timeout seconds and is renewed by the worker's
+heartbeats. When a worker crashes or loses the network its heartbeats stop,
+the lease expires and the scenario goes back to the front of the queue, up
+to max_attempts times. A worker that asks for new work while still holding
+a lease has restarted, so its old lease is requeued straight away. This
+only applies to workers restarted under the same --worker-id (as the
+coordinator's --local-workers are); the default id includes the pid, so
+other restarted workers get their old lease back only when it expires.
+
+Endpoints:
+    POST /lease      {"worker": id}  -> {"lease", "location", "attempt", "run"},
+                                        {"wait": seconds} or {"done": true}
+    POST /heartbeat  {"worker": id}  -> {"leases": n}
+    POST /result     {"lease": id, "result": {...}} -> {"accepted": bool}
+    GET  /status     queue counts, per-worker statistics and results
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+from flask import Flask, jsonify, request
+
+from utils.mock_server import BackgroundServer
+
+
+DEFAULT_PORT = 8765
+
+# Seconds a lease stays valid without a heartbeat
+LEASE_TIMEOUT = 60.0
+
+# Seconds between worker heartbeats; well inside LEASE_TIMEOUT
+HEARTBEAT_INTERVAL = 10.0
+
+# Seconds an idle worker waits before asking again while other workers finish
+RETRY_AFTER = 1.0
+
+
+def default_worker_id() -> str:
+    """Worker name that is unique across hosts: <hostname>-<pid>."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class ScenarioQueue:
+    """
+    Scenario locations leased to workers, with expiry and requeueing.
+
+    Thread-safe: the HTTP handlers and the reaper call it concurrently.
+    """
+
+    def __init__(self, locations: Iterable[str], lease_timeout: float = LEASE_TIMEOUT,
+                 max_attempts: int = 2, run: Optional[Dict[str, Any]] = None):
+        """
+        Initializes the queue.
+
+        Args:
+            locations (iterable): Scenario locations ("path:line") in run order.
+            lease_timeout (float): Seconds a lease stays valid without a heartbeat.
+            max_attempts (int): Times a scenario is handed out before it is given up on.
+            run (dict): Run options sent with every lease, e.g. {"platform": "ios"}.
+        """
+        self.locations = list(dict.fromkeys(locations))
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.run = run or {}
+        self.attempts: Counter = Counter()
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.workers: Dict[str, Dict[str, Any]] = {}
+        self.requeued: List[Dict[str, Any]] = []
+        self._pending = deque(self.locations)
+        self._leases: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._check_finished()
+
+    @property
+    def done(self) -> bool:
+        """Whether every scenario has a result."""
+        return self._finished.is_set()
+
+    def lease(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Hands the next scenario to a worker.
+
+        Returns:
+            dict: lease id, location, attempt number and run options, or None if nothing is pending.
+        """
+        with self._lock:
+            self._reap()
+            self._touch(worker)
+            # Workers run one scenario at a time: asking again means the previous one was lost
+            # (a worker restarted under a fixed --worker-id; default ids change with the pid)
+            for lease_id in [lease_id for lease_id, lease in self._leases.items() if lease["worker"] == worker]:
+                self._requeue(lease_id, "worker restarted")
+            if not self._pending:
+                return None
+            location = self._pending.popleft()
+            self.attempts[location] += 1
+            lease_id = uuid.uuid4().hex
+            self._leases[lease_id] = {
+                "location": location,
+                "worker": worker,
+                "attempt": self.attempts[location],
+                "started": time.monotonic(),
+                "expires": time.monotonic() + self.lease_timeout,
+            }
+            return {"lease": lease_id, "location": location, "attempt": self.attempts[location], "run": self.run}
+
+    def heartbeat(self, worker: str) -> int:
+        """
+        Renews a worker's leases.
+
+        Returns:
+            int: Number of leases the worker holds.
+        """
+        with self._lock:
+            self._touch(worker)
+            expires = time.monotonic() + self.lease_timeout
+            leases = [lease for lease in self._leases.values() if lease["worker"] == worker]
+            for lease in leases:
+                lease["expires"] = expires
+            return len(leases)
+
+    def complete(self, lease_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Records the result of a leased scenario.
+
+        Results for expired or requeued leases are dropped; the scenario's
+        new lease produces the result that counts.
+
+        Args:
+            lease_id (str): The lease the worker was given.
+            result (dict): At least "status" ("passed", "failed", "skipped" or "error").
+
+        Returns:
+            bool: Whether the result was accepted.
+        """
+        with self._lock:
+            lease = self._leases.pop(lease_id, None)
+            if lease is None:
+                return False
+            worker = self._touch(lease["worker"])
+            duration = time.monotonic() - lease["started"]
+            worker["completed"] += 1
+            worker["busy_seconds"] += duration
+            if result.get("status") not in ("passed", "skipped"):
+                worker["failed"] += 1
+            self.results[lease["location"]] = dict(result, location=lease["location"], worker=lease["worker"],
+                                                   attempt=lease["attempt"],
+                                                   duration=result.get("duration", round(duration, 3)))
+            self._check_finished()
+            return True
+
+    def reap(self) -> List[str]:
+        """
+        Requeues scenarios whose leases have expired.
+
+        Returns:
+            list: The locations that were requeued or given up on.
+        """
+        with self._lock:
+            return self._reap()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every scenario has a result; returns False on timeout."""
+        return self._finished.wait(timeout)
+
+    def ordered_results(self) -> List[Dict[str, Any]]:
+        """Results in the original scenario order."""
+        with self._lock:
+            return [self.results[location] for location in self.locations if location in self.results]
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            statuses = Counter(result["status"] for result in self.results.values())
+            return {
+                "total": len(self.locations),
+                "pending": len(self._pending),
+                "leased": len(self._leases),
+                "finished": len(self.results),
+                "done": self.done,
+                "statuses": dict(statuses),
+                "requeued": list(self.requeued),
+                "workers": {name: dict(stats, busy_seconds=round(stats["busy_seconds"], 3))
+                            for name, stats in self.workers.items()},
+                "leases": [{"location": lease["location"], "worker": lease["worker"], "attempt": lease["attempt"]}
+                           for lease in self._leases.values()],
+            }
+
+    def _touch(self, worker: str) -> Dict[str, Any]:
+        stats = self.workers.get(worker)
+        if stats is None:
+            stats = self.workers[worker] = {"completed": 0, "failed": 0, "lost": 0, "busy_seconds": 0.0}
+        stats["last_seen"] = time.time()
+        return stats
+
+    def _reap(self) -> List[str]:
+        now = time.monotonic()
+        expired = [lease_id for lease_id, lease in self._leases.items() if lease["expires"] <= now]
+        return [self._requeue(lease_id, "lease expired") for lease_id in expired]
+
+    def _requeue(self, lease_id: str, reason: str) -> str:
+        """Takes a lease back: the scenario is retried first, or fails once out of attempts."""
+        lease = self._leases.pop(lease_id)
+        location = lease["location"]
+        self._touch(lease["worker"])["lost"] += 1
+        self.requeued.append({"location": location, "worker": lease["worker"], "reason": reason})
+        if self.attempts[location] < self.max_attempts:
+            self._pending.appendleft(location)
+        else:
+            self.results[location] = {"location": location, "status": "error", "worker": lease["worker"],
+                                      "attempt": lease["attempt"], "duration": 0.0,
+                                      "error": f"{reason} after {lease['attempt']} attempts"}
+            self._check_finished()
+        return location
+
+    def _check_finished(self):
+        if len(self.results) == len(self.locations):
+            self._finished.set()
+
+
+def create_app(queue: ScenarioQueue) -> Flask:
+    """
+    Creates the coordinator's Flask app.
+
+    Args:
+        queue (ScenarioQueue): The queue to serve.
+    """
+    app = Flask(__name__)
+    app.config["WORK_QUEUE"] = queue
+
+    def worker_name():
+        body = request.get_json(force=True, silent=True) or {}
+        return body.get("worker")
+
+    @app.post("/lease")
+    def lease():
+        worker = worker_name()
+        if not worker:
+            return jsonify({"error": "worker is required"}), 400
+        leased = queue.lease(worker)
+        if leased:
+            return jsonify(leased)
+        if queue.done:
+            return jsonify({"done": True})
+        return jsonify({"wait": RETRY_AFTER})
+
+    @app.post("/heartbeat")
+    def heartbeat():
+        worker = worker_name()
+        if not worker:
+            return jsonify({"error": "worker is required"}), 400
+        return jsonify({"leases": queue.heartbeat(worker)})
+
+    @app.post("/result")
+    def result():
+        body = request.get_json(force=True, silent=True) or {}
+        if not body.get("lease") or not isinstance(body.get("result"), dict):
+            return jsonify({"error": "lease and result are required"}), 400
+        return jsonify({"accepted": queue.complete(body["lease"], body["result"])})
+
+    @app.get("/status")
+    def status():
+        return jsonify(queue.status())
+
+    return app
+
+
+class Coordinator(BackgroundServer):
+    """
+    Serves a ScenarioQueue over HTTP and reaps expired leases.
+
+    Example:
+        with Coordinator(ScenarioQueue(locations), port=0) as coordinator:
+            coordinator.queue.wait()
+    """
+
+    def __init__(self, queue: ScenarioQueue, host: str = "0.0.0.0", port: int = DEFAULT_PORT,
+                 reap_interval: float = 1.0):
+        super().__init__(create_app(queue), host, port, name="work-queue")
+        self.queue = queue
+        self.reap_interval = reap_interval
+        self._stop_reaper = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """URL for workers; a wildcard bind address is replaced by the host name."""
+        host = socket.gethostname() if self.host in ("0.0.0.0", "::", "") else self.host
+        return f"http://{host}:{self.port}"
+
+    def start(self):
+        super().start()
+        self._stop_reaper.clear()
+        self._reaper = threading.Thread(target=self._reap_loop, name="work-queue-reaper", daemon=True)
+        self._reaper.start()
+        return self
+
+    def stop(self):
+        self._stop_reaper.set()
+        if self._reaper is not None:
+            self._reaper.join()
+            self._reaper = None
+        super().stop()
+
+    def _reap_loop(self):
+        while not self._stop_reaper.wait(self.reap_interval):
+            for location in self.queue.reap():
+                print(f"Lease on {location} expired, requeued")
+
+
+class WorkQueueClient:
+    """HTTP client a worker uses to talk to the coordinator."""
+
+    def __init__(self, url: str, worker: str, timeout: float = 10.0):
+        self.url = url.rstrip("/")
+        self.worker = worker
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        response = self.session.post(f"{self.url}{path}", json=body, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def lease(self) -> Dict[str, Any]:
+        return self._post("/lease", {"worker": self.worker})
+
+    def heartbeat(self) -> int:
+        return self._post("/heartbeat", {"worker": self.worker})["leases"]
+
+    def report(self, lease: str, result: Dict[str, Any]) -> bool:
+        return self._post("/result", {"lease": lease, "result": result})["accepted"]
+
+    def status(self) -> Dict[str, Any]:
+        response = self.session.get(f"{self.url}/status", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+def run_worker(url: str, run_scenario: Callable[[str, Dict[str, Any]], Dict[str, Any]],
+               worker: Optional[str] = None, heartbeat_interval: float = HEARTBEAT_INTERVAL,
+               connect_timeout: float = 60.0) -> int:
+    """
+    Pulls scenarios from a coordinator and runs them until the queue is done.
+
+    Args:
+        url (str): Coordinator URL, e.g. "http://build-host:8765".
+        run_scenario (callable): Runs one location with the run options and returns its
+            result dict (at least "status").
+        worker (str): Worker name (default: <hostname>-<pid>).
+        heartbeat_interval (float): Seconds between lease renewals.
+        connect_timeout (float): Seconds to keep retrying before the coordinator is reachable.
+
+    Returns:
+        int: Number of scenarios this worker ran.
+    """
+    client = WorkQueueClient(url, worker or default_worker_id())
+    stop = threading.Event()
+
+    def send_heartbeats():
+        while not stop.wait(heartbeat_interval):
+            try:
+                client.heartbeat()
+            except requests.RequestException:
+                pass  # The lease expires if the coordinator stays unreachable
+
+    heartbeats = threading.Thread(target=send_heartbeats, name="work-queue-heartbeat", daemon=True)
+    heartbeats.start()
+    deadline = time.monotonic() + connect_timeout
+    connected = False
+    ran = 0
+    try:
+        while True:
+            try:
+                reply = client.lease()
+            except requests.ConnectionError:
+                if connected or time.monotonic() >= deadline:
+                    # A coordinator that went away after the run has nothing left to hand out
+                    if not connected:
+                        print(f"Coordinator {client.url} is not reachable")
+                    break
+                time.sleep(RETRY_AFTER)
+                continue
+            connected = True
+            if reply.get("done"):
+                break
+            if "wait" in reply:
+                time.sleep(reply["wait"])
+                continue
+
+            started = time.monotonic()
+            try:
+                result = run_scenario(reply["location"], reply.get("run") or {})
+            except Exception as e:
+                result = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+            result.setdefault("duration", round(time.monotonic() - started, 3))
+            ran += 1
+            try:
+                if not client.report(reply["lease"], result):
+                    print(f"Result for {reply['location']} was not accepted (lease expired)")
+            except requests.RequestException as e:
+                print(f"Could not report the result for {reply['location']}: {e}")
+    finally:
+        stop.set()
+        heartbeats.join()
+    return ran